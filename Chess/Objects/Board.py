@@ -1,8 +1,24 @@
-import copy
+import random
+
+from Scripts.TurnValidator import is_in_check
+
+# random keys for Zobrist hashing, generated from a fixed seed so that they are the same in every run
+__keys = random.Random(1729)
+# one key for every piece on every field, indexed by the coords (line * 10 + column)
+ZOBRIST_PIECES = [[0] * 100] + [[__keys.getrandbits(64) for field in range(100)] for piece in range(12)]
+# one key for every en passant and castling flag
+ZOBRIST_FLAGS = [[__keys.getrandbits(64) for index in range(10)] for turn in range(2)]
+ZOBRIST_TURN = __keys.getrandbits(64)
+
+# letters used for the pieces in FEN, in the order of their values (white pawn is 1)
+FEN_PIECES = "PRNBQKprnbqk"
 
 """
 Class responsible for storing game board related data.
 
+The pieces are kept as seen by white, whoever's turn it is: the first line of the matrix is the 8th rank
+(black's side) and the first column is the a file. White's pawns move up the matrix and black's pawns move down.
+
 Game piece conventions:
     no piece - 0
     white pawn - 1
@@ -22,6 +38,7 @@ class Board:
     def __init__(self):
         self.__init_layout()
         self.__init_pieces_start() # setup for game start
+        self.__init_state()
 
 
     """
@@ -75,17 +92,330 @@ class Board:
                        [0, 0, 0, 0, 0, 0, 0, 0, 0, 0]]"""
 
     """
-    Returns a flipped copy of the board.
+    Sets up the state of the game which isn't visible on the board.
+
+    Turn conventions:
+        white - 0
+        black - 1
+    """
+    def __init_state(self):
+        self.turn = 0
+        # slots 1 -> 8 keep track of en passant, by the column of the pawn that moved 2 spaces
+        # slots 0 and 9 keep track for castling, with the rook of the first and of the last column
+        self.en_passant = [[0, 0, 0, 0, 0, 0, 0, 0, 0, 0], [0, 0, 0, 0, 0, 0, 0, 0, 0, 0]]
+        self.hash = self.compute_hash()
+        # changes every time the position changes, so that anything computed from a position can be reused
+        self.version = 0
+
+    """
+    Replaces the position with a given one.
+
+    Args:
+        pieces (list): Matrix which contains the layout of the game pieces.
+        turn (int): Indicates which player makes the next move.
+        en_passant (list): Matrix with 2 lines, each keeping track of where en_passant and castling can be performed.
+    """
+    def set_position(self, pieces, turn, en_passant):
+        self.pieces = [line[:] for line in pieces]
+        self.turn = turn
+        self.en_passant = [en_passant[0][:], en_passant[1][:]]
+
+        self.hash = self.compute_hash()
+        self.version += 1
+
+    """
+    Replaces the position with one given in Forsyth-Edwards Notation.
+    Only the first 4 fields are read (the move counters aren't kept), so EPD positions are accepted as well.
+    Positions which can't come up in a game (a missing or extra king, a pawn on the first or last rank,
+    the side which has just moved in check) are rejected like malformed ones.
+
+    Args:
+        fen (str): The position (e.g. "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1").
+    """
+    def set_fen(self, fen):
+        fields = fen.split()
+        if len(fields) < 4:
+            raise Exception("Invalid FEN: " + fen)
+
+        pieces = [[0] * 10 for i in range(10)]
+        lines = fields[0].split("/")
+        if len(lines) != 8:
+            raise Exception("Invalid FEN: " + fen)
+
+        for i in range(8):
+            j = 1
+            for letter in lines[i]:
+                if letter.isdigit():
+                    j += int(letter)
+                elif letter in FEN_PIECES and j <= 8:
+                    pieces[i + 1][j] = FEN_PIECES.index(letter) + 1
+                    j += 1
+                else:
+                    raise Exception("Invalid FEN: " + fen)
+            if j != 9:
+                raise Exception("Invalid FEN: " + fen)
+
+        if fields[1] not in ("w", "b"):
+            raise Exception("Invalid FEN: " + fen)
+        turn = 0 if fields[1] == "w" else 1
+
+        # every side has exactly one king, and the pawns can't stand on the first or last rank
+        for king in (6, 12):
+            if sum(line.count(king) for line in pieces) != 1:
+                raise Exception("Invalid FEN: " + fen)
+        for j in range(1, 9):
+            if pieces[1][j] % 6 == 1 or pieces[8][j] % 6 == 1:
+                raise Exception("Invalid FEN: " + fen)
+
+        # castling is only possible with the king and the rook on their starting fields
+        en_passant = [[1, 0, 0, 0, 0, 0, 0, 0, 0, 1], [1, 0, 0, 0, 0, 0, 0, 0, 0, 1]]
+        for letter in fields[2]:
+            if letter not in "KQkq-":
+                raise Exception("Invalid FEN: " + fen)
+            if letter == "-":
+                continue
+
+            color = 0 if letter.isupper() else 1
+            line = 8 if color == 0 else 1
+            column = 8 if letter in "Kk" else 1
+            if pieces[line][5] == 6 + 6 * color and pieces[line][column] == 2 + 6 * color:
+                en_passant[color][9 if column == 8 else 0] = 0
+
+        # the field behind the pawn which has just moved 2 spaces
+        if fields[3] != "-":
+            field = self.get_field(fields[3])
+            if field == (0, 0) or field[0] != (6 if turn == 1 else 3):
+                raise Exception("Invalid FEN: " + fen)
+            en_passant[1 - turn][field[1]] = 1
+
+        # the side which has just moved can't have left its king in check
+        if is_in_check(1 - turn, pieces, en_passant):
+            raise Exception("Invalid FEN: " + fen)
+
+        self.set_position(pieces, turn, en_passant)
+
+    """
+    Returns the position in Forsyth-Edwards Notation, without the move counters (the first 4 fields, as in EPD).
+
+    Returns:
+        str: The position.
+    """
+    def get_fen(self):
+        lines = []
+        for i in range(1, 9):
+            line = ""
+            empty = 0
+            for j in range(1, 9):
+                piece = self.pieces[i][j]
+                if piece == 0:
+                    empty += 1
+                    continue
+                if empty != 0:
+                    line += str(empty)
+                    empty = 0
+                line += FEN_PIECES[piece - 1]
+            if empty != 0:
+                line += str(empty)
+            lines.append(line)
+
+        castling = ""
+        for color, letters in ((0, "KQ"), (1, "kq")):
+            if self.en_passant[color][9] == 0:
+                castling += letters[0]
+            if self.en_passant[color][0] == 0:
+                castling += letters[1]
+
+        passing = "-"
+        for j in range(1, 9):
+            if self.en_passant[1 - self.turn][j] != 0:
+                passing = self.get_field_name((6 if self.turn == 1 else 3, j))
+
+        return "/".join(lines) + " " + "wb"[self.turn] + " " + (castling or "-") + " " + passing
+
+    """
+    Computes the Zobrist hash of the position from scratch (make_move keeps it up to date incrementally).
+
+    Returns:
+        int: 64-bit hash of the pieces, the turn and the en passant and castling flags.
+    """
+    def compute_hash(self):
+        hash = 0
+
+        for i in range(10):
+            for j in range(10):
+                hash ^= ZOBRIST_PIECES[self.pieces[i][j]][i * 10 + j]
+
+        for turn in range(2):
+            for index in range(10):
+                if self.en_passant[turn][index] != 0:
+                    hash ^= ZOBRIST_FLAGS[turn][index]
+
+        if self.turn == 1:
+            hash ^= ZOBRIST_TURN
+
+        return hash
+
+    """
+    Performs a move of the player whose turn it is and passes the turn to the other player.
+
+    The move has to be valid (see TurnValidator.is_valid_move). A pawn which reaches the end of the board
+    promotes on the field it moves to.
+
+    Args:
+        move (tuple): The coords of a piece and of the tile onto which it moves, optionally followed by the
+            piece a pawn promotes to (2 - rook, 3 - knight, 4 - bishop, 5 - queen, queen by default).
+
+    Returns:
+        tuple: Undo record to be given to unmake_move.
+    """
+    def make_move(self, move):
+        pieces = self.pieces
+        i, j = move[0]
+        target_i, target_j = move[1]
+        piece = pieces[i][j]
+        turn = self.turn
+        # the line the pieces of the player start on, and the one of the enemy pieces
+        home = 8 if turn == 0 else 1
+        enemy_home = 9 - home
+
+        changes = [] # fields changed by the move, with their previous values
+        en_passant = (self.en_passant[0][:], self.en_passant[1][:])
+        hash = self.hash
+
+        placed = piece
+        if piece % 6 == 1:
+            # if the piece is a pawn and it moves 2 spaces
+            if abs(i - target_i) == 2:
+                self.__set_flag(turn, target_j, 1)  # mark it for en passant
+
+            # if the pawn captures on an empty field, it captures en passant (the enemy pawn is next to it)
+            if j != target_j and pieces[target_i][target_j] == 0:
+                self.__set_field(changes, (i, target_j), 0)
+
+            if target_i == enemy_home: # pawn promotion
+                if len(move) > 2:
+                    placed = piece - 1 + move[2]
+                else:
+                    placed = piece + 4
+
+        # if the rooks move, you cannot perform castling on that side anymore
+        if (i, j) == (home, 1):
+            self.__set_flag(turn, 0, 1)
+        if (i, j) == (home, 8):
+            self.__set_flag(turn, 9, 1)
+
+        # if an enemy rook is captured at its starting place, the enemy cannot castle on that side anymore
+        if (target_i, target_j) == (enemy_home, 1):
+            self.__set_flag(1 - turn, 0, 1)
+        if (target_i, target_j) == (enemy_home, 8):
+            self.__set_flag(1 - turn, 9, 1)
+
+        if piece % 6 == 0:
+            # if the king moves, you cannot perform castling anymore
+            self.__set_flag(turn, 0, 1)
+            self.__set_flag(turn, 9, 1)
+
+            # castling, the rook jumps over the king
+            if target_j - j > 1:
+                self.__set_field(changes, (i, j + 1), piece - 4)
+                self.__set_field(changes, (i, 8), 0)
+            elif target_j - j < -1:
+                self.__set_field(changes, (i, j - 1), piece - 4)
+                self.__set_field(changes, (i, 1), 0)
+
+        # make the move itself
+        self.__set_field(changes, (target_i, target_j), placed)
+        self.__set_field(changes, (i, j), 0)
+
+        self.__change_turn()
+
+        return changes, en_passant, hash
+
+    """
+    Takes back a move performed by make_move, restoring the position exactly.
+
+    Args:
+        undo (tuple): The undo record returned by make_move.
+    """
+    def unmake_move(self, undo):
+        changes, en_passant, hash = undo
+
+        self.turn = (self.turn + 1) % 2
+
+        pieces = self.pieces
+        for field, value in reversed(changes):
+            pieces[field[0]][field[1]] = value
+
+        self.en_passant[0][:] = en_passant[0]
+        self.en_passant[1][:] = en_passant[1]
+        self.hash = hash
+        self.version += 1
+
+    """
+    Changes the value of a field, keeping track of the previous one.
+
+    Args:
+        changes (list): The fields changed so far, with their previous values.
+        field (tuple): The coords of the field.
+        value (int): The new value of the field.
+    """
+    def __set_field(self, changes, field, value):
+        previous = self.pieces[field[0]][field[1]]
+        changes.append((field, previous))
+        self.pieces[field[0]][field[1]] = value
+
+        index = field[0] * 10 + field[1]
+        self.hash ^= ZOBRIST_PIECES[previous][index] ^ ZOBRIST_PIECES[value][index]
+
+    """
+    Changes an en passant or castling flag, keeping the hash up to date.
+
+    Args:
+        turn (int): The player the flag belongs to.
+        index (int): The slot of the flag.
+        value (int): The new value of the flag.
+    """
+    def __set_flag(self, turn, index, value):
+        if self.en_passant[turn][index] != value:
+            self.en_passant[turn][index] = value
+            self.hash ^= ZOBRIST_FLAGS[turn][index]
+
+    """Changes the turn to the other player"""
+    def __change_turn(self):
+        self.turn = (self.turn + 1) % 2 # turn indicator
+        self.hash ^= ZOBRIST_TURN
+        self.version += 1
+
+        # you can only perform en passant in the turn immediately after a pawn has moved 2 spaces
+        for i in range(1, 9):
+            self.__set_flag(self.turn, i, 0)
+
+    """
+    Returns the name of a field on the board (e.g. "e2").
+
+    Args:
+        field (tuple): The coords of a field inside the border.
 
     Returns:
-            list: The matrix itself.
+        str: The name of the field.
     """
-    def get_flipped_board(self):
-        board_copy = copy.deepcopy(self.pieces)
-        board_copy = list(zip(*board_copy[::-1]))
-        board_copy = list(zip(*board_copy[::-1]))
+    def get_field_name(self, field):
+        return str(self.width[field[1]]) + str(self.height[9 - field[0]])
 
-        return [list(row) for row in board_copy]
+    """
+    Returns the coords of a field given by its name (e.g. "e2").
+
+    Args:
+        name (str): The name of the field.
+
+    Returns:
+        tuple: The coords of the field or (0, 0) if the name is invalid.
+    """
+    def get_field(self, name):
+        if len(name) != 2 or name[0] not in self.width or not name[1].isdigit() or int(name[1]) not in self.height[1:9]:
+            return 0, 0
+
+        return 9 - self.height.index(int(name[1])), self.width.index(name[0])
 
     """Getters"""
 
@@ -124,3 +454,39 @@ class Board:
         """
     def get_pieces(self):
         return self.pieces
+
+    """
+        Returns the player whose turn it is.
+
+        Returns:
+            int: The turn.
+        """
+    def get_turn(self):
+        return self.turn
+
+    """
+        Returns the en passant and castling flags.
+
+        Returns:
+            list: Matrix with 2 lines, each keeping track of where en_passant and castling can be performed.
+        """
+    def get_en_passant(self):
+        return self.en_passant
+
+    """
+        Returns the Zobrist hash of the position.
+
+        Returns:
+            int: The 64-bit hash.
+        """
+    def get_hash(self):
+        return self.hash
+
+    """
+        Returns the version of the position, which changes with every move.
+
+        Returns:
+            int: The version.
+        """
+    def get_version(self):
+        return self.version
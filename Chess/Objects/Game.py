@@ -1,26 +1,30 @@
-from Objects.Board import Board
+from Objects.GameState import GameState
 from Scripts.GUIController import *
 from Scripts.TurnValidator import *
 from Scripts.FunkyLittleComputer import FunkyLittleComputer
+from Scripts.Tablebase import Tablebase
 
-"""
-Class for managing all game logic.
-
-Turn conventions:
-    white - 0
-    black - 1
-"""
+"""Class for managing all game logic."""
 class Game:
     """Setup new game"""
     def __init__(self):
-        self.board = Board()
-        self.turn = 0
+        # the game itself, the GUI only turns clicks into its moves
+        self.state = GameState()
+        self.board = self.state.get_board()
+        # legal moves of the current position, shared with the GUI
+        self.legality = self.state.legality
         self.selected = (0,0)
+        # the field the selected pawn promotes on, while the piece it promotes to is being chosen
+        self.promotion = (0,0)
         self.down_press = (0,0)
-        # slots 1 -> 8 keep track of en passant
-        # slots 0 and 9 keep track for castling
-        self.en_passant = [[0, 0, 0, 0, 0, 0, 0, 0, 0, 0], [0, 0, 0, 0, 0, 0, 0, 0, 0, 0]]
-        self.computer = FunkyLittleComputer()
+        # the player the board is shown to in the single player game, None when it turns with the player to move
+        self.human = None
+        self.computer = FunkyLittleComputer(tablebases=Tablebase.DIRECTORY)
+        # the future of the move the computer is searching for in the background, None when it isn't searching
+        self.search = None
+        # endgame tablebases, their result is shown in the title of the window
+        self.tablebase = Tablebase(Tablebase.DIRECTORY)
+        self.tablebase_version = -1
 
     """
     Determines the type of game based on arguments and starts it.
@@ -32,6 +36,7 @@ class Game:
         display, clock, FPS = setup_display()
 
         if arg == "computer":
+            self.human = 0
             self.__run_1_player(display, clock, FPS)
             return
         if arg == "player":
@@ -41,6 +46,10 @@ class Game:
 
     """
     Runs the game cycle of the single player game.
+
+    The computer searches in the background, so the window keeps responding meanwhile:
+    space makes it play the best move found so far, escape takes back the last move instead.
+    While the player is choosing a move, the computer already searches the reply to the move it expects (pondering).
     
     Args:
         display (Surface): Pygame object which represents the display itself.
@@ -49,34 +58,45 @@ class Game:
     """
     def __run_1_player(self, display, clock, FPS):
         pieces, index, misc = load_assets()
+        # what was drawn in the last frame, so that only the changes are drawn
+        frame = create_frame()
 
         # main game loop
         while True:
             mouse_pos = pygame.mouse.get_pos()
+            self.__show_tablebase_result()
 
-            if self.turn == 1:
-                move = self.computer.select_a_move(self.board.get_pieces(), self.turn, self.en_passant)
+            if self.board.turn == 1 and self.search is None and not self.state.is_game_over():
+                self.search = self.computer.finish_pondering(self.board.get_pieces(), self.board.turn, self.board.en_passant)
 
-                # don't draw the frame where the computer makes a move
+            # the computer's move is played once its search is done
+            if self.search is not None and self.search.done():
+                move = self.search.result()
+                self.search = None
                 if move != 0:
-                    self.selected = move[0]
-                    self.__make_move(move[1])
-                # draw the end of game screen if you win
-                else:
-                    draw_board(pieces, index, misc, display, self.board, self.turn, mouse_pos, self.selected,
-                               self.en_passant)
-                    pygame.display.update()
-                    clock.tick(FPS)
+                    self.state.make_move(move)
+                    if not self.state.is_game_over():
+                        self.computer.start_pondering(self.board.get_pieces(), self.board.turn, self.board.en_passant)
 
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
+                    # stops the search, be it on the computer's or on the player's time
+                    self.computer.close()
                     return
 
+                if event.type == pygame.KEYDOWN and self.search is not None:
+                    if event.key == pygame.K_SPACE: # move now
+                        self.computer.stop()
+                    elif event.key == pygame.K_ESCAPE: # take back the move the computer is answering
+                        self.__cancel_search()
+                        self.state.undo_move()
+
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     # save location of mouse_down
                     self.down_press = (int(mouse_pos[1] / 96), int(mouse_pos[0] / 96))
 
-                if event.type == pygame.MOUSEBUTTONUP:
+                # the pieces can't be moved while the computer is searching
+                if event.type == pygame.MOUSEBUTTONUP and self.board.turn == 0:
                     i, j = (int(mouse_pos[1] / 96), int(mouse_pos[0] / 96))
 
                     # if MOUSEBUTTONUP and MOUSEBUTTONDOWN were done on the same tile
@@ -86,10 +106,21 @@ class Game:
                     else:
                         self.down_press = (0, 0)
 
-            if self.turn == 0:
-                draw_board(pieces, index, misc, display, self.board, self.turn, mouse_pos, self.selected, self.en_passant)
-                pygame.display.update()
-                clock.tick(FPS)
+            # the board stays turned to the player, who can't move the pieces while the computer is searching
+            dirty = draw_board(pieces, index, misc, display, self.board, self.legality, mouse_pos, self.selected, self.promotion,
+                               self.__get_perspective(), self.search is None, frame)
+            pygame.display.update(dirty)
+            clock.tick(FPS)
+
+    """Stops the search of the computer, its move being thrown away."""
+    def __cancel_search(self):
+        if self.search is None:
+            return
+
+        self.computer.stop()
+        # wait for the search to stop, so that it doesn't run on with the next one queued behind it
+        self.search.result()
+        self.search = None
 
     """
     Runs the game cycle of the 2 players game.
@@ -101,10 +132,13 @@ class Game:
     """
     def __run_2_player(self, display, clock, FPS):
         pieces, index, misc = load_assets()
+        # what was drawn in the last frame, so that only the changes are drawn
+        frame = create_frame()
 
         # main game loop
         while True:
             mouse_pos = pygame.mouse.get_pos()
+            self.__show_tablebase_result()
 
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -126,10 +160,31 @@ class Game:
 
 
 
-            draw_board(pieces, index, misc, display, self.board, self.turn, mouse_pos, self.selected, self.en_passant)
-            pygame.display.update()
+            dirty = draw_board(pieces, index, misc, display, self.board, self.legality, mouse_pos, self.selected, self.promotion,
+                               self.__get_perspective(), True, frame)
+            pygame.display.update(dirty)
             clock.tick(FPS)
 
+    """
+    Gives the player the board is shown to.
+
+    Returns:
+        int: 0 for white, 1 for black.
+    """
+    def __get_perspective(self):
+        if self.human is None:
+            return self.board.get_turn()
+
+        return self.human
+
+    """Shows the tablebase result of the position in the title of the window, when the position changes."""
+    def __show_tablebase_result(self):
+        if self.board.get_version() == self.tablebase_version:
+            return
+
+        self.tablebase_version = self.board.get_version()
+        show_caption(self.tablebase.describe(self.board.get_pieces(), self.board.get_turn()))
+
     """
     Event handler for mouse click.
     
@@ -137,27 +192,30 @@ class Game:
         mouse_pos (tuple): The position of the mouse at the moment of the click.
     """
     def __handle_MOUSEBUTTONUP(self, mouse_pos):
-        reference = 6 + self.turn * 6
+        reference = 6 + self.board.turn * 6
         layout = self.board.get_pieces()
         # the coords of the tile the mouse click is on
         i = int(mouse_pos[1] / 96)
         j = int(mouse_pos[0] / 96)
-        field = layout[i][j]
 
-        # checks selected piece for pawn promotion
-        if layout[self.selected[0]][self.selected[1]] % 6 == 1 and self.selected[0] == 1:
-            self.__handle_click_pawn_promotion((i, j), layout[self.selected[0]][self.selected[1]])
+        # checks if the piece a pawn promotes to is being chosen
+        if self.promotion != (0,0):
+            self.__handle_click_pawn_promotion((i, j))
             return
 
+        # the field of the board shown on the tile
+        i, j = view_field(self.__get_perspective(), (i, j))
+        field = layout[i][j]
+
         # if I click on a piece that is mine and isn't the selected piece
         if field != 0 and is_same_color(reference, field) and (i, j) != self.selected:
             # if the piece has valid moves
-            if len(get_all_valid_moves(layout, self.turn, (i, j), self.en_passant)) != 0:
+            if len(self.legality.get_all_valid_moves((i, j))) != 0:
                 self.selected = (i, j)
 
         # if a piece is already selected
         if self.selected != (0,0):
-            matrix = move_matrix(layout, self.selected, self.en_passant)
+            matrix = self.legality.move_matrix(self.selected)
 
             # if I click on a place that isn't somewhere the selected piece can move
             if matrix[i][j] == 0:
@@ -167,60 +225,42 @@ class Game:
                 ):
                     self.selected = (0,0) # deselect piece
             # if I click on a VALID place the piece can move
-            elif is_valid_move(layout, self.turn, self.selected, (i, j), self.en_passant):
-                self.__make_move((i, j))
-
-    """
-    Particular click event handling for castling.
-    
-    Args:
-        target (tuple): The coords of the tile on which the click was performed.
-    """
-    def __handle_click_castling(self, target):
-        i, j = self.selected[0], self.selected[1]
-        board = self.board.get_pieces()
-        piece = board[i][j]
-
-        if j < target[1]: # castling to the right
-            board[i][ j + 2] = piece
-            board[i][j] = 0
-            board[i][j + 1] = piece - 4
-            board[8][8] = 0
-        else: # castling to the left
-            board[i][j - 2] = piece
-            board[i][j] = 0
-            board[i][j - 1] = piece - 4
-            board[8][1] = 0
-
-        self.selected = (0, 0)
-        self.__change_turn()
+            elif self.legality.is_valid_move(self.selected, (i, j)):
+                # a pawn reaching the end of the board waits for the piece it promotes to be chosen
+                if layout[self.selected[0]][self.selected[1]] % 6 == 1 and (i == 1 or i == 8):
+                    self.promotion = (i, j)
+                else:
+                    self.__make_move((i, j))
 
     """
     Particular click event handling for pawn promotion.
     
     Args:
         mouse_pos (tuple): The coords of the tile on which the click was performed.
-        pawn (int): The value of the pawn which performs the promotion.
     """
-    def __handle_click_pawn_promotion(self, mouse_pos, pawn):
+    def __handle_click_pawn_promotion(self, mouse_pos):
         i, j = mouse_pos[0], mouse_pos[1]
+        # the dropdown hangs below the tile the pawn promotes on
+        column = view_field(self.__get_perspective(), self.promotion)[1]
 
+        # the piece the pawn promotes to for every tile of the dropdown
         switch = {
-            2: 4,
-            3: 3,
-            4: 2,
-            5: 1
+            2: 5,
+            3: 4,
+            4: 3,
+            5: 2
         }
 
-        if j != self.selected[1] or i < 1 or i > 5:
+        if j != column or i < 1 or i > 5:
             self.selected = (0,0)
+            self.promotion = (0,0)
         else:
             if i == 1:
                 return
 
-            self.board.get_pieces()[self.selected[0]][self.selected[1]] = pawn + switch[i]
-            self.__change_turn()
-
+            self.state.make_move((self.selected, self.promotion, switch[i]))
+            self.selected = (0, 0)
+            self.promotion = (0, 0)
 
     """
     Performs a move.
@@ -229,55 +269,7 @@ class Game:
         target_pos (tuple): The coords of the tile onto which the piece moves.
     """
     def __make_move(self, target_pos):
-        i, j = target_pos[0], target_pos[1]
-
-        layout = self.board.get_pieces()
-
-        matrix = move_matrix(layout, self.selected, self.en_passant)
-
-        if matrix[i][j] == 3:
-            layout[i + 1][j] = 0  # execute en passant
-
-        # if the piece is a pawn and it moves 2 spaces
-        if layout[self.selected[0]][self.selected[1]] % 6 == 1 and (self.selected[0] - i) == 2:
-            self.en_passant[self.turn][8 - j + 1] = 1  # mark it for en passant
-
-        # if the rooks move, you cannot perform castling on that side anymore
-        if self.selected == (8, 1):
-            self.en_passant[self.turn][0] = 1
-        if self.selected == (8, 8):
-            self.en_passant[self.turn][9] = 1
-
-        # if the king moves, you cannot perform castling anymore
-        if layout[self.selected[0]][self.selected[1]] % 6 == 0:
-            self.en_passant[self.turn][0], self.en_passant[self.turn][9] = 1, 1
-
-            # if the castling is performed on this click
-            difference = j - self.selected[1]
-            if difference > 1 or difference < -1:
-                self.__handle_click_castling((i, j))
-                return
-
-
-        pieces = self.board.get_pieces()
-
-        # make the move itself
-        pieces[target_pos[0]][target_pos[1]] = pieces[self.selected[0]][self.selected[1]]
-        pieces[self.selected[0]][self.selected[1]] = 0
+        self.state.make_move((self.selected, target_pos))
 
         #deselect piece
         self.selected = (0, 0)
-
-        self.__change_turn()
-
-    """Changes the turn to the other player"""
-    def __change_turn(self):
-        self.turn = (self.turn + 1) % 2 # turn indicator
-        self.board.pieces = self.board.get_flipped_board() # flip the board
-        # index flip
-        self.board.height.reverse()
-        self.board.width.reverse()
-
-        # you can only perform en passant in the turn immediately after a pawn has moved 2 spaces
-        for i in range(1,9):
-          self.en_passant[self.turn][i] = 0
\ No newline at end of file
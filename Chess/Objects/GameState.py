@@ -0,0 +1,175 @@
+from Objects.Board import Board
+from Scripts.LegalityCache import LegalityCache
+from Scripts.Notation import get_moves, get_move_name, parse_move
+
+"""
+Class for playing a game without any GUI: moves are checked against the rules and applied to the board.
+
+Moves are given either as coordinates of the board (see Board.make_move)
+or by their names in coordinate notation (e.g. e2e4, e7e8q).
+"""
+class GameState:
+    """Setup new game"""
+    def __init__(self):
+        self.board = Board()
+        # legal moves of the current position
+        self.legality = LegalityCache(self.board)
+        # the moves played so far, with their names and what is needed to take them back
+        self.history = []
+
+    """
+    Checks if a move of the player whose turn it is is valid.
+
+    Args:
+        move (tuple): The coords of a piece and of the tile onto which it moves, optionally followed by the
+            piece a pawn promotes to (2 - rook, 3 - knight, 4 - bishop, 5 - queen).
+
+    Returns:
+        bool: If the move is valid.
+    """
+    def is_valid_move(self, move):
+        if len(move) > 2 and move[2] not in (2, 3, 4, 5):
+            return False
+
+        return self.legality.is_valid_move(tuple(move[0]), tuple(move[1]))
+
+    """
+    Performs a move of the player whose turn it is and passes the turn to the other player.
+
+    Args:
+        move (tuple): The coords of a piece and of the tile onto which it moves, optionally followed by the
+            piece a pawn promotes to (2 - rook, 3 - knight, 4 - bishop, 5 - queen, queen by default).
+    """
+    def make_move(self, move):
+        if not self.is_valid_move(move):
+            raise Exception("Invalid move: " + str(move))
+
+        self.__play((tuple(move[0]), tuple(move[1])) + tuple(move[2:]))
+
+    """
+    Performs a move given by its name in coordinate notation.
+
+    Args:
+        name (str): The name of the move (e.g. e2e4, or e7e8q for a pawn promoting to a queen).
+
+    Returns:
+        tuple: The move, as coords.
+    """
+    def make_named_move(self, name):
+        move = parse_move(self.board, name)
+        if move == 0:
+            raise Exception("Invalid move: " + name)
+
+        self.__play(move)
+        return move
+
+    """
+    Takes back the last move.
+
+    Returns:
+        int: 0 if no move has been played.
+        tuple: The move taken back.
+    """
+    def undo_move(self):
+        if len(self.history) == 0:
+            return 0
+
+        move, name, undo = self.history.pop()
+        self.board.unmake_move(undo)
+        return move
+
+    """
+    Performs a valid move and remembers it.
+
+    Args:
+        move (tuple): The move.
+    """
+    def __play(self, move):
+        name = get_move_name(self.board, move)
+        self.history.append((move, name, self.board.make_move(move)))
+
+    """
+    Returns all the valid moves of the player whose turn it is.
+
+    Returns:
+        list: Moves which can be given to make_move, with one move for every piece a pawn can promote to.
+    """
+    def get_valid_moves(self):
+        return get_moves(self.board, lambda pieces, turn, en_passant: self.legality.get_all_possible_moves())
+
+    """
+    Returns the name of a move of the player whose turn it is.
+
+    Args:
+        move (tuple): The move.
+
+    Returns:
+        str: The name of the move in coordinate notation.
+    """
+    def get_move_name(self, move):
+        return get_move_name(self.board, move)
+
+    """
+    Returns the names of the moves played so far.
+
+    Returns:
+        list: The names of the moves in coordinate notation.
+    """
+    def get_move_names(self):
+        return [name for move, name, undo in self.history]
+
+    """
+    Checks if the player whose turn it is is in check.
+
+    Returns:
+        bool: If the player is in check or not.
+    """
+    def is_in_check(self):
+        return self.legality.is_in_check()
+
+    """
+    Checks if the game has ended with the player whose turn it is being check mated.
+
+    Returns:
+        bool: If it is check mate.
+    """
+    def is_check_mate(self):
+        return self.legality.is_check_mate()
+
+    """
+    Checks if the game has ended with the player whose turn it is having no moves without being in check.
+
+    Returns:
+        bool: If it is stalemate.
+    """
+    def is_stalemate(self):
+        return self.legality.is_stalemate()
+
+    """
+    Checks if the game has ended.
+
+    Returns:
+        bool: If the player whose turn it is has no valid moves.
+    """
+    def is_game_over(self):
+        return len(self.legality.get_all_possible_moves()) == 0
+
+    """Getters"""
+
+    """
+    Returns the board of the game.
+
+    Returns:
+        Board: The board.
+    """
+    def get_board(self):
+        return self.board
+
+    """
+    Returns the player whose turn it is.
+
+    Returns:
+        int: The turn.
+    """
+    def get_turn(self):
+        return self.board.turn
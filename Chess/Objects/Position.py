@@ -0,0 +1,142 @@
+from Objects.Board import Board
+
+# clears the flag bits stored above the piece values by to_bytes
+PIECE_BITS = bytes(value & 0x0F for value in range(256))
+
+"""
+Class for keeping a position in as little memory as possible, e.g. when storing many positions.
+
+The pieces are kept in 64 bytes, one for every field inside the border (line by line, a8 first, as in Board),
+and everything else in a single integer:
+    bits 0 -> 9 - en passant and castling flags of white (see Board)
+    bits 10 -> 19 - en passant and castling flags of black
+    bit 20 - the player whose turn it is
+"""
+class Position:
+    __slots__ = ("pieces", "flags")
+
+    """
+    Sets up a position.
+
+    Args:
+        pieces (bytes): The 64 piece values.
+        flags (int): The packed flags and turn.
+    """
+    def __init__(self, pieces, flags):
+        self.pieces = pieces
+        self.flags = flags
+
+    """
+    Takes the position of a board.
+
+    Args:
+        board (Board): Game object containing information about the game state.
+
+    Returns:
+        Position: The position.
+    """
+    @staticmethod
+    def from_board(board):
+        pieces = board.get_pieces()
+        en_passant = board.get_en_passant()
+
+        flags = board.get_turn() << 20
+        for turn in range(2):
+            for index in range(10):
+                if en_passant[turn][index] != 0:
+                    flags |= 1 << (turn * 10 + index)
+
+        return Position(bytes([piece for line in pieces[1:9] for piece in line[1:9]]), flags)
+
+    """
+    Reads a position written by to_bytes.
+
+    Args:
+        data (bytes): The 64 bytes.
+
+    Returns:
+        Position: The position.
+    """
+    @staticmethod
+    def from_bytes(data):
+        flags = 0
+        for index in range(21):
+            flags |= (data[index] >> 4) << index
+
+        return Position(bytes(data).translate(PIECE_BITS), flags)
+
+    """
+    Writes the position in 64 bytes, the flags taking the upper half of the first 21 of them.
+
+    Returns:
+        bytes: The encoded position.
+    """
+    def to_bytes(self):
+        data = bytearray(self.pieces)
+        flags = self.flags
+        for index in range(21):
+            if flags & (1 << index):
+                data[index] |= 0x10
+
+        return bytes(data)
+
+    """
+    Creates a board with the position.
+
+    Returns:
+        Board: The board.
+    """
+    def to_board(self):
+        board = Board()
+        board.set_position(self.get_pieces(), self.get_turn(), self.get_en_passant())
+        return board
+
+    """
+    Returns the piece on a field.
+
+    Args:
+        field (tuple): The coords of a field inside the border.
+
+    Returns:
+        int: The value of the piece (0 if none).
+    """
+    def get_piece(self, field):
+        return self.pieces[(field[0] - 1) * 8 + field[1] - 1]
+
+    """
+    Returns the layout of the game pieces, with the border.
+
+    Returns:
+        list: The matrix (see Board).
+    """
+    def get_pieces(self):
+        layout = [[0] * 10]
+        for i in range(8):
+            layout.append([0] + list(self.pieces[i * 8:i * 8 + 8]) + [0])
+        layout.append([0] * 10)
+
+        return layout
+
+    """
+    Returns the en passant and castling flags.
+
+    Returns:
+        list: Matrix with 2 lines, each keeping track of where en_passant and castling can be performed.
+    """
+    def get_en_passant(self):
+        return [[(self.flags >> (turn * 10 + index)) & 1 for index in range(10)] for turn in range(2)]
+
+    """
+    Returns the player whose turn it is.
+
+    Returns:
+        int: The turn.
+    """
+    def get_turn(self):
+        return self.flags >> 20
+
+    def __eq__(self, other):
+        return isinstance(other, Position) and self.pieces == other.pieces and self.flags == other.flags
+
+    def __hash__(self):
+        return hash((self.pieces, self.flags))
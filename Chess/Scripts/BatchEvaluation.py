@@ -0,0 +1,121 @@
+import numpy as np
+
+from Objects.Position import Position
+from Scripts.BatchValidator import KNIGHT_STEPS, ROOK_STEPS, BISHOP_STEPS, pack_bitboards, shift_bitboards, count_bits
+from Scripts.Evaluation import WEIGHTS, MOBILITY_VALUES
+
+"""
+Script for scoring many positions at once with NumPy, e.g. for labelling datasets and tuning.
+
+Gives the same scores as Evaluation.evaluate (which the computer opponent uses for single positions):
+the positions are turned into an N x 8 x 8 array of piece values and every term is computed for all of them together.
+"""
+
+# material and piece-square score of every piece value on every field (line by line, a8 first), seen by white
+PIECE_SCORES = np.array([[weights[i * 10 + j] for i in range(1, 9) for j in range(1, 9)] for weights in WEIGHTS[0]],
+                        dtype=np.int32)
+
+"""
+Turns positions into arrays.
+
+Args:
+    positions (list): Positions (see Position) or boards (see Board).
+
+Returns:
+    ndarray: The piece values, N x 8 x 8 (line by line, a8 first).
+    ndarray: The player whose turn it is in every position, N.
+"""
+def to_arrays(positions):
+    # positions are already kept as 64 bytes each
+    if all(isinstance(position, Position) for position in positions):
+        pieces = np.frombuffer(b"".join(position.pieces for position in positions), dtype=np.uint8)
+        turns = np.fromiter((position.get_turn() for position in positions), dtype=np.uint8, count=len(positions))
+        return pieces.reshape(len(positions), 8, 8), turns
+
+    pieces = np.empty((len(positions), 8, 8), dtype=np.uint8)
+    turns = np.empty(len(positions), dtype=np.uint8)
+
+    for index, position in enumerate(positions):
+        if isinstance(position, Position):
+            pieces[index] = np.frombuffer(position.pieces, dtype=np.uint8).reshape(8, 8)
+        else:
+            pieces[index] = [line[1:9] for line in position.get_pieces()[1:9]]
+        turns[index] = position.get_turn()
+
+    return pieces, turns
+
+"""
+Evaluates many positions from the point of view of the player whose turn it is in each of them.
+
+Args:
+    positions (list): Positions (see Position) or boards (see Board).
+
+Returns:
+    ndarray: The scores in centipawns (see Evaluation.evaluate).
+"""
+def evaluate_batch(positions):
+    return evaluate_arrays(*to_arrays(positions))
+
+"""
+Evaluates many positions given as arrays (see to_arrays).
+
+Args:
+    pieces (ndarray): The piece values, N x 8 x 8.
+    turns (ndarray): The player whose turn it is in every position.
+
+Returns:
+    ndarray: The scores in centipawns.
+"""
+def evaluate_arrays(pieces, turns):
+    pieces = np.asarray(pieces)
+    count = len(pieces)
+
+    # material and piece-square tables, a single lookup for every field
+    score = PIECE_SCORES[pieces.reshape(count, 64), np.arange(64)].sum(axis=1, dtype=np.int32)
+    score += __mobility(pieces, 0) - __mobility(pieces, 1)
+
+    # the scores are seen by white so far
+    return np.where(np.asarray(turns) == 0, score, -score).astype(np.int32)
+
+"""
+Scores the mobility of the pieces of one color in many positions.
+
+The pieces of every kind are packed into one 64-bit bitboard per position (see BatchValidator) and their attacks
+are followed one field at a time in every direction, for all the positions together. Two pieces moved the same way
+never land on the same field and two rays going the same way never cover the same field (the first one stops at
+the piece the other one starts from), so counting the fields of every step and direction counts every field
+a piece attacks exactly once.
+
+Args:
+    pieces (ndarray): The piece values, N x 8 x 8.
+    color (int): 0 for white, 1 for black.
+
+Returns:
+    ndarray: The mobility score of every position.
+"""
+def __mobility(pieces, color):
+    offset = 6 * color
+    flat = pieces.reshape(len(pieces), 64)
+    empty = pack_bitboards(flat == 0)
+    # the fields a piece of the color may move to
+    free = empty | pack_bitboards((flat > 6) if color == 0 else ((flat < 7) & (flat != 0)))
+
+    mobility = np.zeros(len(pieces), dtype=np.int32)
+
+    knights = pack_bitboards(flat == 3 + offset)
+    for dx, dy in KNIGHT_STEPS:
+        mobility += MOBILITY_VALUES[3] * count_bits(shift_bitboards(knights, dx, dy) & free)
+
+    queens = pack_bitboards(flat == 5 + offset)
+    for kind, steps in ((2, ROOK_STEPS), (4, BISHOP_STEPS), (5, ROOK_STEPS + BISHOP_STEPS)):
+        sliders = queens if kind == 5 else pack_bitboards(flat == kind + offset)
+        for dx, dy in steps:
+            ray = sliders
+            attacks = np.zeros_like(sliders)
+            for distance in range(7):
+                ray = shift_bitboards(ray, dx, dy)
+                attacks |= ray
+                ray &= empty # the ray stops at the first piece it meets
+            mobility += MOBILITY_VALUES[kind] * count_bits(attacks & free)
+
+    return mobility
@@ -0,0 +1,503 @@
+import numpy as np
+
+from Objects.Position import Position
+from Scripts.BitboardValidator import KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, ROOK_DIRECTIONS, BISHOP_DIRECTIONS, \
+    KNIGHT_STEPS, KING_STEPS
+
+"""
+Script for generating the legal moves of many positions at once with NumPy, e.g. for playing many games in lockstep.
+
+Gives the same moves as BitboardValidator.get_all_possible_moves, with the same squares and bitboards
+(bit 0 is a8, see BitboardValidator), every bitboard being a uint64 array holding one value per position.
+The loops only go over the squares and directions of the board, never over the positions.
+"""
+
+ALL = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+KNIGHT_TABLE = np.array(KNIGHT_ATTACKS, dtype=np.uint64)
+KING_TABLE = np.array(KING_ATTACKS, dtype=np.uint64)
+PAWN_TABLES = [np.array(PAWN_ATTACKS[color], dtype=np.uint64) for color in range(2)]
+ROOK_TABLES = [(np.array(rays, dtype=np.uint64), positive) for rays, positive in ROOK_DIRECTIONS]
+BISHOP_TABLES = [(np.array(rays, dtype=np.uint64), positive) for rays, positive in BISHOP_DIRECTIONS]
+
+ROOK_STEPS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+BISHOP_STEPS = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+
+# the columns a step by the given number of columns can land on without going over the side of the board
+COLUMN_MASKS = {dy: np.uint64(sum(1 << (line * 8 + column) for line in range(8) for column in range(8)
+                                  if 0 <= column - dy < 8)) for dy in range(-2, 3)}
+
+# the number of bits of every byte
+BIT_COUNTS = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+"""
+Builds the squares strictly between two squares on the same line, column or diagonal.
+
+Returns:
+    ndarray: 64 x 64 bitboards, 0 for squares which aren't aligned.
+"""
+def __build_between():
+    between = np.zeros((64, 64), dtype=np.uint64)
+
+    for origin in range(64):
+        for dx, dy in ROOK_STEPS + BISHOP_STEPS:
+            x, y = divmod(origin, 8)
+            squares = 0
+            x, y = x + dx, y + dy
+            while 0 <= x < 8 and 0 <= y < 8:
+                between[origin][x * 8 + y] = squares
+                squares |= 1 << (x * 8 + y)
+                x, y = x + dx, y + dy
+
+    return between
+
+"""
+Builds the squares castling needs, the same way as BitboardValidator.
+
+Args:
+    right (bool): Castling to the right (towards column 8) or to the left.
+
+Returns:
+    ndarray: For every square of the king, the squares which have to be empty (0 if castling isn't possible).
+    ndarray: For every square of the king, the squares which mustn't be attacked.
+"""
+def __build_castling(right):
+    empty = np.zeros(64, dtype=np.uint64)
+    safe = np.zeros(64, dtype=np.uint64)
+
+    for square in range(64):
+        column = square % 8
+        line = square - column
+        if right and column + 2 < 8:
+            empty[square] = sum(1 << (line + i) for i in range(column + 1, 7))
+            safe[square] = sum(1 << (line + i) for i in range(column, column + 3))
+        elif not right and column - 2 >= 0:
+            empty[square] = sum(1 << (line + i) for i in range(1, column))
+            safe[square] = sum(1 << (line + i) for i in range(column, column - 3, -1))
+
+    return empty, safe
+
+BETWEEN = __build_between()
+CASTLING_RIGHT = __build_castling(True)
+CASTLING_LEFT = __build_castling(False)
+
+"""
+Turns positions into arrays.
+
+Args:
+    positions (list): Positions (see Position) or boards (see Board).
+
+Returns:
+    ndarray: The piece values, N x 8 x 8 (line by line, a8 first).
+    ndarray: The player whose turn it is in every position, N.
+    ndarray: The en passant and castling flags of every position, N x 2 x 10 (see Board).
+"""
+def to_arrays(positions):
+    pieces = np.empty((len(positions), 8, 8), dtype=np.uint8)
+    turns = np.empty(len(positions), dtype=np.uint8)
+    en_passant = np.empty((len(positions), 2, 10), dtype=np.uint8)
+
+    for index, position in enumerate(positions):
+        if isinstance(position, Position):
+            pieces[index] = np.frombuffer(position.pieces, dtype=np.uint8).reshape(8, 8)
+        else:
+            pieces[index] = [line[1:9] for line in position.get_pieces()[1:9]]
+        turns[index] = position.get_turn()
+        en_passant[index] = position.get_en_passant()
+
+    return pieces, turns, en_passant
+
+"""
+Returns the legal moves of the player whose turn it is in many positions.
+
+Args:
+    pieces (ndarray): The piece values, N x 8 x 8.
+    turns (ndarray): The player whose turn it is in every position.
+    en_passant (ndarray): The en passant and castling flags of every position, N x 2 x 10.
+
+Returns:
+    ndarray: N x 64 x 64 flags, [position, square of the piece, target square] being set for every legal move
+        (a pawn reaching the last rank promotes, see Notation.get_moves).
+"""
+def get_legal_move_masks(pieces, turns, en_passant):
+    return unpack_bitboards(get_legal_targets(pieces, turns, en_passant))
+
+"""
+Returns the legal targets of every piece of the player whose turn it is in many positions.
+
+Args:
+    pieces (ndarray): The piece values, N x 8 x 8.
+    turns (ndarray): The player whose turn it is in every position.
+    en_passant (ndarray): The en passant and castling flags of every position, N x 2 x 10.
+
+Returns:
+    ndarray: N x 64 bitboards, the targets of the piece on every square (0 if it isn't the player's).
+"""
+def get_legal_targets(pieces, turns, en_passant):
+    count = len(pieces)
+    flat = np.asarray(pieces).reshape(count, 64)
+    turns = np.asarray(turns).astype(bool) # True for black
+    en_passant = np.asarray(en_passant)
+
+    # bitboards[value] holds the squares of the pieces with the value, as in BitboardValidator
+    bitboards = [None] + [pack_bitboards(flat == value) for value in range(1, 13)]
+    white = bitboards[1] | bitboards[2] | bitboards[3] | bitboards[4] | bitboards[5] | bitboards[6]
+    black = bitboards[7] | bitboards[8] | bitboards[9] | bitboards[10] | bitboards[11] | bitboards[12]
+    occupied = white | black
+
+    # the pieces of the player and of the opponent, by kind (1 - pawn ... 6 - king)
+    own = np.where(turns, black, white)
+    enemy = np.where(turns, white, black)
+    mine = [None] + [np.where(turns, bitboards[kind + 6], bitboards[kind]) for kind in range(1, 7)]
+    theirs = [None] + [np.where(turns, bitboards[kind], bitboards[kind + 6]) for kind in range(1, 7)]
+    enemy_lines = theirs[2] | theirs[5]
+    enemy_diagonals = theirs[4] | theirs[5]
+
+    has_king = mine[6] != 0
+    king = np.where(has_king, __lowest_square(mine[6]), 0)
+
+    # the fields the opponent attacks, seen through the king so that it can't step back along a ray
+    danger = __attacked_fields(theirs, occupied & ~mine[6], ~turns)
+
+    # the pieces giving check, and the fields the other pieces have to move to when in check
+    checkers = __attackers(king, occupied, theirs, turns) & np.where(has_king, ALL, np.uint64(0))
+    checks = count_bits(checkers)
+    evasions = np.where(checks == 0, ALL, np.where(checks == 1, checkers | BETWEEN[king, __lowest_square(checkers)],
+                                                   np.uint64(0)))
+
+    # the pieces pinned to the king in every direction, and the fields they may still move to
+    pins = []
+    for tables, sliders in ((ROOK_TABLES, enemy_lines), (BISHOP_TABLES, enemy_diagonals)):
+        for rays, positive in tables:
+            ray = rays[king]
+            blockers = ray & occupied
+            first = __first_bit(blockers, positive)
+            second = __first_bit(blockers & ~first, positive)
+            pinned = np.where(((first & own) != 0) & ((second & sliders) != 0) & has_king, first, np.uint64(0))
+            pins.append((pinned, ray & __up_to(second, positive)))
+
+    targets = np.zeros((count, 64), dtype=np.uint64)
+    for square in range(64):
+        bit = np.uint64(1 << square)
+        piece = flat[:, square]
+        kind = np.where(piece > 6, piece - 6, piece)
+        movable = ((own & bit) != 0) & (kind != 6)
+        if not movable.any():
+            continue
+
+        lines = __slider_attacks(square, occupied, ROOK_TABLES)
+        diagonals = __slider_attacks(square, occupied, BISHOP_TABLES)
+        moves = np.select([kind == 2, kind == 3, kind == 4, kind == 5],
+                          [lines, np.broadcast_to(KNIGHT_TABLE[square], (count,)), diagonals, lines | diagonals],
+                          np.uint64(0))
+        pawn_moves, en_passant_moves = __pawn_moves(square, kind == 1, turns, enemy, occupied, theirs[1], en_passant)
+        moves = (moves | pawn_moves) & ~own & evasions
+
+        for pinned, allowed in pins:
+            moves = np.where((pinned & bit) != 0, moves & allowed, moves)
+
+        # taking en passant removes a pawn which isn't on the target, so it is checked by playing it
+        moves |= __legal_en_passant(square, en_passant_moves, turns, king, has_king, occupied, theirs)
+
+        targets[:, square] = np.where(movable, moves, np.uint64(0))
+
+    # the king steps to fields the opponent doesn't attack, or castles
+    king_moves = KING_TABLE[king] & ~own & ~danger
+    king_moves |= __castling(king, turns, occupied, danger, en_passant)
+    rows = np.nonzero(has_king)[0]
+    targets[rows, king[rows]] = king_moves[rows]
+
+    return targets
+
+"""
+Unpacks target bitboards into flags.
+
+Args:
+    bitboards (ndarray): N x 64 bitboards.
+
+Returns:
+    ndarray: N x 64 x 64 flags.
+"""
+def unpack_bitboards(bitboards):
+    data = np.ascontiguousarray(bitboards, dtype="<u8").view(np.uint8).reshape(len(bitboards), 64, 8)
+    return np.unpackbits(data, axis=2, bitorder="little").astype(bool)
+
+"""
+Packs fields into bitboards.
+
+Args:
+    fields (ndarray): N x 64 flags, line by line.
+
+Returns:
+    ndarray: N bitboards.
+"""
+def pack_bitboards(fields):
+    return np.packbits(fields, axis=1, bitorder="little").view("<u8").reshape(-1).astype(np.uint64)
+
+"""
+Moves every bit of many bitboards by a step, bits leaving the board (also over its sides) are dropped.
+
+Args:
+    bitboards (ndarray): N bitboards.
+    dx (int): Line step.
+    dy (int): Column step.
+
+Returns:
+    ndarray: The moved bitboards.
+"""
+def shift_bitboards(bitboards, dx, dy):
+    amount = dx * 8 + dy
+    if amount > 0:
+        shifted = bitboards << np.uint64(amount)
+    else:
+        shifted = bitboards >> np.uint64(-amount)
+
+    return shifted & COLUMN_MASKS[dy]
+
+"""
+Counts the bits of many bitboards.
+
+Args:
+    bitboards (ndarray): N bitboards.
+
+Returns:
+    ndarray: The number of bits of every bitboard.
+"""
+def count_bits(bitboards):
+    data = np.ascontiguousarray(bitboards, dtype=np.uint64).view(np.uint8)
+    return BIT_COUNTS[data].reshape(-1, 8).sum(axis=1, dtype=np.int32)
+
+"""
+Returns the lowest or the highest bit of many bitboards.
+
+Args:
+    bitboards (ndarray): N bitboards.
+    lowest (bool): The lowest (first on a ray towards higher squares) or the highest bit.
+
+Returns:
+    ndarray: The bit of every bitboard (0 if the bitboard is empty).
+"""
+def __first_bit(bitboards, lowest):
+    if lowest:
+        return bitboards & (~bitboards + np.uint64(1))
+
+    smeared = bitboards
+    for amount in (1, 2, 4, 8, 16, 32):
+        smeared = smeared | (smeared >> np.uint64(amount))
+    return smeared ^ (smeared >> np.uint64(1))
+
+"""
+Returns the squares of a ray up to a bit of it (included), the whole ray if there's no bit.
+
+Args:
+    bits (ndarray): The bit on every ray (0 if none).
+    positive (bool): If the rays go towards higher squares.
+
+Returns:
+    ndarray: The squares of the rays which are kept.
+"""
+def __up_to(bits, positive):
+    if positive:
+        return (bits << np.uint64(1)) - np.uint64(1)
+    return np.where(bits == 0, ALL, ~(bits - np.uint64(1)))
+
+"""
+Returns the square of the lowest bit of many bitboards.
+
+Args:
+    bitboards (ndarray): N bitboards.
+
+Returns:
+    ndarray: The squares (0 for empty bitboards).
+"""
+def __lowest_square(bitboards):
+    bits = __first_bit(bitboards, True)
+    return np.where(bits == 0, 0, np.log2(np.maximum(bits, np.uint64(1)).astype(np.float64))).astype(np.intp)
+
+"""
+Returns the squares attacked by sliding pieces, same as BitboardValidator.slider_attacks.
+
+Args:
+    squares (ndarray): The square of the piece in every position (or the same square for all of them).
+    occupied (ndarray): The occupied squares of every position.
+    tables (list): ROOK_TABLES or BISHOP_TABLES.
+
+Returns:
+    ndarray: The attacked squares, including the first piece met in every direction.
+"""
+def __slider_attacks(squares, occupied, tables):
+    attacks = np.zeros_like(occupied)
+
+    for rays, positive in tables:
+        ray = rays[squares]
+        attacks |= ray & __up_to(__first_bit(ray & occupied, positive), positive)
+
+    return attacks
+
+"""
+Returns the pieces of the opponent attacking a square, same as BitboardValidator.is_attacked.
+
+Args:
+    squares (ndarray): The square in every position.
+    occupied (ndarray): The occupied squares of every position.
+    theirs (list): The pieces of the opponent by kind.
+    turns (ndarray): True where black is the player attacked.
+
+Returns:
+    ndarray: The attacking pieces.
+"""
+def __attackers(squares, occupied, theirs, turns):
+    pawn_attacks = np.where(turns, PAWN_TABLES[1][squares], PAWN_TABLES[0][squares])
+
+    return ((pawn_attacks & theirs[1])
+            | (KNIGHT_TABLE[squares] & theirs[3])
+            | (KING_TABLE[squares] & theirs[6])
+            | (__slider_attacks(squares, occupied, ROOK_TABLES) & (theirs[2] | theirs[5]))
+            | (__slider_attacks(squares, occupied, BISHOP_TABLES) & (theirs[4] | theirs[5])))
+
+"""
+Returns all the fields attacked by the pieces of a player.
+
+Args:
+    pieces (list): The pieces of the player by kind.
+    occupied (ndarray): The occupied squares of every position.
+    turns (ndarray): True where the player is black.
+
+Returns:
+    ndarray: The attacked fields.
+"""
+def __attacked_fields(pieces, occupied, turns):
+    attacks = np.zeros_like(occupied)
+
+    # white pawns take towards the lower squares, black pawns towards the higher squares
+    for dy in (-1, 1):
+        attacks |= np.where(turns, shift_bitboards(pieces[1], 1, dy), shift_bitboards(pieces[1], -1, dy))
+    for dx, dy in KNIGHT_STEPS:
+        attacks |= shift_bitboards(pieces[3], dx, dy)
+    for dx, dy in KING_STEPS:
+        attacks |= shift_bitboards(pieces[6], dx, dy)
+
+    empty = ~occupied
+    for sliders, steps in ((pieces[2] | pieces[5], ROOK_STEPS), (pieces[4] | pieces[5], BISHOP_STEPS)):
+        for dx, dy in steps:
+            ray = sliders
+            for distance in range(7):
+                ray = shift_bitboards(ray, dx, dy)
+                attacks |= ray
+                ray = ray & empty # the ray stops at the first piece it meets
+
+    return attacks
+
+"""
+Returns the moves of the pawns standing on a square, same as BitboardValidator.pseudo_moves.
+
+Args:
+    square (int): The square.
+    pawns (ndarray): Where the piece on the square is a pawn.
+    turns (ndarray): True where black is the player.
+    enemy (ndarray): The pieces of the opponent.
+    occupied (ndarray): The occupied squares of every position.
+    enemy_pawns (ndarray): The pawns of the opponent.
+    en_passant (ndarray): The en passant and castling flags of every position.
+
+Returns:
+    ndarray: The target squares, apart from taking en passant.
+    ndarray: The target squares which take en passant.
+"""
+def __pawn_moves(square, pawns, turns, enemy, occupied, enemy_pawns, en_passant):
+    zero = np.uint64(0)
+    line, column = divmod(square, 8)
+    moves = []
+    en_passant_moves = []
+
+    for turn in range(2):
+        # white pawns move 8 squares down and black pawns 8 squares up, see BitboardValidator.pseudo_moves
+        step = -8 if turn == 0 else 8
+        passing = 3 if turn == 0 else 4
+        start = 6 if turn == 0 else 1
+
+        targets = PAWN_TABLES[turn][square] & enemy
+        if 0 <= square + step < 64:
+            single = np.uint64(1 << (square + step))
+            free = (occupied & single) == 0
+            targets = targets | np.where(free, single, zero)
+            if line == start:
+                double = np.uint64(1 << (square + 2 * step))
+                targets = targets | np.where(free & ((occupied & double) == 0), double, zero)
+
+        passing_targets = np.zeros_like(occupied)
+        if line == passing:
+            for neighbour in (square - 1, square + 1):
+                if neighbour // 8 == passing and 0 <= neighbour < 64:
+                    possible = ((enemy_pawns & np.uint64(1 << neighbour)) != 0) & (en_passant[:, 1 - turn, neighbour % 8 + 1] == 1)
+                    passing_targets = passing_targets | np.where(possible, np.uint64(1 << (neighbour + step)), zero)
+
+        moves.append(targets)
+        en_passant_moves.append(passing_targets)
+
+    is_turn = [pawns & ~turns, pawns & turns]
+    return (np.where(is_turn[0], moves[0], np.where(is_turn[1], moves[1], zero)),
+            np.where(is_turn[0], en_passant_moves[0], np.where(is_turn[1], en_passant_moves[1], zero)))
+
+"""
+Keeps the captures en passant which don't leave the king in check, by playing them.
+
+Args:
+    square (int): The square of the pawns.
+    targets (ndarray): The en passant targets of the pawns (0 where there's none).
+    turns (ndarray): True where black is the player.
+    king (ndarray): The square of the king of the player.
+    has_king (ndarray): Where the player has a king.
+    occupied (ndarray): The occupied squares of every position.
+    theirs (list): The pieces of the opponent by kind.
+
+Returns:
+    ndarray: The legal en passant targets.
+"""
+def __legal_en_passant(square, targets, turns, king, has_king, occupied, theirs):
+    legal = np.zeros_like(targets)
+    if not (targets != 0).any():
+        return legal
+
+    for target in (square - 9, square - 7, square + 7, square + 9):
+        if not 0 <= target < 64:
+            continue
+
+        bit = np.uint64(1 << target)
+        # the pawn taken is behind the target, seen by the player
+        captured = np.where(turns, np.uint64(1 << (target - 8)) if target >= 8 else np.uint64(0),
+                            np.uint64(1 << (target + 8)) if target < 56 else np.uint64(0))
+        after = (occupied & ~np.uint64(1 << square) & ~captured) | bit
+        remaining = list(theirs)
+        remaining[1] = theirs[1] & ~captured
+
+        safe = (__attackers(king, after, remaining, turns) == 0) | ~has_king
+        legal |= np.where(((targets & bit) != 0) & safe, bit, np.uint64(0))
+
+    return legal
+
+"""
+Returns the castling moves of the king, same as BitboardValidator.
+
+Args:
+    king (ndarray): The square of the king of the player.
+    turns (ndarray): True where black is the player.
+    occupied (ndarray): The occupied squares of every position.
+    danger (ndarray): The fields attacked by the opponent.
+    en_passant (ndarray): The en passant and castling flags of every position.
+
+Returns:
+    ndarray: The target squares of castling.
+"""
+def __castling(king, turns, occupied, danger, en_passant):
+    color = turns.astype(np.intp)
+    index = np.arange(len(king))
+    moves = np.zeros_like(occupied)
+
+    for (empty, safe), flag, step in ((CASTLING_RIGHT, 9, 2), (CASTLING_LEFT, 0, -2)):
+        possible = ((en_passant[index, color, flag] == 0) & (safe[king] != 0)
+                    & ((occupied & empty[king]) == 0) & ((danger & safe[king]) == 0))
+        moves |= np.where(possible, np.left_shift(np.uint64(1), (king + step).clip(0, 63).astype(np.uint64)),
+                          np.uint64(0))
+
+    return moves
@@ -0,0 +1,509 @@
+"""Script for handling move validation on 64-bit integer bitboards"""
+
+"""
+Drop-in replacement for the move generation in TurnValidator, working on bitboards instead of the 10x10 matrix.
+
+Square conventions:
+    The field (x, y) of the board matrix, with 1 <= x, y <= 8, is the square (x - 1) * 8 + (y - 1),
+    so bit 0 is a8 and bit 63 is h1 (see Board), white's pawns move towards the lower squares
+    and black's pawns towards the higher squares.
+
+Bitboard conventions:
+    bitboards[piece] holds the squares occupied by the pieces with the given value (see Board),
+    bitboards[0] is unused.
+"""
+
+"""
+Builds the ray going from a square (excluding it) towards the edge of the board.
+
+Args:
+    square (int): The square the ray starts from.
+    dx (int): Line step.
+    dy (int): Column step.
+
+Returns:
+    int: Bitboard of the ray.
+"""
+def __build_ray(square, dx, dy):
+    x, y = divmod(square, 8)
+    ray = 0
+
+    x, y = x + dx, y + dy
+    while 0 <= x < 8 and 0 <= y < 8:
+        ray |= 1 << (x * 8 + y)
+        x, y = x + dx, y + dy
+
+    return ray
+
+"""
+Builds the bitboard of the squares reached by a list of single steps from a square.
+
+Args:
+    square (int): The square the steps start from.
+    steps (list): List of (dx, dy) steps.
+
+Returns:
+    int: Bitboard of the reached squares.
+"""
+def __build_jumps(square, steps):
+    x, y = divmod(square, 8)
+    jumps = 0
+
+    for dx, dy in steps:
+        if 0 <= x + dx < 8 and 0 <= y + dy < 8:
+            jumps |= 1 << ((x + dx) * 8 + y + dy)
+
+    return jumps
+
+KNIGHT_STEPS = [(-2, -1), (-2, 1), (2, -1), (2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2)]
+KING_STEPS = [(-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1), (-1, 0)]
+
+KNIGHT_ATTACKS = [__build_jumps(square, KNIGHT_STEPS) for square in range(64)]
+KING_ATTACKS = [__build_jumps(square, KING_STEPS) for square in range(64)]
+# the squares a pawn of the given color captures on
+# (also the squares from which a pawn of the other color attacks the given square)
+PAWN_ATTACKS = [[__build_jumps(square, [(-1, -1), (-1, 1)]) for square in range(64)],
+                [__build_jumps(square, [(1, -1), (1, 1)]) for square in range(64)]]
+
+# each direction is kept with a flag telling if the ray goes towards higher squares,
+# which decides whether the first blocker is the lowest or the highest bit on the ray
+ROOK_DIRECTIONS = [([__build_ray(square, 1, 0) for square in range(64)], True),
+                   ([__build_ray(square, -1, 0) for square in range(64)], False),
+                   ([__build_ray(square, 0, 1) for square in range(64)], True),
+                   ([__build_ray(square, 0, -1) for square in range(64)], False)]
+BISHOP_DIRECTIONS = [([__build_ray(square, 1, 1) for square in range(64)], True),
+                     ([__build_ray(square, 1, -1) for square in range(64)], True),
+                     ([__build_ray(square, -1, 1) for square in range(64)], False),
+                     ([__build_ray(square, -1, -1) for square in range(64)], False)]
+
+# conversion between squares and board coordinates
+SQUARE_COORDS = [(square // 8 + 1, square % 8 + 1) for square in range(64)]
+
+# the line the pawns of each color promote on
+PROMOTION_LINES = [0xFF, 0xFF << 56]
+
+"""
+Converts the board matrix into bitboards.
+
+Args:
+    board (list): Matrix which contains the layout of the game pieces.
+
+Returns:
+    list: 13 bitboards, one for each piece value.
+"""
+def to_bitboards(board):
+    bitboards = [0] * 13
+
+    square = 0
+    for x in range(1, 9):
+        line = board[x]
+        for y in range(1, 9):
+            piece = line[y]
+            if piece != 0:
+                bitboards[piece] |= 1 << square
+            square += 1
+
+    return bitboards
+
+"""
+Returns the squares attacked by a sliding piece.
+
+Args:
+    square (int): The square of the piece.
+    occupied (int): Bitboard of all the occupied squares.
+    directions (list): ROOK_DIRECTIONS or BISHOP_DIRECTIONS.
+
+Returns:
+    int: Bitboard of the attacked squares, including the first piece met in every direction.
+"""
+def slider_attacks(square, occupied, directions):
+    attacks = 0
+
+    for rays, positive in directions:
+        ray = rays[square]
+        blockers = ray & occupied
+        if blockers:
+            if positive:
+                blocker = (blockers & -blockers).bit_length() - 1
+            else:
+                blocker = blockers.bit_length() - 1
+            ray ^= rays[blocker] # cut the ray behind the first blocker
+        attacks |= ray
+
+    return attacks
+
+"""
+Checks if a square is attacked by the pieces of the enemy (same as TurnValidator.attackers_to).
+
+Args:
+    bitboards (list): Bitboards of the position.
+    square (int): The square.
+    enemy (int): Value offset of the enemy pieces (0 for white, 6 for black).
+    occupied (int): Bitboard of all the occupied squares.
+    removed (int): Bitboard of the enemy pieces which have been captured in the meantime.
+
+Returns:
+    bool: If the square is attacked.
+"""
+def is_attacked(bitboards, square, enemy, occupied, removed=0):
+    keep = ~removed
+
+    if PAWN_ATTACKS[1 - enemy // 6][square] & bitboards[enemy + 1] & keep:
+        return True
+
+    if KNIGHT_ATTACKS[square] & bitboards[enemy + 3] & keep:
+        return True
+
+    if KING_ATTACKS[square] & bitboards[enemy + 6] & keep:
+        return True
+
+    queens = bitboards[enemy + 5]
+    rooks = (bitboards[enemy + 2] | queens) & keep
+    if rooks and slider_attacks(square, occupied, ROOK_DIRECTIONS) & rooks:
+        return True
+
+    bishops = (bitboards[enemy + 4] | queens) & keep
+    if bishops and slider_attacks(square, occupied, BISHOP_DIRECTIONS) & bishops:
+        return True
+
+    return False
+
+"""
+Returns the squares a piece can physically move to, the same way TurnValidator.move_matrix does.
+
+Args:
+    bitboards (list): Bitboards of the position.
+    square (int): The square of the piece.
+    en_passant (list): Matrix with 2 lines, each keeping track of where en_passant and castling can be performed.
+
+Returns:
+    int: Bitboard of the target squares.
+    int: Bitboard of the target squares which capture en passant.
+"""
+def pseudo_moves(bitboards, square, en_passant):
+    bit = 1 << square
+    piece = 1
+    while not bitboards[piece] & bit:
+        piece += 1
+
+    turn = 0 if piece < 7 else 1
+    own_offset = 6 * turn
+    enemy_offset = 6 - own_offset
+
+    own = 0
+    for value in range(own_offset + 1, own_offset + 7):
+        own |= bitboards[value]
+    enemy = 0
+    for value in range(enemy_offset + 1, enemy_offset + 7):
+        enemy |= bitboards[value]
+    occupied = own | enemy
+
+    kind = piece - own_offset
+
+    if kind == 1: # pawn
+        targets = PAWN_ATTACKS[turn][square] & enemy
+        # white pawns move 8 squares down, black pawns 8 squares up
+        step = -8 if turn == 0 else 8
+        # the line en passant is performed from, and the line the pawns start on
+        passing = 3 if turn == 0 else 4
+        start = 6 if turn == 0 else 1
+
+        en_passant_targets = 0
+        if square // 8 == passing:
+            line = en_passant[1 - turn]
+            for neighbour in (square - 1, square + 1):
+                if neighbour // 8 == passing and bitboards[enemy_offset + 1] & (1 << neighbour):
+                    if line[neighbour % 8 + 1] == 1: # if en passant is possible
+                        en_passant_targets |= 1 << (neighbour + step)
+        targets |= en_passant_targets
+
+        if not occupied & (1 << (square + step)):
+            targets |= 1 << (square + step)
+            if square // 8 == start and not occupied & (1 << (square + 2 * step)):
+                targets |= 1 << (square + 2 * step)
+
+        return targets, en_passant_targets
+
+    if kind == 3: # knight
+        return KNIGHT_ATTACKS[square] & ~own, 0
+
+    if kind == 2: # rook
+        return slider_attacks(square, occupied, ROOK_DIRECTIONS) & ~own, 0
+
+    if kind == 4: # bishop
+        return slider_attacks(square, occupied, BISHOP_DIRECTIONS) & ~own, 0
+
+    if kind == 5: # queen
+        return ((slider_attacks(square, occupied, ROOK_DIRECTIONS)
+                | slider_attacks(square, occupied, BISHOP_DIRECTIONS)) & ~own), 0
+
+    # king
+    enemy_king = bitboards[enemy_offset + 6]
+    targets = 0
+    steps = KING_ATTACKS[square] & ~own
+    while steps:
+        step = steps & -steps
+        steps ^= step
+        # the king cannot move next to the enemy king
+        if not KING_ATTACKS[step.bit_length() - 1] & enemy_king:
+            targets |= step
+
+    targets |= __castling_moves(bitboards, square, turn, occupied, enemy_offset, en_passant)
+
+    return targets, 0
+
+"""
+Returns the castling moves of the king, the same way as TurnValidator does.
+
+Args:
+    bitboards (list): Bitboards of the position.
+    square (int): The square of the king.
+    turn (int): The color of the king.
+    occupied (int): Bitboard of all the occupied squares.
+    enemy_offset (int): Value offset of the enemy pieces.
+    en_passant (list): Matrix with 2 lines, each keeping track of where en_passant and castling can be performed.
+
+Returns:
+    int: Bitboard of the target squares of castling.
+"""
+def __castling_moves(bitboards, square, turn, occupied, enemy_offset, en_passant):
+    targets = 0
+    column = square % 8
+    line = square - column
+    vacated = occupied & ~(1 << square)
+
+    # castling to the right: the fields between the king and the rook are empty
+    if en_passant[turn][9] == 0 and column + 2 < 8:
+        between = 0
+        for i in range(column + 1, 7):
+            between |= 1 << (line + i)
+
+        if not occupied & between:
+            # none of the fields the king traverses are attacked
+            for i in range(column, column + 3):
+                if is_attacked(bitboards, line + i, enemy_offset, vacated | (1 << (line + i)), 1 << (line + i)):
+                    break
+            else:
+                targets |= 1 << (square + 2)
+
+    # castling to the left
+    if en_passant[turn][0] == 0 and column - 2 >= 0:
+        between = 0
+        for i in range(1, column):
+            between |= 1 << (line + i)
+
+        if not occupied & between:
+            for i in range(column, column - 3, -1):
+                if is_attacked(bitboards, line + i, enemy_offset, vacated | (1 << (line + i)), 1 << (line + i)):
+                    break
+            else:
+                targets |= 1 << (square - 2)
+
+    return targets
+
+"""
+Checks if a move leaves the king of the player who makes it out of check.
+
+Args:
+    bitboards (list): Bitboards of the position.
+    turn (int): Indicates which player makes the move.
+    origin (int): The square the piece moves from.
+    target (int): The square the piece moves to.
+    en_passant_capture (bool): If the move captures en passant.
+
+Returns:
+    bool: If the move is legal.
+"""
+def __is_legal(bitboards, turn, origin, target, en_passant_capture):
+    own_king = 6 + 6 * turn
+    enemy_offset = 6 - 6 * turn
+
+    occupied = 0
+    for value in range(1, 13):
+        occupied |= bitboards[value]
+
+    origin_bit = 1 << origin
+    target_bit = 1 << target
+    removed = target_bit
+    if en_passant_capture:
+        removed = 1 << (target + (8 if turn == 0 else -8)) # the captured pawn is behind the target
+
+    occupied = ((occupied & ~origin_bit) | target_bit) & ~(removed & ~target_bit)
+
+    if bitboards[own_king] & origin_bit:
+        king = target
+    else:
+        king = bitboards[own_king].bit_length() - 1
+        if king < 0: # there's no king to be put in check
+            return True
+
+    return not is_attacked(bitboards, king, enemy_offset, occupied, removed)
+
+"""
+Returns the legal moves of a piece belonging to the player whose turn it is.
+
+Args:
+    bitboards (list): Bitboards of the position.
+    turn (int): Indicates which player makes the next move.
+    square (int): The square of the piece.
+    en_passant (list): Matrix with 2 lines, each keeping track of where en_passant and castling can be performed.
+
+    mask (int): Bitboard of the targets to keep (besides en passant captures), -1 for all of them.
+
+Returns:
+    list: The board coordinates of every legal target.
+"""
+def __legal_targets(bitboards, turn, square, en_passant, mask=-1):
+    targets, en_passant_targets = pseudo_moves(bitboards, square, en_passant)
+    targets &= mask | en_passant_targets
+
+    moves = []
+    while targets:
+        bit = targets & -targets
+        targets ^= bit
+        target = bit.bit_length() - 1
+        if __is_legal(bitboards, turn, square, target, bit & en_passant_targets):
+            moves.append(SQUARE_COORDS[target])
+
+    return moves
+
+"""
+Returns a list of all valid moves for all the pieces belonging to the player.
+
+Args:
+    board (list): Matrix which contains the layout of the game pieces.
+    turn (int): Indicates which player makes the next move.
+    en_passant (list): Matrix with 2 lines, each keeping track of where en_passant and castling can be performed.
+
+Returns:
+    list: All possible moves a player can make, same as TurnValidator.get_all_possible_moves.
+"""
+def get_all_possible_moves(board, turn, en_passant):
+    bitboards = to_bitboards(board)
+    own = 0
+    for value in range(6 * turn + 1, 6 * turn + 7):
+        own |= bitboards[value]
+
+    moves = []
+    while own:
+        bit = own & -own
+        own ^= bit
+        square = bit.bit_length() - 1
+
+        targets = __legal_targets(bitboards, turn, square, en_passant)
+        if len(targets) != 0:
+            moves.append((SQUARE_COORDS[square], targets))
+
+    return moves
+
+"""
+Returns a list of the valid captures and promotions of all the pieces belonging to the player,
+only these targets being checked for legality.
+
+Args:
+    board (list): Matrix which contains the layout of the game pieces.
+    turn (int): Indicates which player makes the next move.
+    en_passant (list): Matrix with 2 lines, each keeping track of where en_passant and castling can be performed.
+
+Returns:
+    list: The captures (en passant included) and promotions, in the format of get_all_possible_moves.
+"""
+def get_all_captures(board, turn, en_passant):
+    bitboards = to_bitboards(board)
+    own_offset = 6 * turn
+    own = 0
+    for value in range(own_offset + 1, own_offset + 7):
+        own |= bitboards[value]
+    enemy = 0
+    for value in range(7 - own_offset, 13 - own_offset):
+        enemy |= bitboards[value]
+
+    moves = []
+    while own:
+        bit = own & -own
+        own ^= bit
+        square = bit.bit_length() - 1
+
+        mask = enemy
+        if bitboards[own_offset + 1] & bit: # pawns also promote by moving straight
+            mask |= PROMOTION_LINES[turn]
+
+        targets = __legal_targets(bitboards, turn, square, en_passant, mask)
+        if len(targets) != 0:
+            moves.append((SQUARE_COORDS[square], targets))
+
+    return moves
+
+"""
+Checks if the player has any valid move, stopping at the first one found.
+
+Args:
+    board (list): Matrix which contains the layout of the game pieces.
+    turn (int): Indicates which player makes the next move.
+    en_passant (list): Matrix with 2 lines, each keeping track of where en_passant and castling can be performed.
+
+Returns:
+    bool: If get_all_possible_moves would return any move.
+"""
+def has_valid_moves(board, turn, en_passant):
+    bitboards = to_bitboards(board)
+    own = 0
+    for value in range(6 * turn + 1, 6 * turn + 7):
+        own |= bitboards[value]
+
+    while own:
+        bit = own & -own
+        own ^= bit
+        square = bit.bit_length() - 1
+
+        targets, en_passant_targets = pseudo_moves(bitboards, square, en_passant)
+        while targets:
+            target = targets & -targets
+            targets ^= target
+            if __is_legal(bitboards, turn, square, target.bit_length() - 1, target & en_passant_targets):
+                return True
+
+    return False
+
+"""
+Returns a list of all valid moves for a given piece belonging to the player whose turn it is.
+
+Args:
+    board (list): Matrix which contains the layout of the game pieces.
+    turn (int): Indicates which player makes the next move.
+    piece_pos (tuple): The position of a piece on the board.
+    en_passant (list): Matrix with 2 lines, each keeping track of where en_passant and castling can be performed.
+
+Returns:
+    list: All possible moves the piece can make.
+"""
+def get_all_valid_moves(board, turn, piece_pos, en_passant):
+    square = (piece_pos[0] - 1) * 8 + piece_pos[1] - 1
+    return __legal_targets(to_bitboards(board), turn, square, en_passant)
+
+"""
+Checks if a given move of a piece belonging to the player whose turn it is is valid.
+
+Args:
+    board (list): Matrix which contains the layout of the game pieces.
+    turn (int): Indicates which player makes the next move.
+    piece_pos (tuple): The position of a piece on the board.
+    target_pos (tuple): The place where the piece is supposed to move.
+    en_passant (list): Matrix with 2 lines, each keeping track of where en_passant and castling can be performed.
+
+Returns:
+    bool: If the move is valid.
+"""
+def is_valid_move(board, turn, piece_pos, target_pos, en_passant):
+    bitboards = to_bitboards(board)
+    square = (piece_pos[0] - 1) * 8 + piece_pos[1] - 1
+    targets, en_passant_targets = pseudo_moves(bitboards, square, en_passant)
+
+    if not (1 <= target_pos[0] <= 8 and 1 <= target_pos[1] <= 8):
+        return False
+
+    target = (target_pos[0] - 1) * 8 + target_pos[1] - 1
+    if not targets & (1 << target):
+        return False # the piece cannot physically move there
+
+    return __is_legal(bitboards, turn, square, target, en_passant_targets & (1 << target))
@@ -0,0 +1,110 @@
+import collections
+import itertools
+import multiprocessing
+import os
+import sys
+import time
+
+from Scripts.OpeningBook import OpeningBook
+from Scripts.PgnReplay import CHUNK_SIZE, read_games, replay_game, get_start_board
+
+"""Script for building an opening book from the games of PGN archives of any size, without the GUI"""
+
+"""
+Builds an opening book from the commandline arguments and prints a summary.
+
+Args:
+    args (list): The path of the PGN file, followed by the optional settings:
+        output=<file> - the file the book is written to (book.bin by default)
+        workers=<n> - the number of processes replaying games at the same time (all cores by default)
+        plies=<n> - the number of moves of every game going into the book (16 by default)
+        min=<n> - the number of times a move has to be played to go into the book (2 by default)
+"""
+def run_book(args):
+    settings = {
+        "output": "book.bin",
+        "workers": os.cpu_count() or 1,
+        "plies": 16,
+        "min": 2
+    }
+
+    for arg in args[1:]:
+        key, value = arg.split("=", 1) if "=" in arg else (arg, "")
+        if key == "output" and value != "":
+            settings["output"] = value
+        elif key in ("workers", "plies", "min") and value.isdigit():
+            settings[key] = int(value)
+        else:
+            raise Exception("Invalid argument: " + arg)
+
+    workers = max(1, settings["workers"])
+    counts = collections.Counter()
+    games = 0
+    start = time.perf_counter()
+
+    with open(args[0], errors="replace") as file, multiprocessing.Pool(workers) as pool:
+        # the workers count the moves of their chunks, only a few chunks per worker are read ahead
+        pending = collections.deque()
+        reader = read_games(file)
+        chunks = iter(lambda: list(itertools.islice(reader, CHUNK_SIZE)), [])
+
+        for chunk in chunks:
+            pending.append(pool.apply_async(count_moves, ((chunk, settings["plies"]),)))
+
+            if len(pending) >= 4 * workers:
+                games += __add_counts(counts, pending.popleft().get())
+
+        while pending:
+            games += __add_counts(counts, pending.popleft().get())
+
+    records = [(hash, move, weight) for (hash, move), weight in counts.items() if weight >= settings["min"]]
+    OpeningBook.write(settings["output"], records)
+
+    elapsed = time.perf_counter() - start
+    print("Games: %d (%d workers)" % (games, workers))
+    print("Moves: %d, in the book: %d" % (len(counts), len(records)))
+    print("Time: %.3fs (%.1f games/s)" % (elapsed, games / max(elapsed, 1e-9)))
+    print("Book written to " + settings["output"])
+
+"""
+Adds up the moves counted in a chunk.
+
+Args:
+    counts (Counter): How often every move was played so far.
+    result (tuple): What count_moves gives for the chunk.
+
+Returns:
+    int: The number of games of the chunk.
+"""
+def __add_counts(counts, result):
+    games, chunk_counts = result
+    counts.update(chunk_counts)
+
+    return games
+
+"""
+Counts the moves played in the first plies of a chunk of games (run by the worker processes).
+
+Games with an illegal or ambiguous move only count the moves before it.
+
+Args:
+    task (tuple): The games (see PgnReplay.read_games) and the number of plies of every game to count.
+
+Returns:
+    tuple: The number of games and how often every move (the hash of its position and the packed move) was played.
+"""
+def count_moves(task):
+    games, plies = task
+    counts = collections.Counter()
+
+    for headers, movetext in games:
+        moves, error = replay_game(headers, movetext, plies)
+        if len(moves) == 0:
+            continue
+
+        board = get_start_board(headers)
+        for move in moves:
+            counts[(board.hash, OpeningBook.pack_move(move))] += 1
+            board.make_move(move)
+
+    return len(games), counts
@@ -0,0 +1,150 @@
+import collections
+import itertools
+import multiprocessing
+import os
+import sys
+import time
+
+from Objects.Board import Board
+from Scripts.FunkyLittleComputer import FunkyLittleComputer
+from Scripts.Notation import get_moves, get_move_name
+from Scripts.TurnValidator import is_in_check
+
+"""Script for analysing the positions of an EPD (or FEN) file of any size, without the GUI"""
+
+# positions sent to a worker at once
+CHUNK_SIZE = 64
+
+"""
+Runs the analysis from the commandline arguments and prints a summary.
+
+Every position of the file gives one line of results, in the same order:
+    the position, the number of legal moves, the status (none, check, checkmate or stalemate) and the best move
+    (- if it wasn't searched), separated by tabs. Invalid positions give "error" and the reason instead.
+
+Args:
+    args (list): The path of the file, followed by the optional settings:
+        output=<file> - the file the results are written to (the standard output by default)
+        workers=<n> - the number of processes analysing positions at the same time (all cores by default)
+        best - searches the best move of every position
+        nodes=<n> - the positions the engine may search for the best move (10000 by default)
+"""
+def run_epd(args):
+    settings = {
+        "output": None,
+        "workers": os.cpu_count() or 1,
+        "best": False,
+        "nodes": 10000
+    }
+
+    for arg in args[1:]:
+        key, value = arg.split("=", 1) if "=" in arg else (arg, "")
+        if arg == "best":
+            settings["best"] = True
+        elif key == "output" and value != "":
+            settings["output"] = value
+        elif key in ("workers", "nodes") and value.isdigit():
+            settings[key] = int(value)
+        else:
+            raise Exception("Invalid argument: " + arg)
+
+    workers = max(1, settings["workers"])
+    positions = 0
+    start = time.perf_counter()
+
+    output = open(settings["output"], "w") if settings["output"] is not None else sys.stdout
+    try:
+        with open(args[0]) as file, multiprocessing.Pool(workers) as pool:
+            # only a few chunks per worker are read ahead, so memory stays bounded whatever the size of the file
+            pending = collections.deque()
+            chunks = iter(lambda: list(itertools.islice(file, CHUNK_SIZE)), [])
+
+            for chunk in chunks:
+                pending.append(pool.apply_async(analyse_chunk, (chunk, settings)))
+
+                if len(pending) >= 4 * workers:
+                    positions += __write_results(output, pending.popleft().get())
+
+            while pending:
+                positions += __write_results(output, pending.popleft().get())
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    elapsed = time.perf_counter() - start
+    print("Positions: %d (%d workers)" % (positions, workers), file=sys.stderr)
+    print("Time: %.3fs (%.1f positions/s)" % (elapsed, positions / max(elapsed, 1e-9)), file=sys.stderr)
+
+"""
+Writes the results of a chunk of positions.
+
+Args:
+    output (file): Where the results are written.
+    results (list): The lines of results.
+
+Returns:
+    int: The number of positions written.
+"""
+def __write_results(output, results):
+    for result in results:
+        output.write(result + "\n")
+    output.flush()
+
+    return len(results)
+
+"""
+Analyses a chunk of lines of the file (run by the worker processes).
+
+Args:
+    lines (list): Lines of the file, empty lines and lines starting with # are skipped.
+    settings (dict): The settings of the analysis (see run_epd).
+
+Returns:
+    list: One line of results for every position.
+"""
+def analyse_chunk(lines, settings):
+    board = Board()
+    computer = FunkyLittleComputer(time_limit=0, node_limit=settings["nodes"], hash_size_mb=4)
+    results = []
+
+    for line in lines:
+        line = line.strip()
+        if line == "" or line.startswith("#"):
+            continue
+
+        # the position takes the first 4 fields, the rest are EPD operations or FEN move counters
+        position = " ".join(line.split()[:4])
+        # a position which can't be read or analysed gives an error line, the others are still analysed
+        try:
+            board.set_fen(position)
+            results.append(position + "\t" + analyse_position(board, computer if settings["best"] else None))
+        except Exception as error:
+            results.append(position + "\terror\t" + str(error))
+
+    return results
+
+"""
+Analyses a position.
+
+Args:
+    board (Board): Game object containing the position.
+    computer (FunkyLittleComputer): The engine searching the best move, or None.
+
+Returns:
+    str: The number of legal moves, the status and the best move, separated by tabs.
+"""
+def analyse_position(board, computer):
+    moves = get_moves(board)
+    in_check = is_in_check(board.turn, board.get_pieces(), board.en_passant)
+
+    if len(moves) == 0:
+        status = "checkmate" if in_check else "stalemate"
+    else:
+        status = "check" if in_check else "none"
+
+    best = "-"
+    if computer is not None and len(moves) != 0:
+        move = computer.select_a_move(board.get_pieces(), board.turn, board.en_passant)
+        best = get_move_name(board, move)
+
+    return "%d\t%s\t%s" % (len(moves), status, best)
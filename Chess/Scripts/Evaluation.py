@@ -0,0 +1,157 @@
+from Scripts.BitboardValidator import KNIGHT_ATTACKS, ROOK_DIRECTIONS, BISHOP_DIRECTIONS, slider_attacks
+
+"""
+Script for the static evaluation of a position, used by the computer opponent
+(BatchEvaluation scores many positions at once the same way)
+"""
+
+# value of every kind of piece (piece value % 6), the king being invaluable
+PIECE_VALUES = {1: 100, 2: 500, 3: 320, 4: 330, 5: 900, 0: 0}
+
+# bonus for every field a piece of the given kind attacks, which isn't taken by a piece of its own color
+MOBILITY_VALUES = {2: 2, 3: 4, 4: 4, 5: 1}
+
+"""
+Piece-square tables, seen by white (the first line is the 8th rank).
+Bonus for a piece of the given kind standing on a given field.
+"""
+PIECE_SQUARE_TABLES = {
+    # pawn
+    1: [[0, 0, 0, 0, 0, 0, 0, 0],
+        [50, 50, 50, 50, 50, 50, 50, 50],
+        [10, 10, 20, 30, 30, 20, 10, 10],
+        [5, 5, 10, 25, 25, 10, 5, 5],
+        [0, 0, 0, 20, 20, 0, 0, 0],
+        [5, -5, -10, 0, 0, -10, -5, 5],
+        [5, 10, 10, -20, -20, 10, 10, 5],
+        [0, 0, 0, 0, 0, 0, 0, 0]],
+    # rook
+    2: [[0, 0, 0, 0, 0, 0, 0, 0],
+        [5, 10, 10, 10, 10, 10, 10, 5],
+        [-5, 0, 0, 0, 0, 0, 0, -5],
+        [-5, 0, 0, 0, 0, 0, 0, -5],
+        [-5, 0, 0, 0, 0, 0, 0, -5],
+        [-5, 0, 0, 0, 0, 0, 0, -5],
+        [-5, 0, 0, 0, 0, 0, 0, -5],
+        [0, 0, 0, 5, 5, 0, 0, 0]],
+    # knight
+    3: [[-50, -40, -30, -30, -30, -30, -40, -50],
+        [-40, -20, 0, 0, 0, 0, -20, -40],
+        [-30, 0, 10, 15, 15, 10, 0, -30],
+        [-30, 5, 15, 20, 20, 15, 5, -30],
+        [-30, 0, 15, 20, 20, 15, 0, -30],
+        [-30, 5, 10, 15, 15, 10, 5, -30],
+        [-40, -20, 0, 5, 5, 0, -20, -40],
+        [-50, -40, -30, -30, -30, -30, -40, -50]],
+    # bishop
+    4: [[-20, -10, -10, -10, -10, -10, -10, -20],
+        [-10, 0, 0, 0, 0, 0, 0, -10],
+        [-10, 0, 5, 10, 10, 5, 0, -10],
+        [-10, 5, 5, 10, 10, 5, 5, -10],
+        [-10, 0, 10, 10, 10, 10, 0, -10],
+        [-10, 10, 10, 10, 10, 10, 10, -10],
+        [-10, 5, 0, 0, 0, 0, 5, -10],
+        [-20, -10, -10, -10, -10, -10, -10, -20]],
+    # queen
+    5: [[-20, -10, -10, -5, -5, -10, -10, -20],
+        [-10, 0, 0, 0, 0, 0, 0, -10],
+        [-10, 0, 5, 5, 5, 5, 0, -10],
+        [-5, 0, 5, 5, 5, 5, 0, -5],
+        [0, 0, 5, 5, 5, 5, 0, -5],
+        [-10, 5, 5, 5, 5, 5, 0, -10],
+        [-10, 0, 5, 0, 0, 0, 0, -10],
+        [-20, -10, -10, -5, -5, -10, -10, -20]],
+    # king
+    0: [[-30, -40, -40, -50, -50, -40, -40, -30],
+        [-30, -40, -40, -50, -50, -40, -40, -30],
+        [-30, -40, -40, -50, -50, -40, -40, -30],
+        [-30, -40, -40, -50, -50, -40, -40, -30],
+        [-20, -30, -30, -40, -40, -30, -30, -20],
+        [-10, -20, -20, -20, -20, -20, -20, -10],
+        [20, 20, 0, 0, 0, 0, 20, 20],
+        [20, 30, 10, 0, 0, 10, 30, 20]]
+}
+
+"""
+Builds the score of every piece on every field of the board matrix, seen by the player whose turn it is.
+
+Args:
+    turn (int): Indicates which player makes the next move.
+
+Returns:
+    list: 13 lists (one for every piece value) of 100 scores (one for every field, line * 10 + column).
+"""
+def __build_weights(turn):
+    weights = [[0] * 100 for piece in range(13)]
+
+    for piece in range(1, 13):
+        kind = piece % 6
+        color = 0 if piece < 7 else 1
+
+        for i in range(1, 9):
+            for j in range(1, 9):
+                # the field in the table of the piece's color
+                x = i
+                if color == 1:
+                    x = 9 - i
+
+                score = PIECE_VALUES[kind] + PIECE_SQUARE_TABLES[kind][x - 1][j - 1]
+                if color != turn:
+                    score = -score
+
+                weights[piece][i * 10 + j] = score
+
+    return weights
+
+# precomputed scores for both players
+WEIGHTS = [__build_weights(0), __build_weights(1)]
+# mobility bonus of every piece value, seen by the player whose turn it is
+MOBILITY_WEIGHTS = [[MOBILITY_VALUES.get(piece % 6, 0) * (1 if (piece < 7) == (turn == 0) else -1) if piece != 0 else 0
+                     for piece in range(13)] for turn in range(2)]
+
+"""
+Evaluates a position from the point of view of the player whose turn it is:
+material, piece-square tables and the mobility of the knights, bishops, rooks and queens.
+
+Args:
+    board (list): Matrix which contains the layout of the game pieces.
+    turn (int): Indicates which player makes the next move.
+
+Returns:
+    int: The score in centipawns, positive if the player is better.
+"""
+def evaluate(board, turn):
+    weights = WEIGHTS[turn]
+    mobility_weights = MOBILITY_WEIGHTS[turn]
+    score = 0
+
+    occupied = 0
+    own = [0, 0] # the fields taken by the white and by the black pieces
+    movers = []
+    square = 0
+    for i in range(1, 9):
+        line = board[i]
+        for j in range(1, 9):
+            piece = line[j]
+            if piece != 0:
+                score += weights[piece][i * 10 + j]
+                occupied |= 1 << square
+                own[piece // 7] |= 1 << square
+                if mobility_weights[piece] != 0:
+                    movers.append((piece, square))
+            square += 1
+
+    for piece, square in movers:
+        kind = piece % 6
+        if kind == 3:
+            attacks = KNIGHT_ATTACKS[square]
+        elif kind == 4:
+            attacks = slider_attacks(square, occupied, BISHOP_DIRECTIONS)
+        elif kind == 2:
+            attacks = slider_attacks(square, occupied, ROOK_DIRECTIONS)
+        else:
+            attacks = slider_attacks(square, occupied, ROOK_DIRECTIONS) | slider_attacks(square, occupied, BISHOP_DIRECTIONS)
+
+        score += mobility_weights[piece] * (attacks & ~own[piece // 7]).bit_count()
+
+    return score
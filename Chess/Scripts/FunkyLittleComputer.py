@@ -1,22 +1,436 @@
-from Scripts.TurnValidator import get_all_possible_moves
+from Objects.Board import Board
+from Scripts.Evaluation import PIECE_VALUES, evaluate
+from Scripts.OpeningBook import OpeningBook
+from Scripts.Tablebase import Tablebase
+from Scripts.TranspositionTable import TranspositionTable
+from Scripts.TurnValidator import get_all_possible_moves, get_all_captures, gives_check, has_valid_moves
+import concurrent.futures
+import multiprocessing
 import random
+import time
+
+# score of a checkmate, reduced by the number of moves it takes to get there
+MATE = 100000
+
+# the order moves are searched in: the hash move, captures and promotions, killer moves, then the rest by history
+HASH_MOVE_ORDER = 1 << 30
+CAPTURE_ORDER = 1 << 28
+KILLER_ORDER = 1 << 27
+# the history scores are halved once one of them gets this high, staying below the killer moves
+HISTORY_LIMIT = 1 << 26
+
+# how valuable a piece is when ordering captures, by piece value (pawn, knight, bishop, rook, queen, king)
+ORDER_RANKS = [0] + [{1: 1, 3: 2, 4: 3, 2: 4, 5: 5, 0: 6}[value % 6] for value in range(1, 13)]
+
+# a capture in the quiescence search is skipped when even winning this much more than the piece
+# wouldn't raise the score to alpha
+DELTA_MARGIN = 200
 
 class FunkyLittleComputer:
     """Class for handling the computer opponent"""
 
     """
-    From all possible valid moves it selects a random one and returns it.
-    
+    Sets up the computer opponent.
+
+    Args:
+        time_limit (float): Seconds the search of a move may take, 0 for no limit.
+        node_limit (int): Positions the search of a move may visit (quiescence search included), 0 for no limit.
+        max_depth (int): The depth at which iterative deepening stops.
+        hash_size_mb (float): The memory the transposition table may take, in megabytes.
+        book (str): The path of an opening book (see OpeningBook) played from before searching, or None.
+        tablebases (str): The directory of endgame tablebases (see Tablebase) probed during the search, or None.
+        quiescence_limit (int): Positions the quiescence search may visit from a single leaf, 0 for no limit.
+        threads (int): The number of processes searching every move together (Lazy SMP), the helpers being
+            started right away (see close).
+        table (TranspositionTable): A table to use instead of a new one (e.g. one shared with other processes), or None.
+    """
+    def __init__(self, time_limit=0.5, node_limit=0, max_depth=64, hash_size_mb=16, book=None, tablebases=None,
+                 quiescence_limit=1000, threads=1, table=None):
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.max_depth = max_depth
+        self.quiescence_limit = quiescence_limit
+        self.threads = max(1, threads)
+        self.board = Board()
+        # kept between moves, the positions searched for the previous move often come up again,
+        # shared with the helper processes when searching with more than one thread
+        if table is None:
+            table = TranspositionTable(hash_size_mb, shared=self.threads > 1)
+        self.table = table
+        self.book = OpeningBook(book) if book is not None else None
+        self.tablebase = Tablebase(tablebases) if tablebases is not None else None
+
+        # statistics of the last search
+        self.depth = 0
+        self.nodes = 0
+        # positions visited by the quiescence search, not counted in nodes
+        self.quiescence_nodes = 0
+        self.elapsed = 0
+        self.score = 0
+        self.from_book = False
+        # the moves expected to be played from the position searched, the best one first
+        self.principal_variation = []
+        # beta cutoffs, and how many of them the first move searched caused
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        # how often the opponent played the move pondered on, and how often another one
+        self.ponder_hits = 0
+        self.ponder_misses = 0
+
+        # two quiet moves per ply which caused a cutoff, and a score for every quiet move (from field, to field)
+        # of both players, raised whenever it causes a cutoff
+        self.killers = []
+        self.history = [[0] * 10000, [0] * 10000]
+
+        # the helper processes, the queues their positions are sent on and they report on,
+        # and the flag stopping their search
+        self.helpers = []
+        self.__tasks = []
+        self.__results = None
+        self.__stop_flag = None
+        # the thread searching in the background (see start_search), and if stop was called since it started
+        self.__executor = None
+        self.__interrupted = False
+        # the future of the search on the opponent's time and the position it searches (see start_pondering),
+        # the budget not being spent while pondering
+        self.__ponder = None
+        self.__ponder_position = None
+        self.__pondering = False
+
+        # called with the statistics (see get_search_info) after every iteration of the search, if not None
+        self.info_callback = None
+
+        self.__stopped = False
+        self.__start = 0
+        self.__deadline = 0
+        self.__quiescence_budget = 0
+
+        if self.threads > 1:
+            self.__launch_helpers()
+
+    """Stops the background search and the helper processes, and detaches from the shared transposition table."""
+    def close(self):
+        if self.__executor is not None:
+            self.stop()
+            self.__executor.shutdown()
+            self.__executor = None
+
+        for tasks in self.__tasks:
+            tasks.put(None)
+        for helper in self.helpers:
+            helper.join()
+
+        self.helpers = []
+        self.__tasks = []
+        self.table.close()
+
+    """
+    Searches for the best move with negamax, alpha-beta pruning and iterative deepening within the budget,
+    unless the opening book has a move for the position.
+
+    With more than one thread, the helper processes search the same position meanwhile, until this search ends.
+    They only share what they find through the transposition table, which lets this search skip the positions
+    they searched already (Lazy SMP).
+
     Args:
         board (list): Matrix which contains the layout of the game pieces.
         turn (int): Indicates which player makes the next move.
         en_passant (list): Matrix with 2 lines, each keeping track of where en_passant and castling can be performed.
-        
+
     Returns:
         int: 0 if there are no possible moves (game end).
         list: List containing 2 coords (a piece on the board and where it moves).
     """
     def select_a_move(self, board, turn, en_passant):
+        self.board.set_position(board, turn, en_passant)
+        moves = self.__get_moves()
+        if len(moves) == 0:
+            return 0
+
+        start = time.perf_counter()
+        self.from_book = False
+        if self.book is not None:
+            move = self.book.choose_move(self.board.hash)
+            # a move of another position with the same hash can't be played
+            if move != 0 and (move[0], move[1]) in moves:
+                self.from_book = True
+                self.nodes = self.quiescence_nodes = self.depth = self.score = 0
+                self.principal_variation = [(move[0], move[1])]
+                self.elapsed = time.perf_counter() - start
+                return [move[0], move[1]]
+
+        # positions the tablebases cover are played perfectly without searching
+        if self.tablebase is not None and self.tablebase.probe(self.board.pieces, self.board.turn) != 0:
+            move, score = self.__select_tablebase_move(moves)
+            if move != 0:
+                self.nodes = self.quiescence_nodes = self.depth = 0
+                self.score = score
+                self.principal_variation = [move]
+                self.elapsed = time.perf_counter() - start
+                return [move[0], move[1]]
+
+        self.__start = start
+        self.__deadline = start + self.time_limit
+        if self.threads > 1:
+            self.__start_helpers(board, turn, en_passant)
+
+        best_move = self.__iterative_deepening(moves, 1)
+
+        if self.threads > 1:
+            self.__stop_helpers()
+
+        self.elapsed = time.perf_counter() - start
+
+        return [best_move[0], best_move[1]]
+
+    """
+    Starts searching for a move in a background thread (see select_a_move), so that the caller keeps running.
+
+    Args:
+        board (list): Matrix which contains the layout of the game pieces.
+        turn (int): Indicates which player makes the next move.
+        en_passant (list): Matrix with 2 lines, each keeping track of where en_passant and castling can be performed.
+
+    Returns:
+        Future: Gives what select_a_move returns once the search ends, callbacks can be added to it.
+    """
+    def start_search(self, board, turn, en_passant):
+        if self.__executor is None:
+            self.__executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+        self.__interrupted = False
+        # copied right away, the caller may change the position before the search starts
+        return self.__executor.submit(self.select_a_move, [line[:] for line in board], turn,
+                                      [en_passant[0][:], en_passant[1][:]])
+
+    """
+    Stops the search started by start_search (from any thread), the best move found so far being played.
+    The search stops within a few hundred nodes, its future is done then.
+    """
+    def stop(self):
+        self.__interrupted = True
+
+    """
+    Starts searching on the opponent's time, in the background: the move the opponent is expected to play
+    (the best one found by the last search) is made and the position it leads to is searched until
+    finish_pondering is called.
+
+    Args:
+        board (list): Matrix which contains the layout of the game pieces.
+        turn (int): Indicates which player makes the next move (the opponent).
+        en_passant (list): Matrix with 2 lines, each keeping track of where en_passant and castling can be performed.
+
+    Returns:
+        bool: If the search started, i.e. a move of the opponent was expected.
+    """
+    def start_pondering(self, board, turn, en_passant):
+        self.board.set_position(board, turn, en_passant)
+        entry = self.table.probe(self.board.hash)
+        if entry == 0 or entry[3] == 0 or entry[3] not in self.__get_moves():
+            return False
+
+        self.board.make_move(entry[3])
+        self.__ponder_position = ([line[:] for line in self.board.pieces], self.board.turn,
+                                  [self.board.en_passant[0][:], self.board.en_passant[1][:]])
+        self.__pondering = True
+        self.__ponder = self.start_search(*self.__ponder_position)
+
+        return True
+
+    """
+    Searches for a move once the opponent has moved, like start_search.
+
+    If the opponent played the move pondered on, the search on the opponent's time simply goes on with the usual
+    budget from now on, keeping all it found. Otherwise it is stopped and a new search is started
+    (what it stored in the transposition table is kept either way).
+
+    Args:
+        board (list): Matrix which contains the layout of the game pieces.
+        turn (int): Indicates which player makes the next move.
+        en_passant (list): Matrix with 2 lines, each keeping track of where en_passant and castling can be performed.
+
+    Returns:
+        Future: Gives what select_a_move returns once the search ends.
+    """
+    def finish_pondering(self, board, turn, en_passant):
+        ponder = self.__ponder
+        if ponder is None:
+            return self.start_search(board, turn, en_passant)
+        self.__ponder = None
+
+        if (board, turn, en_passant) == self.__ponder_position:
+            self.ponder_hits += 1
+            self.__deadline = time.perf_counter() + self.time_limit
+            self.__pondering = False
+            return ponder
+
+        self.ponder_misses += 1
+        self.stop()
+        ponder.result()
+        self.__pondering = False
+
+        return self.start_search(board, turn, en_passant)
+
+    """
+    Searches a position for another process until its stop flag is set, the results only going into the
+    transposition table they share (see select_a_move). Run by the helper processes.
+
+    Args:
+        board (list): Matrix which contains the layout of the game pieces.
+        turn (int): Indicates which player makes the next move.
+        en_passant (list): Matrix with 2 lines, each keeping track of where en_passant and castling can be performed.
+        stop_flag (Event): Set once the search has to stop.
+        first_depth (int): The depth iterative deepening starts at, so that the processes don't all search alike.
+    """
+    def help_search(self, board, turn, en_passant, stop_flag, first_depth):
+        self.board.set_position(board, turn, en_passant)
+        moves = self.__get_moves()
+        if len(moves) == 0:
+            self.nodes = self.quiescence_nodes = 0
+            return
+
+        self.__stop_flag = stop_flag
+        self.__iterative_deepening(moves, first_depth)
+
+    """
+    Searches the root position deeper and deeper, until the budget is spent or the stop flag is set.
+
+    Args:
+        moves (list): The moves of the root position.
+        first_depth (int): The depth of the first iteration.
+
+    Returns:
+        tuple: The best move found.
+    """
+    def __iterative_deepening(self, moves, first_depth):
+        self.__stopped = False
+        self.nodes = 0
+        self.quiescence_nodes = 0
+        self.depth = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+        # the killer moves only fit the position they were found in, the history ages between moves
+        self.killers = [[0, 0] for i in range(self.max_depth + 1)]
+        for history in self.history:
+            history[:] = [score >> 1 for score in history]
+
+        moves = self.__order_moves(moves, 0, 0)
+        best_move = moves[0]
+        self.principal_variation = [best_move]
+        depth = first_depth
+        while depth <= self.max_depth:
+            # search the best move of the previous iteration first
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+
+            move, score = self.__search_root(moves, depth)
+            if self.__stopped:
+                break
+
+            best_move, self.score, self.depth = move, score, depth
+            self.principal_variation = self.__get_principal_variation(best_move, depth)
+            if self.info_callback is not None:
+                self.elapsed = time.perf_counter() - self.__start
+                self.info_callback(self.get_search_info())
+
+            # no need to look further once a forced mate is found
+            if abs(score) >= MATE - depth:
+                break
+
+            depth += 1
+
+        return best_move
+
+    """
+    Follows the best moves stored in the transposition table from the root position.
+
+    Args:
+        move (tuple): The best move of the root position.
+        depth (int): The maximum number of moves followed.
+
+    Returns:
+        list: The moves, the first one being the given one.
+    """
+    def __get_principal_variation(self, move, depth):
+        variation = [move]
+        undos = [self.board.make_move(move)]
+
+        while len(variation) < depth:
+            entry = self.table.probe(self.board.hash)
+            # a position with the same hash may have stored a move which can't be played here
+            if entry == 0 or entry[3] == 0 or entry[3] not in self.__get_moves():
+                break
+
+            variation.append(entry[3])
+            undos.append(self.board.make_move(entry[3]))
+
+        for undo in reversed(undos):
+            self.board.unmake_move(undo)
+
+        return variation
+
+    """
+    Starts the helper processes, which wait for positions to search.
+
+    They are started by the thread creating the computer opponent rather than by a background search (see start_search):
+    a process forked while another thread holds a lock, e.g. the one of the standard input, could never take it.
+    """
+    def __launch_helpers(self):
+        self.__results = multiprocessing.Queue()
+        self.__stop_flag = multiprocessing.Event()
+        settings = {
+            "max_depth": self.max_depth,
+            "hash_size_mb": self.table.buckets * 2 * TranspositionTable.ENTRY_SIZE / (1024 * 1024),
+            "table": self.table.name,
+            "tablebases": self.tablebase.directory if self.tablebase is not None else None,
+            "quiescence_limit": self.quiescence_limit
+        }
+
+        for index in range(1, self.threads):
+            tasks = multiprocessing.Queue()
+            helper = multiprocessing.Process(target=run_search_worker,
+                                             args=(index, settings, tasks, self.__results, self.__stop_flag),
+                                             daemon=True)
+            helper.start()
+            self.helpers.append(helper)
+            self.__tasks.append(tasks)
+
+    """
+    Sends the root position to the helper processes.
+
+    Args:
+        board (list): Matrix which contains the layout of the game pieces.
+        turn (int): Indicates which player makes the next move.
+        en_passant (list): Matrix with 2 lines, each keeping track of where en_passant and castling can be performed.
+    """
+    def __start_helpers(self, board, turn, en_passant):
+        self.__stop_flag.clear()
+        for tasks in self.__tasks:
+            tasks.put((board, turn, en_passant))
+
+    """Stops the search of the helper processes and adds the positions they visited to the statistics."""
+    def __stop_helpers(self):
+        self.__stop_flag.set()
+
+        for helper in self.helpers:
+            nodes, quiescence_nodes = self.__results.get()
+            self.nodes += nodes
+            self.quiescence_nodes += quiescence_nodes
+
+    """
+    From all possible valid moves it selects a random one and returns it.
+
+    Args:
+        board (list): Matrix which contains the layout of the game pieces.
+        turn (int): Indicates which player makes the next move.
+        en_passant (list): Matrix with 2 lines, each keeping track of where en_passant and castling can be performed.
+
+    Returns:
+        int: 0 if there are no possible moves (game end).
+        list: List containing 2 coords (a piece on the board and where it moves).
+    """
+    def select_a_random_move(self, board, turn, en_passant):
         moves = get_all_possible_moves(board, turn, en_passant)
         if len(moves) == 0:
             return 0
@@ -27,4 +441,483 @@ class FunkyLittleComputer:
         rand = random.random() * 100000
         target = piece[1][int(rand % len(piece[1]))]
 
-        return [piece[0], target]
\ No newline at end of file
+        return [piece[0], target]
+
+    """
+    Returns the statistics of the last search.
+
+    Returns:
+        dict: The depth reached, the nodes searched by the main and by the quiescence search (in all the processes
+            when searching with more than one thread), the time taken,
+            the nodes per second (both searches together), the score,
+            the hit rate of the transposition table, if the move came from the opening book,
+            the number of tablebase hits, how many of the beta cutoffs the first move searched caused,
+            the ponder hits and misses so far and the principal variation.
+    """
+    def get_search_info(self):
+        return {
+            "depth": self.depth,
+            "nodes": self.nodes,
+            "quiescence_nodes": self.quiescence_nodes,
+            "time": self.elapsed,
+            "nps": int((self.nodes + self.quiescence_nodes) / max(self.elapsed, 1e-9)),
+            "score": self.score,
+            "hash_hit_rate": self.table.get_stats()["hit_rate"],
+            "book": self.from_book,
+            "tablebase_hits": self.tablebase.hits if self.tablebase is not None else 0,
+            "first_move_cutoff_rate": self.first_move_cutoffs / max(self.cutoffs, 1),
+            "ponder_hits": self.ponder_hits,
+            "ponder_misses": self.ponder_misses,
+            "pv": self.principal_variation
+        }
+
+    """
+    Searches all the moves of the root position to a given depth.
+
+    Args:
+        moves (list): The moves of the root position.
+        depth (int): The depth of the search.
+
+    Returns:
+        tuple: The best move and its score (meaningless if the search was stopped).
+    """
+    def __search_root(self, moves, depth):
+        alpha = -MATE - 1
+        best_move = moves[0]
+
+        for move in moves:
+            undo = self.board.make_move(move)
+            in_check = gives_check(self.board.turn, self.board.pieces, move)
+            score = -self.__negamax(depth - 1, -MATE - 1, -alpha, 1, in_check)
+            self.board.unmake_move(undo)
+
+            if self.__stopped:
+                break
+
+            if score > alpha:
+                alpha = score
+                best_move = move
+
+        if not self.__stopped:
+            self.table.store(self.board.hash, depth, TranspositionTable.EXACT, alpha, best_move)
+
+        return best_move, alpha
+
+    """
+    Negamax search with alpha-beta pruning.
+
+    Args:
+        depth (int): The remaining depth.
+        alpha (int): The score the player whose turn it is is already guaranteed.
+        beta (int): The score the opponent is already guaranteed.
+        ply (int): The distance from the root.
+        in_check (bool): If the player whose turn it is is in check, as found when making the last move.
+
+    Returns:
+        int: The score of the position, seen by the player whose turn it is.
+    """
+    def __negamax(self, depth, alpha, beta, ply, in_check):
+        self.nodes += 1
+        if self.nodes % 256 == 0:
+            self.__check_budget()
+        if self.__stopped:
+            return 0
+
+        board = self.board
+        if self.tablebase is not None:
+            result = self.tablebase.probe(board.pieces, board.turn)
+            if result != 0:
+                return self.__score_from_tablebase(result, ply)
+
+        if depth == 0:
+            # the leaves are searched further until the captures and promotions are played out
+            self.__quiescence_budget = self.quiescence_limit
+            return self.__quiescence(alpha, beta, ply, in_check)
+
+        # use what is known about the position from an earlier search
+        hash_move = 0
+        entry = self.table.probe(board.hash)
+        if entry != 0:
+            entry_depth, bound, score, hash_move = entry
+            if entry_depth >= depth:
+                score = self.__score_from_table(score, ply)
+                if (bound == TranspositionTable.EXACT
+                    or bound == TranspositionTable.LOWER and score >= beta
+                    or bound == TranspositionTable.UPPER and score <= alpha):
+                    return score
+
+        moves = self.__get_moves()
+        if len(moves) == 0:
+            if in_check:
+                return -MATE + ply # check mate
+            return 0 # stalemate
+
+        moves = self.__order_moves(moves, hash_move, ply)
+
+        original_alpha = alpha
+        best_score = -MATE - 1
+        best_move = 0
+        for index, move in enumerate(moves):
+            undo = board.make_move(move)
+            score = -self.__negamax(depth - 1, -beta, -alpha, ply + 1, gives_check(board.turn, board.pieces, move))
+            board.unmake_move(undo)
+
+            if score > best_score:
+                best_score = score
+                best_move = move
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                self.cutoffs += 1
+                if index == 0:
+                    self.first_move_cutoffs += 1
+                if self.__get_capture_order(move) == 0:
+                    self.__store_quiet_cutoff(move, depth, ply)
+                break
+
+        if self.__stopped:
+            return 0
+
+        if best_score <= original_alpha:
+            bound = TranspositionTable.UPPER
+        elif best_score >= beta:
+            bound = TranspositionTable.LOWER
+        else:
+            bound = TranspositionTable.EXACT
+        self.table.store(board.hash, depth, bound, self.__score_to_table(best_score, ply), best_move)
+
+        return best_score
+
+    """
+    Searches only the captures and promotions of a leaf, so that it isn't scored in the middle of a trade.
+
+    The player whose turn it is may also stand pat, i.e. keep the static score instead of taking anything.
+    Captures which can't raise the score to alpha even winning DELTA_MARGIN more than the piece taken
+    are skipped (delta pruning), and the position is scored statically once the budget of the leaf is spent.
+    A player in check can't stand pat, all its moves are searched instead, so check mates are found;
+    a position without captures is checked for stalemate before its static score is returned.
+
+    Args:
+        alpha (int): The score the player whose turn it is is already guaranteed.
+        beta (int): The score the opponent is already guaranteed.
+        ply (int): The distance from the root.
+        in_check (bool): If the player whose turn it is is in check, as found when making the last move.
+
+    Returns:
+        int: The score of the position, seen by the player whose turn it is.
+    """
+    def __quiescence(self, alpha, beta, ply, in_check):
+        self.quiescence_nodes += 1
+        self.__quiescence_budget -= 1
+        if self.quiescence_nodes % 256 == 0:
+            self.__check_budget()
+        if self.__stopped:
+            return 0
+
+        board = self.board
+        if in_check:
+            return self.__quiescence_evasions(alpha, beta, ply)
+
+        stand_pat = evaluate(board.pieces, board.turn)
+        # the budget runs out once for the whole leaf, the positions searched after it aren't searched further
+        if stand_pat >= beta or self.quiescence_limit > 0 and self.__quiescence_budget <= 0:
+            return stand_pat
+
+        moves = self.__get_moves(get_all_captures)
+        if len(moves) == 0:
+            # the static score is all there is, unless the player can't move at all
+            if not has_valid_moves(board.pieces, board.turn, board.en_passant):
+                return 0 # stalemate
+            return stand_pat
+
+        if stand_pat > alpha:
+            alpha = stand_pat
+        moves.sort(key=self.__get_capture_order, reverse=True)
+
+        best_score = stand_pat
+        for move in moves:
+            (i, j), (x, y) = move
+            if board.pieces[i][j] % 6 != 1 or (x != 1 and x != 8): # promotions are never pruned
+                # en passant is the only capture landing on an empty field
+                victim = board.pieces[x][y] if board.pieces[x][y] != 0 else 1
+                if stand_pat + PIECE_VALUES[victim % 6] + DELTA_MARGIN <= alpha:
+                    continue
+
+            undo = board.make_move(move)
+            score = -self.__quiescence(-beta, -alpha, ply + 1, gives_check(board.turn, board.pieces, move))
+            board.unmake_move(undo)
+
+            if score > best_score:
+                best_score = score
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+
+        return best_score
+
+    """
+    Searches all the moves of a position in check reached by the quiescence search.
+
+    Args:
+        alpha (int): The score the player whose turn it is is already guaranteed.
+        beta (int): The score the opponent is already guaranteed.
+        ply (int): The distance from the root.
+
+    Returns:
+        int: The score of the position, seen by the player whose turn it is.
+    """
+    def __quiescence_evasions(self, alpha, beta, ply):
+        board = self.board
+        moves = self.__get_moves()
+        if len(moves) == 0:
+            return -MATE + ply # check mate
+        if self.quiescence_limit > 0 and self.__quiescence_budget <= 0:
+            return evaluate(board.pieces, board.turn)
+
+        best_score = -MATE - 1
+        for move in sorted(moves, key=self.__get_capture_order, reverse=True):
+            undo = board.make_move(move)
+            score = -self.__quiescence(-beta, -alpha, ply + 1, gives_check(board.turn, board.pieces, move))
+            board.unmake_move(undo)
+
+            if score > best_score:
+                best_score = score
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+
+        return best_score
+
+    """
+    Sorts moves so that the ones most likely to cause a cutoff are searched first: the hash move,
+    captures and promotions by most valuable victim / least valuable attacker, the killer moves of the ply,
+    then the rest by their history score.
+
+    Args:
+        moves (list): The moves of the position.
+        hash_move (tuple): The best move found for the position earlier, or 0.
+        ply (int): The distance from the root.
+
+    Returns:
+        list: The moves, sorted.
+    """
+    def __order_moves(self, moves, hash_move, ply):
+        killers = self.killers[ply]
+        history = self.history[self.board.turn]
+        scores = []
+
+        for move in moves:
+            if move == hash_move:
+                scores.append(HASH_MOVE_ORDER)
+                continue
+
+            order = self.__get_capture_order(move)
+            if order != 0:
+                scores.append(CAPTURE_ORDER + order)
+            elif move == killers[0]:
+                scores.append(KILLER_ORDER + 1)
+            elif move == killers[1]:
+                scores.append(KILLER_ORDER)
+            else:
+                scores.append(history[self.__get_history_index(move)])
+
+        # the sort is stable, so moves scoring the same keep their order
+        return [move for score, move in sorted(zip(scores, moves), key=lambda pair: pair[0], reverse=True)]
+
+    """
+    Orders a capture or a promotion by most valuable victim / least valuable attacker.
+
+    Args:
+        move (tuple): The move, not made yet.
+
+    Returns:
+        int: The higher the earlier the move is searched, 0 for a quiet move.
+    """
+    def __get_capture_order(self, move):
+        pieces = self.board.pieces
+        (i, j), (x, y) = move
+        piece = pieces[i][j]
+        # the rank of the piece taken (see ORDER_RANKS), plus that of a queen for a promotion
+        rank = ORDER_RANKS[pieces[x][y]]
+
+        if piece % 6 == 1:
+            if j != y and pieces[x][y] == 0: # en passant takes a pawn
+                rank = ORDER_RANKS[1]
+            if x == 1 or x == 8:
+                rank += ORDER_RANKS[5]
+
+        if rank == 0:
+            return 0
+        return 8 * rank - ORDER_RANKS[piece]
+
+    """
+    Remembers a quiet move which caused a cutoff, as a killer move of its ply and in the history.
+
+    Args:
+        move (tuple): The move.
+        depth (int): The remaining depth of the position it was played in.
+        ply (int): The distance from the root.
+    """
+    def __store_quiet_cutoff(self, move, depth, ply):
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+
+        history = self.history[self.board.turn]
+        index = self.__get_history_index(move)
+        # deeper cutoffs save more work, so they count more
+        history[index] += depth * depth
+        if history[index] >= HISTORY_LIMIT:
+            history[:] = [score >> 1 for score in history]
+
+    """
+    Returns where a move is kept in the history (one score for every from field and to field).
+
+    Args:
+        move (tuple): The move.
+
+    Returns:
+        int: The index of the move.
+    """
+    def __get_history_index(self, move):
+        (i, j), (x, y) = move
+        return i * 1000 + j * 100 + x * 10 + y
+
+    """
+    Chooses the move of the root position leading to the best tablebase result.
+
+    Args:
+        moves (list): The moves of the root position.
+
+    Returns:
+        tuple: The best move (0 if a position it leads to isn't covered) and its score.
+    """
+    def __select_tablebase_move(self, moves):
+        best_move = 0
+        best_score = -MATE - 1
+
+        for move in moves:
+            undo = self.board.make_move(move)
+            result = self.tablebase.probe(self.board.pieces, self.board.turn)
+            self.board.unmake_move(undo)
+
+            if result == 0:
+                return 0, 0
+
+            score = -self.__score_from_tablebase(result, 1)
+            if score > best_score:
+                best_move = move
+                best_score = score
+
+        return best_move, best_score
+
+    """
+    Converts a tablebase result to a score, mate scores counting from the root.
+
+    Args:
+        result (tuple): The result for the player whose turn it is and the plies to mate (see Tablebase.probe).
+        ply (int): The distance from the root.
+
+    Returns:
+        int: The score of the position, seen by the player whose turn it is.
+    """
+    def __score_from_tablebase(self, result, ply):
+        outcome, plies = result
+        if outcome == 1:
+            return MATE - ply - plies
+        if outcome == -1:
+            return -MATE + ply + plies
+        return 0
+
+    """
+    Converts a score to be stored in the transposition table, mate scores counting from the position itself.
+
+    Args:
+        score (int): The score, mate scores counting from the root.
+        ply (int): The distance from the root.
+
+    Returns:
+        int: The score to be stored.
+    """
+    def __score_to_table(self, score, ply):
+        if score > MATE - 1000:
+            return score + ply
+        if score < -MATE + 1000:
+            return score - ply
+        return score
+
+    """
+    Converts a score from the transposition table back, mate scores counting from the root.
+
+    Args:
+        score (int): The stored score.
+        ply (int): The distance from the root.
+
+    Returns:
+        int: The score, mate scores counting from the root.
+    """
+    def __score_from_table(self, score, ply):
+        if score > MATE - 1000:
+            return score - ply
+        if score < -MATE + 1000:
+            return score + ply
+        return score
+
+    """
+    Returns the moves of the player whose turn it is, pawns promoting to a queen.
+
+    Args:
+        generator (function): get_all_possible_moves, or get_all_captures for the captures and promotions only.
+
+    Returns:
+        list: Moves which can be given to Board.make_move.
+    """
+    def __get_moves(self, generator=get_all_possible_moves):
+        moves = []
+
+        for piece_pos, targets in generator(self.board.pieces, self.board.turn, self.board.en_passant):
+            for target_pos in targets:
+                moves.append((piece_pos, target_pos))
+
+        return moves
+
+    """
+    Stops the search when the time or node budget is spent (not while pondering), when stop is called
+    or another process sets the stop flag.
+    """
+    def __check_budget(self):
+        if self.__interrupted:
+            self.__stopped = True
+        if self.__stop_flag is not None and self.__stop_flag.is_set():
+            self.__stopped = True
+        if self.__pondering:
+            return
+        if self.time_limit > 0 and time.perf_counter() >= self.__deadline:
+            self.__stopped = True
+        if self.node_limit > 0 and self.nodes + self.quiescence_nodes >= self.node_limit:
+            self.__stopped = True
+
+"""
+Runs a helper process of a computer opponent searching with more than one thread (see FunkyLittleComputer.help_search).
+
+Args:
+    index (int): The number of the helper, from 1.
+    settings (dict): The settings of the computer opponent and the name of its shared transposition table.
+    tasks (Queue): The positions to search, None once the helper has to exit.
+    results (Queue): The number of positions visited by the main and by the quiescence search, once a search stops.
+    stop_flag (Event): Set once the search of a position has to stop.
+"""
+def run_search_worker(index, settings, tasks, results, stop_flag):
+    table = TranspositionTable(settings["hash_size_mb"], name=settings["table"])
+    computer = FunkyLittleComputer(time_limit=0, max_depth=settings["max_depth"], tablebases=settings["tablebases"],
+                                   quiescence_limit=settings["quiescence_limit"], table=table)
+
+    for task in iter(tasks.get, None):
+        # every other helper searches one ply deeper, so that the helpers don't all search alike
+        computer.help_search(*task, stop_flag, 1 + index % 2)
+        results.put((computer.nodes, computer.quiescence_nodes))
+
+    table.close()
@@ -1,6 +1,5 @@
 import pygame
-from Scripts.TurnValidator import move_matrix, is_in_check, is_valid_move, get_all_valid_moves, get_all_possible_moves, \
-    is_same_color
+from Scripts.TurnValidator import move_matrix, is_same_color
 
 """Script for handling all GUI operations"""
 
@@ -19,6 +18,15 @@ def setup_display():
     FPS = 60
     return display, clock, FPS
 
+"""
+Shows a text in the title of the window.
+
+Args:
+    text (str): The text, nothing is shown next to the title if empty.
+"""
+def show_caption(text):
+    pygame.display.set_caption("Chess - " + text if text != "" else "Chess")
+
 """
 Loads the images into objects and adjusts the scale.
 
@@ -81,8 +89,41 @@ def load_assets():
 
     return pieces, index, misc
 
+"""
+Converts a field of the board to the field it is shown on, or the other way around.
+The board is shown as seen by one of the players, so it is turned around for black.
+
+Args:
+    perspective (int): The player the board is shown to (0 for white, 1 for black).
+    field (tuple): Coordinates of a field on the board (or on the screen).
+
+Returns:
+    tuple: Coordinates of the field on the screen (or on the board).
+"""
+def view_field(perspective, field):
+    if perspective == 1:
+        return 9 - field[0], 9 - field[1]
+
+    return field
+
+"""
+Sets up what draw_board remembers between frames, so that a frame only redraws what changed since the last one.
+
+Returns:
+    dict: The cached layers and the overlays of the last frame.
+"""
+def create_frame():
+    return {
+        "backgrounds": {}, # the board and its indexes, for every orientation of the board
+        "scene": None, # the background with the pieces and indicators of the position
+        "version": -1, # the version of the board the scene was drawn for
+        "perspective": -1, # the player the scene was drawn for
+        "overlays": [] # the highlights drawn over the scene in the last frame
+    }
+
 """
 Draws the game board upon being given a game state.
+The position is only drawn again after a move, otherwise only the highlights that changed are drawn.
 
 Args:
     pieces (list): List containing game assets representing game pieces.
@@ -90,32 +131,45 @@ Args:
     misc (list): List containing game assets representing miscellaneous assets.
     display (Surface): Pygame object which represents the display itself.
     board (Board): Game object containing information about the game state.
-    turn (int): Indicates which player makes the next move.
+    legality (LegalityCache): The legal moves and check status of the position on the board.
     mouse_pos (tuple): The position of the mouse.
     selected (tuple): Coordinates of the selected piece or (0, 0) if no piece is selected.
-    en_passant (list): Matrix with 2 lines, each keeping track of where en_passant and castling can be performed.
+    promotion (tuple): Coordinates of the field the selected pawn promotes on, or (0, 0) if none.
+    perspective (int): The player the board is shown to (0 for white, 1 for black).
+    interactive (bool): Whether the pieces can be moved, the mouse interaction being drawn only then.
+    frame (dict): The state of the last frame (see create_frame).
+
+Returns:
+    list: The areas of the display that changed, to be given to pygame.display.update.
 """
-def draw_board(pieces, index, misc, display, board, turn, mouse_pos, selected, en_passant):
-    __draw_game_board(board, display, index)
-    __draw_gameplay_elements(board, display, pieces, misc, turn, en_passant)
-
-    # if the game has ended, don't draw the mouse interaction
-    if (is_in_check(turn, board.get_pieces(), en_passant)
-        and len(get_all_possible_moves(board.get_pieces(), turn, en_passant)) == 0):
-            __draw_game_end(display, turn, misc) # check mate
-    elif len(get_all_possible_moves(board.get_pieces(), turn, en_passant)) == 0:
-        display.blit(misc[7], (0, 4 * 96)) # stalemate
+def draw_board(pieces, index, misc, display, board, legality, mouse_pos, selected, promotion, perspective, interactive, frame):
+    dirty = []
+
+    # the pieces and the indicators only change after a move, or when the board is turned around
+    if frame["version"] != board.get_version() or frame["perspective"] != perspective:
+        frame["scene"] = __draw_scene(board, display, pieces, index, misc, legality, frame["backgrounds"], perspective)
+        frame["version"] = board.get_version()
+        frame["perspective"] = perspective
+        frame["overlays"] = []
+        display.blit(frame["scene"], (0, 0))
+        dirty.append(display.get_rect())
+
+    # if the game has ended or the pieces can't be moved, don't draw the mouse interaction
+    if not interactive or legality.is_check_mate() or legality.is_stalemate():
+        overlays = []
     # if the selected piece is a pawn on promotion
-    elif board.get_pieces()[selected[0]][selected[1]] % 6 == 1 and selected[0] == 1:
+    elif promotion != (0, 0):
         # custom interaction
-        __pawn_promotion_interaction(display,
-                                     mouse_pos,
-                                     pieces,
-                                     selected,
-                                     board.get_pieces()[selected[0]][selected[1]])
+        overlays = __pawn_promotion_interaction(mouse_pos,
+                                                view_field(perspective, selected),
+                                                view_field(perspective, promotion),
+                                                board.get_pieces()[selected[0]][selected[1]])
     else:
         # normal mouse interaction
-        __draw_mouse_interaction(board, display, turn, mouse_pos, selected, en_passant)
+        overlays = __draw_mouse_interaction(board, legality, mouse_pos, selected, perspective)
+
+    dirty += __draw_overlays(display, frame, overlays, pieces)
+    frame["overlays"] = overlays
 
     """tests"""
     #__draw_matrix(board, display)
@@ -123,36 +177,117 @@ def draw_board(pieces, index, misc, display, board, turn, mouse_pos, selected, e
     #print(get_all_valid_moves(board.get_pieces(), turn, (8, 2)))
     #print(get_all_possible_moves(board.get_pieces(), turn))
 
+    return dirty
+
 """
-Custom mouse/GUI interaction for selecting a piece on pawn promotion.
+Draws everything that only changes after a move: the board, the pieces, the indicators and the game end pop-up.
 
 Args:
+    board (Board): Game object containing information about the game state.
     display (Surface): Pygame object which represents the display itself.
-    mouse_pos (tuple): The position of the mouse.
     pieces (list): List containing game assets representing game pieces.
-    selected (tuple): Coordinates of the selected piece or (0, 0) if no piece is selected.
+    index (list): List containing game assets representing the board indexes.
+    misc (list): List containing game assets representing miscellaneous assets.
+    legality (LegalityCache): The legal moves and check status of the position on the board.
+    backgrounds (dict): The board already drawn with its indexes, for every orientation of the board.
+    perspective (int): The player the board is shown to (0 for white, 1 for black).
+
+Returns:
+    Surface: The drawn position.
+"""
+def __draw_scene(board, display, pieces, index, misc, legality, backgrounds, perspective):
+    # the indexes depend on which way the board is turned
+    if perspective not in backgrounds:
+        background = pygame.Surface(display.get_size(), 0, display)
+        __draw_game_board(board, background, index, perspective)
+        backgrounds[perspective] = background
+
+    scene = backgrounds[perspective].copy()
+    __draw_gameplay_elements(board, scene, pieces, misc, legality, perspective)
+
+    if legality.is_check_mate():
+        __draw_game_end(scene, board.get_turn(), misc) # check mate
+    elif legality.is_stalemate():
+        scene.blit(misc[7], (0, 4 * 96)) # stalemate
+
+    return scene
+
+"""
+Draws the highlights of the frame, only where they differ from the last frame.
+
+Highlights are ("rect", area, color, width) for a rectangle (filled if the width is 0)
+and ("piece", area, piece) for a piece image, the area being (x, y, width, height).
+
+Args:
+    display (Surface): Pygame object which represents the display itself.
+    frame (dict): The state of the last frame (see create_frame).
+    overlays (list): The highlights of the frame.
+    pieces (list): List containing game assets representing game pieces.
+
+Returns:
+    list: The areas of the display that changed.
+"""
+def __draw_overlays(display, frame, overlays, pieces):
+    # the areas of the highlights that appeared or disappeared
+    areas = []
+    for overlay in frame["overlays"] + overlays:
+        if (overlay in frame["overlays"]) != (overlay in overlays) and overlay[1] not in areas:
+            areas.append(overlay[1])
+
+    dirty = []
+    for area in areas:
+        rect = pygame.Rect(area)
+        # draw the area again from the scene, with the highlights that overlap it on top
+        display.set_clip(rect)
+        display.blit(frame["scene"], rect, rect)
+        for overlay in overlays:
+            if rect.colliderect(overlay[1]):
+                if overlay[0] == "rect":
+                    pygame.draw.rect(display, overlay[2], pygame.Rect(overlay[1]), overlay[3])
+                else:
+                    display.blit(pieces[overlay[2]], overlay[1])
+        dirty.append(rect)
+    display.set_clip(None)
+
+    return dirty
+
+"""
+Custom mouse/GUI interaction for selecting a piece on pawn promotion.
+
+Args:
+    mouse_pos (tuple): The position of the mouse.
+    selected (tuple): Coordinates of the field the selected pawn is shown on.
+    promotion (tuple): Coordinates of the field the selected pawn promotes on is shown on.
     pawn (int): Value of the selected pawn.
+
+Returns:
+    list: The highlights to draw (see __draw_overlays).
 """
-def __pawn_promotion_interaction(display, mouse_pos, pieces, selected, pawn):
+def __pawn_promotion_interaction(mouse_pos, selected, promotion, pawn):
     yellow = (252, 237, 106)
     green = (106, 252, 143)
 
-    # selected box
-    pygame.draw.rect(display, yellow, pygame.Rect((selected[1] * 96, selected[0] * 96), (96, 96)), 8)
-    # dropdown box
-    pygame.draw.rect(display, yellow, pygame.Rect((selected[1] * 96, 2 * 96), (96, 4 * 96)))
-
-    # draw pieces pawn can promote to
-    display.blit(pieces[pawn + 4], (selected[1] * 96, 2 * 96))
-    display.blit(pieces[pawn + 3], (selected[1] * 96, 3 * 96))
-    display.blit(pieces[pawn + 2], (selected[1] * 96, 4 * 96))
-    display.blit(pieces[pawn + 1], (selected[1] * 96, 5 * 96))
+    overlays = [
+        # selected box
+        ("rect", (selected[1] * 96, selected[0] * 96, 96, 96), yellow, 8),
+        # promotion box
+        ("rect", (promotion[1] * 96, promotion[0] * 96, 96, 96), yellow, 8),
+        # dropdown box
+        ("rect", (promotion[1] * 96, 2 * 96, 96, 4 * 96), yellow, 0),
+        # pieces pawn can promote to
+        ("piece", (promotion[1] * 96, 2 * 96, 96, 96), pawn + 4),
+        ("piece", (promotion[1] * 96, 3 * 96, 96, 96), pawn + 3),
+        ("piece", (promotion[1] * 96, 4 * 96, 96, 96), pawn + 2),
+        ("piece", (promotion[1] * 96, 5 * 96, 96, 96), pawn + 1)
+    ]
 
     i = int(mouse_pos[1] / 96)
     j = int(mouse_pos[0] / 96)
 
-    if j == selected[1] and 1 < i < 6:
-        pygame.draw.rect(display, green, pygame.Rect((j * 96, i * 96), (96, 96)), 8)
+    if j == promotion[1] and 1 < i < 6:
+        overlays.append(("rect", (j * 96, i * 96, 96, 96), green, 8))
+
+    return overlays
 
 """
 Draws the game end pop-up.
@@ -173,49 +308,55 @@ Makes the GUI interactive with the mouse.
 
 Args:
     board (Board): Game object containing information about the game state.
-    display (Surface): Pygame object which represents the display itself.
-    turn (int): Indicates which player makes the next move.
+    legality (LegalityCache): The legal moves and check status of the position on the board.
     mouse_pos (tuple): The position of the mouse.
     selected (tuple): Coordinates of the selected piece or (0, 0) if no piece is selected.
-    en_passant (list): Matrix with 2 lines, each keeping track of where en_passant and castling can be performed.
+    perspective (int): The player the board is shown to (0 for white, 1 for black).
+
+Returns:
+    list: The highlights to draw (see __draw_overlays).
 """
-def __draw_mouse_interaction(board, display, turn, mouse_pos, selected, en_passant):
-    reference = 6 + turn * 6
+def __draw_mouse_interaction(board, legality, mouse_pos, selected, perspective):
+    reference = 6 + board.get_turn() * 6
     green = (106, 252, 143)
     red = (252, 106, 130)
     yellow = (252, 237, 106)
+    overlays = []
 
     if selected != (0,0):
-        pygame.draw.rect(display, yellow, pygame.Rect((selected[1] * 96, selected[0] * 96), (96, 96)), 8)
+        x, y = view_field(perspective, selected)
+        overlays.append(("rect", (y * 96, x * 96, 96, 96), yellow, 8))
 
     layout = board.get_pieces()
-    i = int(mouse_pos[1] / 96)
-    j = int(mouse_pos[0] / 96)
+    hovered = (int(mouse_pos[0] / 96) * 96, int(mouse_pos[1] / 96) * 96, 96, 96)
+    i, j = view_field(perspective, (int(mouse_pos[1] / 96), int(mouse_pos[0] / 96)))
     field = layout[i][j]
 
     # if there is a piece that belongs to the player and isn't selected
     if field != 0 and is_same_color(reference, field) and (i, j) != selected:
         # if the piece has valid moves
-        if len(get_all_valid_moves(layout, turn, (i, j), en_passant)) != 0:
-            pygame.draw.rect(display, green, pygame.Rect((j * 96, i * 96), (96, 96)), 8)
+        if len(legality.get_all_valid_moves((i, j))) != 0:
+            overlays.append(("rect", hovered, green, 8))
         # if the piece has no valid moves
         else:
-            pygame.draw.rect(display, red, pygame.Rect((j * 96, i * 96), (96, 96)), 8)
+            overlays.append(("rect", hovered, red, 8))
 
     # if a piece is selected
     if selected != (0,0):
-        matrix = move_matrix(layout, selected, en_passant)
+        matrix = legality.move_matrix(selected)
 
         field = matrix[i][j]
         if field != 0: # if the selected piece can move to the field under the cursor
-            if is_valid_move(layout, turn, selected, (i,j), en_passant):
+            if legality.is_valid_move(selected, (i,j)):
                 if field == 1: # move normally
-                    pygame.draw.rect(display, green, pygame.Rect((j * 96, i * 96), (96, 96)), 8)
+                    overlays.append(("rect", hovered, green, 8))
                 else: # move by capturing
-                    pygame.draw.rect(display, yellow, pygame.Rect((j * 96, i * 96), (96, 96)), 8)
+                    overlays.append(("rect", hovered, yellow, 8))
 
             else: # coloring red if the piece can move there but is not a valid move
-                pygame.draw.rect(display, red, pygame.Rect((j * 96, i * 96), (96, 96)), 8)
+                overlays.append(("rect", hovered, red, 8))
+
+    return overlays
 
 """
 Draws the chess board itself.
@@ -224,8 +365,9 @@ Args:
     board (Board): Game object containing information about the game state.
     display (Surface): Pygame object which represents the display itself.
     index (list): List containing game assets representing the board indexes.
+    perspective (int): The player the board is shown to (0 for white, 1 for black).
 """
-def __draw_game_board(board, display, index):
+def __draw_game_board(board, display, index, perspective):
     display.fill((255, 255, 255))
 
     # drawing the chess board
@@ -245,9 +387,11 @@ def __draw_game_board(board, display, index):
         i += 1
         j = 0
 
-    # drawing the number indexes
+    # drawing the number indexes, turned around for black
     i = 10
-    layout = board.get_height_index()
+    layout = board.get_height_index()[:]
+    if perspective == 1:
+        layout.reverse()
     while i > -1:
         display.blit(index[layout[9 - i]], (0, 96 * i))
         i -= 1
@@ -255,7 +399,9 @@ def __draw_game_board(board, display, index):
     # drawing the letter indexes
 
     i = 0
-    layout = board.get_width_index()
+    layout = board.get_width_index()[:]
+    if perspective == 1:
+        layout.reverse()
     while i < 10:
         display.blit(index[layout[i]], (96 * i, 96 * (10 - 1)))
         i += 1
@@ -268,28 +414,28 @@ Args:
     display (Surface): Pygame object which represents the display itself.
     pieces (list): List containing game assets representing game pieces.
     misc (list): List containing game assets representing miscellaneous assets.
-    turn (int): Indicates which player makes the next move.
-    en_passant (list): Matrix with 2 lines, each keeping track of where en_passant and castling can be performed.
+    legality (LegalityCache): The legal moves and check status of the position on the board.
+    perspective (int): The player the board is shown to (0 for white, 1 for black).
 """
-def __draw_gameplay_elements(board, display, pieces, misc, turn, en_passant):
+def __draw_gameplay_elements(board, display, pieces, misc, legality, perspective):
     # drawing the pieces
     layout = board.get_layout()
     i, j = 0, 0
     pieces_layout = board.get_pieces()
     for lines in layout:
         for fields in lines:
-            display.blit(pieces[pieces_layout[i][j]], (j * 96, i * 96))
+            x, y = view_field(perspective, (i, j))
+            display.blit(pieces[pieces_layout[i][j]], (y * 96, x * 96))
             j += 1
         i += 1
         j = 0
 
     # drawing player turn
-    if not (is_in_check(turn, board.get_pieces(), en_passant)
-            and len(get_all_possible_moves(board.get_pieces(), turn, en_passant)) == 0):
-                display.blit(misc[turn], (0, 0))
+    if not legality.is_check_mate():
+                display.blit(misc[board.get_turn()], (0, 0))
 
-    if is_in_check(turn, board.get_pieces(), en_passant):
-        if len(get_all_possible_moves(board.get_pieces(), turn, en_passant)) == 0:
+    if legality.is_in_check():
+        if legality.is_check_mate():
             display.blit(misc[4], (9 * 96, 0))
         else:
             display.blit(misc[3], (9 * 96, 0))
@@ -0,0 +1,116 @@
+from Scripts.TurnValidator import get_all_possible_moves, is_in_check, move_matrix
+
+"""
+Class for computing what the rules allow in the current position once per move, instead of once per call.
+
+Everything is computed again only after the version of the board changes (see Board.get_version).
+"""
+class LegalityCache:
+    """
+    Sets up the cache for a board.
+
+    Args:
+        board (Board): Game object containing information about the game state.
+    """
+    def __init__(self, board):
+        self.board = board
+        self.version = -1
+
+        self.moves = []
+        self.valid_moves = {}
+        self.in_check = False
+        self.matrices = {}
+
+    """Computes the legal moves and the check status again if the position has changed."""
+    def __refresh(self):
+        board = self.board
+        if self.version == board.version:
+            return
+
+        self.version = board.version
+        self.moves = get_all_possible_moves(board.pieces, board.turn, board.en_passant)
+        self.valid_moves = dict(self.moves)
+        self.in_check = is_in_check(board.turn, board.pieces, board.en_passant)
+        self.matrices = {}
+
+    """
+    Returns a list of all valid moves for all the pieces belonging to the player whose turn it is.
+
+    Returns:
+        list: Same as TurnValidator.get_all_possible_moves.
+    """
+    def get_all_possible_moves(self):
+        self.__refresh()
+        return self.moves
+
+    """
+    Returns a list of all valid moves for a piece belonging to the player whose turn it is.
+
+    Args:
+        piece_pos (tuple): The position of a piece on the board.
+
+    Returns:
+        list: All possible moves the piece can make (none if the piece doesn't belong to the player).
+    """
+    def get_all_valid_moves(self, piece_pos):
+        self.__refresh()
+        return self.valid_moves.get(piece_pos, [])
+
+    """
+    Checks if a given move of the player whose turn it is is valid.
+
+    Args:
+        piece_pos (tuple): The position of a piece on the board.
+        target_pos (tuple): The place where the piece is supposed to move.
+
+    Returns:
+        bool: If the move is valid.
+    """
+    def is_valid_move(self, piece_pos, target_pos):
+        return target_pos in self.get_all_valid_moves(piece_pos)
+
+    """
+    Returns the movement matrix of a piece (see TurnValidator.move_matrix).
+
+    Args:
+        piece_pos (tuple): The position of a piece on the board.
+
+    Returns:
+        list: Movement matrix of the given piece.
+    """
+    def move_matrix(self, piece_pos):
+        self.__refresh()
+        if piece_pos not in self.matrices:
+            self.matrices[piece_pos] = move_matrix(self.board.pieces, piece_pos, self.board.en_passant)
+
+        return self.matrices[piece_pos]
+
+    """
+    Checks if the player whose turn it is is in check.
+
+    Returns:
+        bool: If the player is in check or not.
+    """
+    def is_in_check(self):
+        self.__refresh()
+        return self.in_check
+
+    """
+    Checks if the game has ended with the player whose turn it is being check mated.
+
+    Returns:
+        bool: If it is check mate.
+    """
+    def is_check_mate(self):
+        self.__refresh()
+        return self.in_check and len(self.moves) == 0
+
+    """
+    Checks if the game has ended with the player whose turn it is having no moves without being in check.
+
+    Returns:
+        bool: If it is stalemate.
+    """
+    def is_stalemate(self):
+        self.__refresh()
+        return not self.in_check and len(self.moves) == 0
@@ -0,0 +1,151 @@
+from Scripts.TurnValidator import get_all_possible_moves, is_valid_move
+
+"""
+Script for naming moves in coordinate notation (e.g. e2e4, e7e8q) and finding moves by their names,
+in coordinate notation or in standard algebraic notation (e.g. Nf3, exd5, e8=Q, O-O)
+"""
+
+# letters used for the pieces a pawn promotes to
+PROMOTIONS = {2: "r", 3: "n", 4: "b", 5: "q"}
+
+# letters used for the pieces in standard algebraic notation (the pawns have none)
+SAN_PIECES = {"R": 2, "N": 3, "B": 4, "Q": 5, "K": 6}
+
+"""
+Returns all the moves of the player whose turn it is, with one move for every piece a pawn can promote to.
+
+Args:
+    board (Board): Game object containing information about the game state.
+    generator (function): The move generator (get_all_possible_moves or reference_get_all_possible_moves).
+
+Returns:
+    list: Moves which can be given to Board.make_move.
+"""
+def get_moves(board, generator=get_all_possible_moves):
+    moves = []
+    pieces = board.get_pieces()
+
+    for piece_pos, targets in generator(pieces, board.turn, board.en_passant):
+        for target_pos in targets:
+            # pawn promotion, on the 8th rank for white and on the 1st rank for black
+            if pieces[piece_pos[0]][piece_pos[1]] % 6 == 1 and target_pos[0] in (1, 8):
+                for promotion in PROMOTIONS:
+                    moves.append((piece_pos, target_pos, promotion))
+            else:
+                moves.append((piece_pos, target_pos))
+
+    return moves
+
+"""
+Returns the name of a move (e.g. e2e4, or e7e8q for a pawn promoting to a queen).
+
+Args:
+    board (Board): Game object containing information about the game state.
+    move (tuple): The move, optionally without the piece a pawn promotes to (a queen then).
+
+Returns:
+    str: The name of the move.
+"""
+def get_move_name(board, move):
+    name = board.get_field_name(move[0]) + board.get_field_name(move[1])
+    if len(move) > 2: # pawn promotion
+        name += PROMOTIONS[move[2]]
+    elif board.get_pieces()[move[0][0]][move[0][1]] % 6 == 1 and move[1][0] in (1, 8):
+        name += PROMOTIONS[5] # a pawn promotes to a queen unless told otherwise (see Board.make_move)
+
+    return name
+
+"""
+Finds a valid move of the player whose turn it is by its name.
+
+Args:
+    board (Board): Game object containing information about the game state.
+    name (str): The name of the move.
+
+Returns:
+    int: 0 if there is no such valid move.
+    tuple: The move.
+"""
+def parse_move(board, name):
+    for move in get_moves(board):
+        if get_move_name(board, move) == name:
+            return move
+
+    return 0
+
+"""
+Finds the valid moves of the player whose turn it is matching a move in standard algebraic notation.
+
+Every piece of the named kind which fits the file and rank given to tell pieces apart is checked with
+TurnValidator.is_valid_move, so a well formed move matches exactly one valid move.
+
+Args:
+    board (Board): Game object containing information about the game state.
+    san (str): The move (e.g. Nf3, Raxd1, exd5, e8=Q, O-O-O), check marks and annotations are ignored.
+
+Returns:
+    list: The matching moves, empty if the move is illegal and longer than one if it is ambiguous.
+"""
+def find_san_moves(board, san):
+    pieces = board.get_pieces()
+    turn = board.turn
+    en_passant = board.en_passant
+    san = san.rstrip("+#!?")
+
+    # castling, on the 8th rank (line 8) for white and on the 1st rank (line 1) for black
+    if san in ("O-O", "0-0", "O-O-O", "0-0-0"):
+        line = 8 if turn == 0 else 1
+        target_pos = (line, 7) if len(san) == 3 else (line, 3)
+        if pieces[line][5] == 6 + 6 * turn and is_valid_move(pieces, turn, (line, 5), target_pos, en_passant):
+            return [((line, 5), target_pos)]
+        return []
+
+    promotion = 0
+    if "=" in san:
+        san, letter = san.split("=", 1)
+        if letter not in SAN_PIECES or letter == "K":
+            return []
+        promotion = SAN_PIECES[letter]
+    elif len(san) > 2 and san[-1] in "RNBQ" and san[-2] in "18":
+        promotion = SAN_PIECES[san[-1]]
+        san = san[:-1]
+
+    kind = 1
+    if san[:1] in SAN_PIECES:
+        kind = SAN_PIECES[san[0]]
+        san = san[1:]
+    san = san.replace("x", "").replace(":", "")
+
+    if len(san) < 2:
+        return []
+    target_pos = board.get_field(san[-2:])
+    if target_pos == (0, 0):
+        return []
+
+    # the file and/or rank of the piece, given when more pieces could make the move
+    hint = san[:-2]
+    if len(hint) > 2 or any(char not in "abcdefgh12345678" for char in hint):
+        return []
+
+    piece = kind + 6 * turn
+    moves = []
+    for i in range(1, 9):
+        for j in range(1, 9):
+            if pieces[i][j] != piece:
+                continue
+
+            name = board.get_field_name((i, j))
+            if any(char != name[0] if char.isalpha() else char != name[1] for char in hint):
+                continue
+
+            if not is_valid_move(pieces, turn, (i, j), target_pos, en_passant):
+                continue
+
+            # a pawn reaching the last rank has to name its promotion, other moves can't have one
+            if kind == 1 and target_pos[0] in (1, 8):
+                if promotion != 0:
+                    moves.append(((i, j), target_pos, promotion))
+            elif promotion == 0:
+                moves.append(((i, j), target_pos))
+
+    return moves
@@ -0,0 +1,146 @@
+import mmap
+import random
+import struct
+
+"""
+Class for looking up the moves of an opening book file (see BookBuilder), without reading it into memory.
+
+The file is memory-mapped read-only, so every process using the same book shares its pages
+and only the pages a lookup touches are ever read from the disk.
+
+The file starts with a 16 byte header (MAGIC and the number of records), followed by 16 byte records sorted by
+the hash of their position, then by their move, all little-endian:
+    bytes 0 -> 7 - Zobrist hash of the position (see Board.compute_hash)
+    bytes 8 -> 11 - the move, packed like in TranspositionTable:
+        bits 0 -> 6 - field the move starts from (line * 10 + column)
+        bits 7 -> 13 - field the move ends on
+        bits 14 -> 16 - piece a pawn promotes to (0 if none)
+    bytes 12 -> 15 - the weight of the move (the number of games it was played in)
+"""
+class OpeningBook:
+    MAGIC = b"FLCBOOK1"
+    HEADER = struct.Struct("<8sQ")
+    RECORD = struct.Struct("<QII")
+
+    """
+    Opens a book.
+
+    Args:
+        path (str): The path of the book file.
+    """
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            if len(file.read(self.HEADER.size)) < self.HEADER.size:
+                raise Exception("Invalid opening book: " + path)
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.size = self.HEADER.unpack_from(self.map, 0)
+        if magic != self.MAGIC or len(self.map) < self.HEADER.size + self.size * self.RECORD.size:
+            raise Exception("Invalid opening book: " + path)
+
+    """Unmaps the file."""
+    def close(self):
+        self.map.close()
+
+    """
+    Looks up the moves of a position with a binary search.
+
+    Args:
+        hash (int): The Zobrist hash of the position.
+
+    Returns:
+        list: The moves of the position (see Board.make_move) with their weights, heaviest first.
+    """
+    def get_moves(self, hash):
+        record = self.RECORD
+        data = self.map
+        offset = self.HEADER.size
+
+        # the first record of the position
+        low = 0
+        high = self.size
+        while low < high:
+            middle = (low + high) // 2
+            if record.unpack_from(data, offset + middle * record.size)[0] < hash:
+                low = middle + 1
+            else:
+                high = middle
+
+        moves = []
+        while low < self.size:
+            key, move, weight = record.unpack_from(data, offset + low * record.size)
+            if key != hash:
+                break
+            moves.append((self.unpack_move(move), weight))
+            low += 1
+
+        moves.sort(key=lambda entry: -entry[1])
+        return moves
+
+    """
+    Chooses one of the moves of a position, at random with the odds given by the weights.
+
+    Args:
+        hash (int): The Zobrist hash of the position.
+
+    Returns:
+        int: 0 if the position isn't in the book.
+        tuple: The move.
+    """
+    def choose_move(self, hash):
+        moves = self.get_moves(hash)
+        if len(moves) == 0:
+            return 0
+
+        return random.choices([move for move, weight in moves], [weight for move, weight in moves])[0]
+
+    """
+    Packs a move into an integer.
+
+    Args:
+        move (tuple): The move.
+
+    Returns:
+        int: The packed move.
+    """
+    @staticmethod
+    def pack_move(move):
+        data = (move[0][0] * 10 + move[0][1]) | ((move[1][0] * 10 + move[1][1]) << 7)
+        if len(move) > 2:
+            data |= move[2] << 14
+
+        return data
+
+    """
+    Unpacks a move packed by pack_move.
+
+    Args:
+        data (int): The packed move.
+
+    Returns:
+        tuple: The move.
+    """
+    @staticmethod
+    def unpack_move(data):
+        move = (divmod(data & 0x7F, 10), divmod((data >> 7) & 0x7F, 10))
+        promotion = (data >> 14) & 0x7
+        if promotion != 0:
+            move = move + (promotion,)
+
+        return move
+
+    """
+    Writes a book file.
+
+    Args:
+        path (str): The path of the book file.
+        records (list): The hashes of the positions, the packed moves and their weights, in any order.
+    """
+    @staticmethod
+    def write(path, records):
+        records = sorted(records)
+
+        with open(path, "wb") as file:
+            file.write(OpeningBook.HEADER.pack(OpeningBook.MAGIC, len(records)))
+            for hash, move, weight in records:
+                file.write(OpeningBook.RECORD.pack(hash, move, min(weight, 0xFFFFFFFF)))
@@ -0,0 +1,101 @@
+import time
+
+from Objects.Board import Board
+from Scripts.Notation import get_moves, get_move_name, parse_move
+from Scripts.TurnValidator import get_all_possible_moves, reference_get_all_possible_moves
+
+"""Script for counting the positions reachable from a position (perft), used for benchmarking and testing"""
+
+"""
+Runs perft from the commandline arguments and prints the results.
+
+Args:
+    args (list): The depth, followed by the optional "divide" and "reference" flags
+        and by the moves leading from the start position to the position to count from (e.g. e2e4),
+        or by "fen <FEN>" and optionally "moves <move>..." to count from another position.
+"""
+def run_perft(args):
+    depth = int(args[0])
+    divide = "divide" in args[1:]
+    generator = get_all_possible_moves
+    if "reference" in args[1:]:
+        generator = reference_get_all_possible_moves
+
+    board = Board()
+    words = [word for word in args[1:] if word != "divide" and word != "reference"]
+    names = words
+    # the position is read the same way as the UCI position command
+    if len(words) > 0 and words[0] == "fen":
+        moves = words.index("moves") if "moves" in words else len(words)
+        board.set_fen(" ".join(words[1:moves]))
+        names = words[moves + 1:]
+
+    for name in names:
+        move = parse_move(board, name)
+        if move == 0:
+            raise Exception("Invalid move: " + name)
+
+        board.make_move(move)
+
+    start = time.perf_counter()
+    if divide:
+        nodes = 0
+        for name, count in perft_divide(board, depth, generator):
+            print(name + ": " + str(count))
+            nodes += count
+        print()
+    else:
+        nodes = perft(board, depth, generator)
+    elapsed = time.perf_counter() - start
+
+    print("Nodes searched: " + str(nodes))
+    print("Time: %.3fs (%d nodes/s)" % (elapsed, nodes / max(elapsed, 1e-9)))
+
+"""
+Counts the leaf nodes of the move tree of a given depth.
+
+Args:
+    board (Board): Game object containing information about the game state.
+    depth (int): The depth of the tree.
+    generator (function): The move generator (get_all_possible_moves or reference_get_all_possible_moves).
+
+Returns:
+    int: The number of leaf nodes.
+"""
+def perft(board, depth, generator=get_all_possible_moves):
+    if depth == 0:
+        return 1
+
+    moves = get_moves(board, generator)
+    if depth == 1:
+        return len(moves)
+
+    nodes = 0
+    for move in moves:
+        undo = board.make_move(move)
+        nodes += perft(board, depth - 1, generator)
+        board.unmake_move(undo)
+
+    return nodes
+
+"""
+Counts the leaf nodes of the move tree of a given depth separately for every move of the position.
+
+Args:
+    board (Board): Game object containing information about the game state.
+    depth (int): The depth of the tree, at least 1.
+    generator (function): The move generator (get_all_possible_moves or reference_get_all_possible_moves).
+
+Returns:
+    list: (move name, number of leaf nodes) for every move.
+"""
+def perft_divide(board, depth, generator=get_all_possible_moves):
+    results = []
+
+    for move in get_moves(board, generator):
+        name = get_move_name(board, move)
+        undo = board.make_move(move)
+        results.append((name, perft(board, depth - 1, generator)))
+        board.unmake_move(undo)
+
+    return results
@@ -0,0 +1,248 @@
+import collections
+import itertools
+import multiprocessing
+import os
+import re
+import sys
+import time
+
+from Objects.Board import Board
+from Scripts.Notation import find_san_moves
+
+"""Script for replaying the games of PGN archives of any size through the rules, without the GUI"""
+
+# games sent to a worker at once
+CHUNK_SIZE = 32
+
+# tokens ending the movetext of a game
+RESULTS = ("1-0", "0-1", "1/2-1/2", "*")
+
+HEADER = re.compile(r'\[\s*(\w+)\s+"(.*)"\s*\]')
+MOVE_NUMBER = re.compile(r"\d+\.*")
+
+"""
+Replays every game of a PGN file from the commandline arguments and prints a summary.
+
+Every game with a move which is illegal or ambiguous in its position (or which can't be set up) gives one line,
+in the order of the file: the number of the game, the players, the ply, the move and the reason, separated by tabs.
+
+Args:
+    args (list): The path of the file, followed by the optional settings:
+        output=<file> - the file the flagged games are written to (the standard output by default)
+        workers=<n> - the number of processes replaying games at the same time (all cores by default)
+"""
+def run_pgn(args):
+    settings = {
+        "output": None,
+        "workers": os.cpu_count() or 1
+    }
+
+    for arg in args[1:]:
+        key, value = arg.split("=", 1) if "=" in arg else (arg, "")
+        if key == "output" and value != "":
+            settings["output"] = value
+        elif key == "workers" and value.isdigit():
+            settings[key] = int(value)
+        else:
+            raise Exception("Invalid argument: " + arg)
+
+    workers = max(1, settings["workers"])
+    stats = {"games": 0, "plies": 0, "flagged": 0}
+    start = time.perf_counter()
+
+    output = open(settings["output"], "w") if settings["output"] is not None else sys.stdout
+    try:
+        with open(args[0], errors="replace") as file, multiprocessing.Pool(workers) as pool:
+            # games are read lazily and only a few chunks per worker are read ahead, so memory stays bounded
+            pending = collections.deque()
+            games = enumerate(read_games(file), 1)
+            chunks = iter(lambda: list(itertools.islice(games, CHUNK_SIZE)), [])
+
+            for chunk in chunks:
+                pending.append(pool.apply_async(replay_chunk, (chunk,)))
+
+                if len(pending) >= 4 * workers:
+                    __write_results(output, pending.popleft().get(), stats)
+
+            while pending:
+                __write_results(output, pending.popleft().get(), stats)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    elapsed = time.perf_counter() - start
+    print("Games: %d (%d workers), flagged: %d" % (stats["games"], workers, stats["flagged"]), file=sys.stderr)
+    print("Time: %.3fs (%.1f games/s, %d plies/s)"
+          % (elapsed, stats["games"] / max(elapsed, 1e-9), stats["plies"] / max(elapsed, 1e-9)), file=sys.stderr)
+
+"""
+Writes the flagged games of a chunk and counts its games.
+
+Args:
+    output (file): Where the flagged games are written.
+    results (list): The results of the games (see replay_chunk).
+    stats (dict): The number of games, plies and flagged games so far.
+"""
+def __write_results(output, results, stats):
+    for index, players, plies, error in results:
+        stats["games"] += 1
+        stats["plies"] += plies
+
+        if error != 0:
+            stats["flagged"] += 1
+            output.write("%d\t%s\t%d\t%s\t%s\n" % (index, players, error[0], error[1], error[2]))
+    output.flush()
+
+"""
+Reads the games of a PGN file one by one, without keeping more than one game in memory.
+
+Args:
+    file (file): The opened PGN file.
+
+Returns:
+    generator: For every game, the tags of its header (dict) and its movetext (str).
+"""
+def read_games(file):
+    headers = {}
+    movetext = []
+
+    for line in file:
+        line = line.strip()
+        if line.startswith("%"): # escaped line
+            continue
+
+        match = HEADER.fullmatch(line)
+        if match is not None:
+            # a header after some movetext starts the next game
+            if len(movetext) != 0:
+                yield headers, "\n".join(movetext)
+                headers = {}
+                movetext = []
+            headers[match.group(1)] = match.group(2)
+        elif line != "":
+            movetext.append(line)
+
+            # the result ends the game, even if the next one has no header
+            if line.split()[-1] in RESULTS:
+                yield headers, "\n".join(movetext)
+                headers = {}
+                movetext = []
+
+    if len(headers) != 0 or len(movetext) != 0:
+        yield headers, "\n".join(movetext)
+
+"""
+Returns the moves of a movetext, leaving out move numbers, comments, variations, annotations and the result.
+
+Args:
+    movetext (str): The movetext of a game.
+
+Returns:
+    list: The moves in standard algebraic notation.
+"""
+def parse_movetext(movetext):
+    moves = []
+    variations = 0
+    index = 0
+    length = len(movetext)
+
+    while index < length:
+        char = movetext[index]
+        if char == "{": # comment up to the closing brace
+            end = movetext.find("}", index)
+            index = length if end == -1 else end + 1
+        elif char == ";": # comment up to the end of the line
+            end = movetext.find("\n", index)
+            index = length if end == -1 else end + 1
+        elif char == "(":
+            variations += 1
+            index += 1
+        elif char == ")":
+            variations = max(0, variations - 1)
+            index += 1
+        elif char.isspace():
+            index += 1
+        else:
+            end = index
+            while end < length and not movetext[end].isspace() and movetext[end] not in "{;()":
+                end += 1
+            token = movetext[index:end]
+            index = end
+
+            if variations != 0 or token.startswith("$") or token in RESULTS:
+                continue
+
+            # move numbers may be written together with the move (e.g. 1.e4)
+            token = token[MOVE_NUMBER.match(token).end():] if token[0].isdigit() else token
+            if token != "":
+                moves.append(token)
+
+    return moves
+
+"""
+Creates the board a game starts from, the standard position unless the header gives a FEN.
+
+Args:
+    headers (dict): The tags of the header of the game.
+
+Returns:
+    Board: The board.
+"""
+def get_start_board(headers):
+    board = Board()
+    if "FEN" in headers:
+        board.set_fen(headers["FEN"])
+
+    return board
+
+"""
+Replays the moves of a game through the rules.
+
+Args:
+    headers (dict): The tags of the header of the game.
+    movetext (str): The movetext of the game.
+    max_plies (int): The number of moves after which the replay stops (0 - no limit).
+
+Returns:
+    tuple: The moves played as coords (see Board.make_move), and 0 if every move was found,
+        or the ply, the move and the reason (illegal, ambiguous or the error setting up the game) of the first
+        move that wasn't.
+"""
+def replay_game(headers, movetext, max_plies=0):
+    moves = []
+    try:
+        board = get_start_board(headers)
+    except Exception as error:
+        return moves, (0, "-", str(error))
+
+    for san in parse_movetext(movetext):
+        if max_plies != 0 and len(moves) >= max_plies:
+            break
+
+        matches = find_san_moves(board, san)
+        if len(matches) != 1:
+            return moves, (len(moves) + 1, san, "illegal" if len(matches) == 0 else "ambiguous")
+
+        board.make_move(matches[0])
+        moves.append(matches[0])
+
+    return moves, 0
+
+"""
+Replays a chunk of games (run by the worker processes).
+
+Args:
+    games (list): The games, each as its number in the file and what read_games gives for it.
+
+Returns:
+    list: For every game, its number, its players, the number of moves replayed and the error (see replay_game).
+"""
+def replay_chunk(games):
+    results = []
+
+    for index, (headers, movetext) in games:
+        players = headers.get("White", "?") + " - " + headers.get("Black", "?")
+        moves, error = replay_game(headers, movetext)
+        results.append((index, players, len(moves), error))
+
+    return results
@@ -0,0 +1,151 @@
+import multiprocessing
+import os
+import random
+import time
+
+from Objects.GameState import GameState
+from Scripts.FunkyLittleComputer import FunkyLittleComputer
+
+"""Script for playing many computer vs computer games in parallel, without the GUI"""
+
+"""
+Runs self-play from the commandline arguments and prints the results.
+
+Args:
+    args (list): The number of games, followed by the optional settings:
+        engine / random - both sides play with the engine (default) or play random moves
+        workers=<n> - the number of processes playing games at the same time (all cores by default)
+        output=<file> - the file the games are written to as they finish (selfplay.txt by default)
+        nodes=<n> - the positions the engine may search for a move (1000 by default)
+        plies=<n> - the number of moves after which a game is drawn (200 by default)
+        openings=<n> - random moves played at the start of engine games, so that the games differ (4 by default)
+        book=<file> - an opening book the engine plays from (none by default)
+        scaling - plays the games again with 1, 2, 4... workers and compares the throughput
+"""
+def run_selfplay(args):
+    games = int(args[0])
+    settings = {
+        "mode": "engine",
+        "workers": os.cpu_count() or 1,
+        "output": "selfplay.txt",
+        "nodes": 1000,
+        "plies": 200,
+        "openings": 4,
+        "book": None,
+        "scaling": False
+    }
+
+    for arg in args[1:]:
+        key, value = arg.split("=", 1) if "=" in arg else (arg, "")
+        if arg == "engine" or arg == "random":
+            settings["mode"] = arg
+        elif arg == "scaling":
+            settings["scaling"] = True
+        elif key in ("output", "book") and value != "":
+            settings[key] = value
+        elif key in ("workers", "nodes", "plies", "openings") and value.isdigit():
+            settings[key] = int(value)
+        else:
+            raise Exception("Invalid argument: " + arg)
+
+    workers = max(1, settings["workers"])
+    stats = play_games(games, settings, workers, settings["output"])
+
+    print("Games: %d (%s, %d workers)" % (games, settings["mode"], workers))
+    print("White wins: %d, black wins: %d, draws: %d" % (stats["1-0"], stats["0-1"], stats["1/2-1/2"]))
+    print("Time: %.3fs (%.2f games/s, %d plies/s)"
+          % (stats["time"], games / max(stats["time"], 1e-9), stats["plies"] / max(stats["time"], 1e-9)))
+    print("Games written to " + settings["output"])
+
+    if settings["scaling"]:
+        # 1, 2, 4... workers, up to the number of workers asked for
+        counts = [1]
+        while counts[-1] * 2 < workers:
+            counts.append(counts[-1] * 2)
+        if counts[-1] != workers:
+            counts.append(workers)
+
+        print()
+        baseline = 0
+        for count in counts:
+            stats = play_games(games, settings, count, None)
+            rate = games / max(stats["time"], 1e-9)
+            if baseline == 0:
+                baseline = rate
+            print("%d workers: %.2f games/s (x%.2f)" % (count, rate, rate / baseline))
+
+"""
+Plays games on a pool of processes, writing every game as soon as it finishes.
+
+Args:
+    games (int): The number of games.
+    settings (dict): The settings of the games (see run_selfplay).
+    workers (int): The number of processes playing games at the same time.
+    output (str): The file the games are written to, or None.
+
+Returns:
+    dict: The number of games for every result ("1-0", "0-1", "1/2-1/2"), the number of plies and the time taken.
+"""
+def play_games(games, settings, workers, output):
+    stats = {"1-0": 0, "0-1": 0, "1/2-1/2": 0, "plies": 0}
+    tasks = [(index, settings) for index in range(games)]
+
+    start = time.perf_counter()
+    file = open(output, "w") if output is not None else None
+    try:
+        with multiprocessing.Pool(workers) as pool:
+            # the games come back in the order they finish, a few at a time
+            for index, result, termination, moves in pool.imap_unordered(play_game, tasks, 4):
+                stats[result] += 1
+                stats["plies"] += len(moves)
+
+                if file is not None:
+                    file.write("%d\t%s\t%s\t%d\t%s\n" % (index, result, termination, len(moves), " ".join(moves)))
+                    file.flush()
+    finally:
+        if file is not None:
+            file.close()
+    stats["time"] = time.perf_counter() - start
+
+    return stats
+
+"""
+Plays a single game (run by the worker processes).
+
+Args:
+    task (tuple): The index of the game, which also seeds its random moves, and the settings (see run_selfplay).
+
+Returns:
+    tuple: The index of the game, the result ("1-0", "0-1" or "1/2-1/2"), how the game ended
+        and the moves in coordinate notation.
+"""
+def play_game(task):
+    index, settings = task
+    random.seed(index)
+
+    state = GameState()
+    board = state.get_board()
+    computer = FunkyLittleComputer(time_limit=0, node_limit=settings["nodes"], hash_size_mb=4,
+                                  book=settings["book"])
+
+    while len(state.history) < settings["plies"]:
+        if settings["mode"] == "random" or len(state.history) < settings["openings"]:
+            move = computer.select_a_random_move(board.get_pieces(), board.turn, board.en_passant)
+        else:
+            move = computer.select_a_move(board.get_pieces(), board.turn, board.en_passant)
+
+        if move == 0:
+            break
+        state.make_move(move)
+
+    if state.is_check_mate():
+        result = "0-1" if board.turn == 0 else "1-0"
+        termination = "checkmate"
+    elif state.is_stalemate():
+        result = "1/2-1/2"
+        termination = "stalemate"
+    else:
+        result = "1/2-1/2"
+        termination = "move limit"
+
+    return index, result, termination, state.get_move_names()
@@ -0,0 +1,206 @@
+import mmap
+import os
+import struct
+
+"""
+Class for probing endgame tablebases (see TablebaseGenerator), the files being memory-mapped read-only.
+
+A table covers the positions of two kings and one more piece (KQK, KRK, KPK). The side owning the piece is
+always looked up as white, a position where black owns it is mirrored top to bottom first (the colors swapped).
+Every position takes one byte, at
+    turn * 64^3 + white king field * 64^2 + black king field * 64 + piece field
+where a field is numbered (line - 1) * 8 + (column - 1), a8 being 0. The byte gives the result for the player whose
+turn it is, with the distance to mate in plies:
+    0 - draw (or no legal position)
+    1 -> 127 - win, mate in that many plies
+    128 + n - loss, mated in n plies (128 - already check mate)
+
+Each file starts with a 16 byte header, MAGIC followed by the name of the endgame.
+"""
+class Tablebase:
+    MAGIC = b"FLCTB001"
+    HEADER = struct.Struct("<8s8s")
+    SIZE = 2 * 64 * 64 * 64
+
+    # the directory the tables are written to and read from by default
+    DIRECTORY = "Tablebases"
+
+    # the endgames by the kind of their piece (piece value % 6), the bishop and knight can't mate so need no table
+    ENDGAMES = {5: "KQK", 2: "KRK", 1: "KPK"}
+
+    """
+    Opens the tables found in a directory, missing ones are simply not probed.
+
+    Args:
+        directory (str): The directory of the table files.
+    """
+    def __init__(self, directory=DIRECTORY):
+        self.directory = directory
+        self.maps = {}
+        self.probes = 0
+        self.hits = 0
+
+        for kind, name in self.ENDGAMES.items():
+            path = os.path.join(directory, name + ".tb")
+            if not os.path.isfile(path):
+                continue
+
+            with open(path, "rb") as file:
+                header = file.read(self.HEADER.size)
+                if len(header) < self.HEADER.size or self.HEADER.unpack(header) != (self.MAGIC, name.encode().ljust(8, b"\0")):
+                    raise Exception("Invalid tablebase: " + path)
+                self.maps[kind] = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+            if len(self.maps[kind]) != self.HEADER.size + self.SIZE:
+                raise Exception("Invalid tablebase: " + path)
+
+    """Unmaps the files."""
+    def close(self):
+        for table in self.maps.values():
+            table.close()
+        self.maps = {}
+
+    """
+    Looks up the result of a position.
+
+    Args:
+        pieces (list): Matrix which contains the layout of the game pieces.
+        turn (int): Indicates which player makes the next move.
+
+    Returns:
+        int: 0 if no table covers the position.
+        tuple: The result for the player whose turn it is (1 - win, 0 - draw, -1 - loss) and the plies to mate.
+    """
+    def probe(self, pieces, turn):
+        # the border of the layout is empty, so only the pieces aren't 0
+        count = 100 - sum(line.count(0) for line in pieces)
+        if count > 3 or len(self.maps) == 0:
+            return 0
+
+        self.probes += 1
+        if count == 2: # only the kings are left
+            self.hits += 1
+            return 0, 0
+
+        kings = [0, 0]
+        piece = 0
+        field = 0
+        for i in range(1, 9):
+            line = pieces[i]
+            if line.count(0) == 10:
+                continue
+
+            for j in range(1, 9):
+                value = line[j]
+                if value == 0:
+                    continue
+                if value % 6 == 0:
+                    kings[value // 12] = (i, j)
+                else:
+                    piece = value
+                    field = (i, j)
+
+        kind = piece % 6
+        if kind in (3, 4): # a bishop or a knight alone can't mate
+            self.hits += 1
+            return 0, 0
+        if kind not in self.maps:
+            return 0
+
+        self.hits += 1
+        return self.decode(self.maps[kind][self.HEADER.size + self.index(kings, field, turn, piece // 7)])
+
+    """
+    Describes the result of a position for the GUI.
+
+    Args:
+        pieces (list): Matrix which contains the layout of the game pieces.
+        turn (int): Indicates which player makes the next move.
+
+    Returns:
+        str: The result (e.g. "white mates in 5"), empty if no table covers the position.
+    """
+    def describe(self, pieces, turn):
+        result = self.probe(pieces, turn)
+        if result == 0:
+            return ""
+
+        outcome, plies = result
+        if outcome == 0:
+            return "draw"
+        if plies == 0:
+            return "check mate"
+
+        winner = turn if outcome == 1 else 1 - turn
+        return "%s mates in %d" % (("white", "black")[winner], (plies + 1) // 2)
+
+    """
+    Returns where a position is kept in a table.
+
+    Args:
+        kings (list): The coords of the white and of the black king.
+        field (tuple): The coords of the piece.
+        turn (int): Indicates which player makes the next move.
+        owner (int): The player owning the piece (0 - white, 1 - black).
+
+    Returns:
+        int: The index of the position.
+    """
+    @staticmethod
+    def index(kings, field, turn, owner):
+        strong, weak = kings[owner], kings[1 - owner]
+        if owner == 1: # mirrored, so that the piece is white
+            strong, weak, field = (9 - strong[0], strong[1]), (9 - weak[0], weak[1]), (9 - field[0], field[1])
+            turn = 1 - turn
+
+        return ((turn * 64 + (strong[0] - 1) * 8 + strong[1] - 1) * 64 + (weak[0] - 1) * 8 + weak[1] - 1) * 64 \
+            + (field[0] - 1) * 8 + field[1] - 1
+
+    """
+    Returns the kings, the piece and the turn of the position at an index (the piece being white).
+
+    Args:
+        index (int): The index of the position.
+
+    Returns:
+        tuple: The coords of the white king, of the black king and of the piece, and the turn.
+    """
+    @staticmethod
+    def position(index):
+        fields = [divmod((index >> shift) & 63, 8) for shift in (12, 6, 0)]
+        return tuple((line + 1, column + 1) for line, column in fields) + (index >> 18,)
+
+    """
+    Decodes the byte of a position.
+
+    Args:
+        value (int): The byte.
+
+    Returns:
+        tuple: The result for the player whose turn it is (1 - win, 0 - draw, -1 - loss) and the plies to mate.
+    """
+    @staticmethod
+    def decode(value):
+        if value == 0:
+            return 0, 0
+        if value < 128:
+            return 1, value
+        return -1, value - 128
+
+    """
+    Encodes the result of a position into a byte.
+
+    Args:
+        outcome (int): The result for the player whose turn it is (1 - win, 0 - draw, -1 - loss).
+        plies (int): The plies to mate.
+
+    Returns:
+        int: The byte.
+    """
+    @staticmethod
+    def encode(outcome, plies):
+        if outcome == 0:
+            return 0
+        if outcome == 1:
+            return min(plies, 127)
+        return 128 + min(plies, 127)
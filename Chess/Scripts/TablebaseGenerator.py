@@ -0,0 +1,291 @@
+import collections
+import multiprocessing
+import os
+import time
+from array import array
+
+from Scripts.Tablebase import Tablebase
+from Scripts.TurnValidator import get_all_possible_moves, is_in_check
+
+"""Script for generating endgame tablebases by retrograde analysis, without the GUI"""
+
+# positions sent to a worker at once
+CHUNK_SIZE = 4096
+
+# castling isn't possible and no pawn can be taken en passant in these endgames
+EN_PASSANT = [[1, 0, 0, 0, 0, 0, 0, 0, 0, 1], [1, 0, 0, 0, 0, 0, 0, 0, 0, 1]]
+
+# states of a position after its moves are generated
+ILLEGAL = 0
+MOVES = 1
+CHECK_MATE = 2
+STALEMATE = 3
+
+"""
+Generates tablebases from the commandline arguments and prints a summary.
+
+Args:
+    args (list): The optional settings:
+        KQK / KRK / KPK - the endgames to generate (all of them by default, KPK needing KQK and KRK)
+        directory=<dir> - the directory the tables are written to (Tablebases by default)
+        workers=<n> - the number of processes generating moves at the same time (all cores by default)
+"""
+def run_tablebase(args):
+    settings = {
+        "endgames": [],
+        "directory": Tablebase.DIRECTORY,
+        "workers": os.cpu_count() or 1
+    }
+
+    for arg in args:
+        key, value = arg.split("=", 1) if "=" in arg else (arg, "")
+        if arg in Tablebase.ENDGAMES.values():
+            settings["endgames"].append(arg)
+        elif key == "directory" and value != "":
+            settings["directory"] = value
+        elif key == "workers" and value.isdigit():
+            settings[key] = int(value)
+        else:
+            raise Exception("Invalid argument: " + arg)
+
+    # the tables are generated in the order of ENDGAMES, so that the ones promotions lead to come first
+    endgames = [name for name in Tablebase.ENDGAMES.values() if name in settings["endgames"] or len(settings["endgames"]) == 0]
+    os.makedirs(settings["directory"], exist_ok=True)
+
+    for name in endgames:
+        start = time.perf_counter()
+        values = generate(name, settings["directory"], max(1, settings["workers"]))
+
+        path = os.path.join(settings["directory"], name + ".tb")
+        with open(path, "wb") as file:
+            file.write(Tablebase.HEADER.pack(Tablebase.MAGIC, name.encode()))
+            file.write(values)
+
+        stats = collections.Counter(Tablebase.decode(value)[0] for value in values)
+        longest = max(Tablebase.decode(value)[1] for value in values)
+        print("%s: %d wins, %d losses, %d draws or illegal, longest mate %d plies (%.1fs) -> %s"
+              % (name, stats[1], stats[-1], stats[0], longest, time.perf_counter() - start, path))
+
+"""
+Solves an endgame by retrograde analysis.
+
+The moves of every position are generated with TurnValidator on the pool, then the results spread backwards
+from the check mates: a position is won in n + 1 plies if a move leads to a position lost in n plies,
+and lost in n + 1 plies once all its moves lead to positions won in at most n plies.
+Moves leaving the endgame (captures and promotions) take their result from the smaller tables.
+
+Args:
+    name (str): The endgame (see Tablebase.ENDGAMES).
+    directory (str): The directory of the tables of the smaller endgames.
+    workers (int): The number of processes generating moves at the same time.
+
+Returns:
+    bytearray: The byte of every position (see Tablebase).
+"""
+def generate(name, directory, workers):
+    kind = [kind for kind, endgame in Tablebase.ENDGAMES.items() if endgame == name][0]
+    size = Tablebase.SIZE
+
+    states = bytearray(size)
+    # the moves staying inside the endgame, as indices of the positions they lead to
+    offsets = array("I", [0]) * (size + 1)
+    edges = array("I")
+    # the number of moves whose result isn't known yet, and what happens at every distance from mate
+    counters = array("H", [0]) * size
+    wins = collections.defaultdict(list)
+    decrements = collections.defaultdict(list)
+
+    tasks = [(kind, start, min(start + CHUNK_SIZE, size), directory) for start in range(0, size, CHUNK_SIZE)]
+    with multiprocessing.Pool(workers) as pool:
+        for start, chunk_states, chunk_counts, chunk_edges, outside in pool.imap(expand_chunk, tasks):
+            states[start:start + len(chunk_states)] = chunk_states
+            for offset, count in enumerate(chunk_counts):
+                offsets[start + offset + 1] = offsets[start + offset] + count
+            edges.extend(chunk_edges)
+
+            for index, outcome, plies in outside:
+                if outcome == -1: # the opponent is mated
+                    wins[plies + 1].append(index)
+                elif outcome == 1:
+                    decrements[plies].append(index)
+
+            for offset, count in enumerate(chunk_counts):
+                counters[start + offset] += count
+            for index, outcome, plies in outside:
+                counters[index] += 1
+
+    # the moves reversed, the positions every position can be reached from
+    starts = array("I", [0]) * (size + 1)
+    for target in edges:
+        starts[target + 1] += 1
+    for index in range(size):
+        starts[index + 1] += starts[index]
+    sources = array("I", [0]) * len(edges)
+    filled = array("I", starts[:size])
+    for index in range(size):
+        for edge in range(offsets[index], offsets[index + 1]):
+            target = edges[edge]
+            sources[filled[target]] = index
+            filled[target] += 1
+
+    values = bytearray(size)
+    solved = bytearray(size)
+    levels = collections.defaultdict(list)
+    for index in range(size):
+        if states[index] == CHECK_MATE:
+            solved[index] = 1
+            values[index] = Tablebase.encode(-1, 0)
+            levels[0].append(index)
+        elif states[index] != MOVES: # illegal positions and stalemates stay draws
+            solved[index] = 1
+
+    plies = 0
+    last = max(list(wins) + list(decrements) + [0])
+    while plies <= last or len(levels[plies]) != 0:
+        for index in wins.pop(plies, []):
+            if not solved[index]:
+                solved[index] = 1
+                values[index] = Tablebase.encode(1, plies)
+                levels[plies].append(index)
+
+        for index in decrements.pop(plies, []):
+            counters[index] -= 1
+            if counters[index] == 0 and not solved[index]:
+                solved[index] = 1
+                values[index] = Tablebase.encode(-1, plies + 1)
+                levels[plies + 1].append(index)
+
+        for target in levels.pop(plies, []):
+            lost = values[target] >= 128
+            for edge in range(starts[target], starts[target + 1]):
+                index = sources[edge]
+                if solved[index]:
+                    continue
+
+                if lost:
+                    solved[index] = 1
+                    values[index] = Tablebase.encode(1, plies + 1)
+                    levels[plies + 1].append(index)
+                else:
+                    counters[index] -= 1
+                    if counters[index] == 0:
+                        solved[index] = 1
+                        values[index] = Tablebase.encode(-1, plies + 1)
+                        levels[plies + 1].append(index)
+
+        plies += 1
+
+    return values
+
+"""
+Generates the moves of a range of positions (run by the worker processes).
+
+Args:
+    task (tuple): The kind of the piece of the endgame, the first and the end of the range of indices,
+        and the directory of the tables of the smaller endgames.
+
+Returns:
+    tuple: The first index, the state of every position (ILLEGAL, MOVES, CHECK_MATE or STALEMATE),
+        the number of moves of every position staying inside the endgame, the indices these moves lead to,
+        and the index, result and plies to mate (for the opponent) of every move leaving the endgame.
+"""
+def expand_chunk(task):
+    kind, start, end, directory = task
+    tablebase = Tablebase(directory) if kind == 1 else None
+    pieces = [[0] * 10 for i in range(10)]
+
+    states = bytearray(end - start)
+    counts = array("B", [0]) * (end - start)
+    edges = array("I")
+    outside = []
+
+    for index in range(start, end):
+        king, enemy_king, field, turn = Tablebase.position(index)
+        if not __is_legal_layout(king, enemy_king, field, kind):
+            continue
+
+        pieces[king[0]][king[1]] = 6
+        pieces[enemy_king[0]][enemy_king[1]] = 12
+        pieces[field[0]][field[1]] = kind
+
+        # the player who just moved can't be in check
+        if not is_in_check(1 - turn, pieces, EN_PASSANT):
+            count = 0
+            leaving = 0
+            for piece_pos, targets in get_all_possible_moves(pieces, turn, EN_PASSANT):
+                for target_pos in targets:
+                    if target_pos == field: # the king takes the piece, leaving only the kings
+                        outside.append((index, 0, 0))
+                        leaving += 1
+                        continue
+
+                    fields = [king, enemy_king, field]
+                    fields[[king, enemy_king, field].index(piece_pos)] = target_pos
+                    if kind == 1 and piece_pos == field and target_pos[0] == 1:
+                        outside.append((index,) + __probe_promotion(tablebase, fields, 1 - turn))
+                        leaving += 1
+                        continue
+
+                    edges.append(Tablebase.index(fields[:2], fields[2], 1 - turn, 0))
+                    count += 1
+
+            counts[index - start] = count
+            if count + leaving == 0:
+                states[index - start] = CHECK_MATE if is_in_check(turn, pieces, EN_PASSANT) else STALEMATE
+            else:
+                states[index - start] = MOVES
+
+        pieces[king[0]][king[1]] = 0
+        pieces[enemy_king[0]][enemy_king[1]] = 0
+        pieces[field[0]][field[1]] = 0
+
+    return start, states, counts, edges, outside
+
+"""
+Checks if the pieces of a position can stand where they are, before looking at checks.
+
+Args:
+    king (tuple): The coords of the white king.
+    enemy_king (tuple): The coords of the black king.
+    field (tuple): The coords of the white piece.
+    kind (int): The kind of the piece.
+
+Returns:
+    bool: If no two pieces share a field, the kings don't touch and no pawn stands on the 1st or 8th rank.
+"""
+def __is_legal_layout(king, enemy_king, field, kind):
+    if king == enemy_king or king == field or enemy_king == field:
+        return False
+    if abs(king[0] - enemy_king[0]) <= 1 and abs(king[1] - enemy_king[1]) <= 1:
+        return False
+
+    return kind != 1 or field[0] not in (1, 8)
+
+"""
+Looks up the result of a pawn promoting, the best promotion being chosen.
+
+Args:
+    tablebase (Tablebase): The tables of the smaller endgames.
+    fields (list): The coords of the white king, of the black king and of the promotion field.
+    turn (int): The player whose turn it is after the promotion (black).
+
+Returns:
+    tuple: The result for the opponent (1 - win, 0 - draw, -1 - loss) and the plies to mate.
+"""
+def __probe_promotion(tablebase, fields, turn):
+    pieces = [[0] * 10 for i in range(10)]
+    pieces[fields[0][0]][fields[0][1]] = 6
+    pieces[fields[1][0]][fields[1][1]] = 12
+
+    best = (0, 0)
+    for promotion in (5, 2):
+        pieces[fields[2][0]][fields[2][1]] = promotion
+        result = tablebase.probe(pieces, turn)
+        if result == 0:
+            raise Exception("Missing tablebase: " + Tablebase.ENDGAMES[promotion])
+
+        # the opponent being mated the soonest is the best for the promoting player
+        if result[0] == -1 and (best[0] != -1 or result[1] < best[1]):
+            best = result
+
+    return best
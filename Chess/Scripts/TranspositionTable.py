@@ -0,0 +1,205 @@
+from array import array
+from multiprocessing import shared_memory
+
+"""
+Class for storing search results by position hash, within a fixed amount of memory.
+
+Every bucket holds 2 entries: the first one is only replaced by results searched at least as deep
+(depth-preferred), the second one takes every other result and the entries pushed out of the first one (always-replace).
+
+Each entry takes two 64-bit words, the hash XOR the packed data, and the packed data:
+    bits 0 -> 6 - field the best move starts from (line * 10 + column)
+    bits 7 -> 13 - field the best move ends on
+    bits 14 -> 16 - piece a pawn promotes to with the best move (0 if none)
+    bits 17 -> 18 - bound type (see below)
+    bits 19 -> 26 - depth
+    bits 27 -> 48 - score + SCORE_OFFSET
+
+The table may be kept in shared memory, so that several search processes use it at the same time without locks.
+An entry whose two words were written by different processes no longer gives the hash when XOR-ed together,
+so it is simply missed instead of returning the data of another position.
+
+Bound conventions:
+    empty entry - 0
+    exact score - 1
+    lower bound (the search failed high) - 2
+    upper bound (the search failed low) - 3
+"""
+class TranspositionTable:
+    EXACT = 1
+    LOWER = 2
+    UPPER = 3
+
+    ENTRY_SIZE = 16 # bytes
+    SCORE_OFFSET = 1 << 21
+
+    """
+    Allocates the table, or attaches to a table shared by another process.
+
+    Args:
+        size_mb (float): The memory the table may take, in megabytes.
+        shared (bool): If the table is kept in a new block of shared memory.
+        name (str): The name of the shared memory of an existing table (see self.name), or None.
+    """
+    def __init__(self, size_mb=16, shared=False, name=None):
+        self.buckets = max(1, int(size_mb * 1024 * 1024) // (2 * self.ENTRY_SIZE))
+        self.memory = None
+        self.name = None
+        # only the process which created the shared memory frees it
+        self.owner = False
+
+        if shared or name is not None:
+            size = 2 * 8 * 2 * self.buckets
+            if name is None:
+                self.memory = shared_memory.SharedMemory(create=True, size=size)
+                self.owner = True
+            else:
+                self.memory = shared_memory.SharedMemory(name=name)
+            self.name = self.memory.name
+            # new shared memory is filled with zeros, i.e. empty entries
+            self.keys = self.memory.buf[:size // 2].cast("Q")
+            self.data = self.memory.buf[size // 2:size].cast("Q")
+        else:
+            self.keys = array("Q", bytes(8 * 2 * self.buckets))
+            self.data = array("Q", bytes(8 * 2 * self.buckets))
+
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    """Empties the table and resets the statistics."""
+    def clear(self):
+        if self.memory is not None:
+            self.memory.buf[:2 * 8 * 2 * self.buckets] = bytes(2 * 8 * 2 * self.buckets)
+        else:
+            self.keys = array("Q", bytes(8 * 2 * self.buckets))
+            self.data = array("Q", bytes(8 * 2 * self.buckets))
+
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    """Detaches from the shared memory of the table, freeing it if this process created it."""
+    def close(self):
+        if self.memory is None:
+            return
+
+        self.keys.release()
+        self.data.release()
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+        self.memory = None
+
+    """
+    Looks up a position.
+
+    Args:
+        hash (int): The Zobrist hash of the position.
+
+    Returns:
+        int: 0 if the position isn't in the table.
+        tuple: The depth, the bound type, the score and the best move (0 if none) stored for the position.
+    """
+    def probe(self, hash):
+        self.probes += 1
+        index = (hash % self.buckets) * 2
+
+        # read once, another process may be writing the entry meanwhile
+        data = self.data[index]
+        if data == 0 or self.keys[index] ^ data != hash:
+            data = self.data[index + 1]
+            if data == 0 or self.keys[index + 1] ^ data != hash:
+                return 0
+
+        self.hits += 1
+        return self.unpack(data)
+
+    """
+    Stores the result of searching a position.
+
+    Args:
+        hash (int): The Zobrist hash of the position.
+        depth (int): The depth the position was searched to.
+        bound (int): EXACT, LOWER or UPPER.
+        score (int): The score of the position.
+        move (tuple): The best move found, or 0 if none.
+    """
+    def store(self, hash, depth, bound, score, move):
+        self.stores += 1
+        index = (hash % self.buckets) * 2
+        data = self.pack(depth, bound, score, move)
+
+        # the depth-preferred entry keeps the deepest result, unless it is about the same position
+        old = self.data[index]
+        same = self.keys[index] ^ old == hash
+        if same or depth >= (old >> 19) & 0xFF:
+            # the deep result of another position moves to the always-replace entry instead of being lost
+            if not same and old != 0:
+                self.keys[index + 1] = self.keys[index]
+                self.data[index + 1] = old
+            self.keys[index] = hash ^ data
+            self.data[index] = data
+        else:
+            self.keys[index + 1] = hash ^ data
+            self.data[index + 1] = data
+
+    """
+    Returns the usage statistics of the table.
+
+    Returns:
+        dict: The number of probes, hits, misses, stores, the hit rate and the capacity in entries.
+    """
+    def get_stats(self):
+        return {
+            "probes": self.probes,
+            "hits": self.hits,
+            "misses": self.probes - self.hits,
+            "hit_rate": self.hits / max(self.probes, 1),
+            "stores": self.stores,
+            "entries": 2 * self.buckets
+        }
+
+    """
+    Packs a search result into a 64-bit word.
+
+    Args:
+        depth (int): The depth the position was searched to.
+        bound (int): EXACT, LOWER or UPPER.
+        score (int): The score of the position.
+        move (tuple): The best move found, or 0 if none.
+
+    Returns:
+        int: The packed data.
+    """
+    def pack(self, depth, bound, score, move):
+        data = (min(depth, 255) << 19) | (bound << 17) | ((score + self.SCORE_OFFSET) << 27)
+
+        if move != 0:
+            data |= (move[0][0] * 10 + move[0][1]) | ((move[1][0] * 10 + move[1][1]) << 7)
+            if len(move) > 2:
+                data |= move[2] << 14
+
+        return data
+
+    """
+    Unpacks a search result packed by pack.
+
+    Args:
+        data (int): The packed data.
+
+    Returns:
+        tuple: The depth, the bound type, the score and the best move (0 if none).
+    """
+    def unpack(self, data):
+        origin = data & 0x7F
+        target = (data >> 7) & 0x7F
+
+        move = 0
+        if origin != 0:
+            move = (divmod(origin, 10), divmod(target, 10))
+            promotion = (data >> 14) & 0x7
+            if promotion != 0:
+                move = move + (promotion,)
+
+        return (data >> 19) & 0xFF, (data >> 17) & 0x3, (data >> 27) - self.SCORE_OFFSET, move
@@ -1,4 +1,4 @@
-import copy
+from Scripts import BitboardValidator
 
 """Script for handling all move validation"""
 
@@ -14,51 +14,173 @@ Returns:
     bool: If the player is in check or not.
 """
 def is_in_check(turn, board, en_passant):
-    king_pos = (0, 0)
-    king = 0
-    matrix = __non_destructive_flip(board)
+    king = turn * 6 + 6
 
     # get the position of the king
     i, j = 0, 0
-    for line in matrix:
+    for line in board:
         for cell in line:
-            if cell == (turn * 6 + 6):
-                king_pos = (i, j)
-                king = cell
+            if cell == king:
+                # check if any enemy piece reaches the king
+                return len(attackers_to(board, (i, j), 1 - turn)) != 0
 
             j += 1
-        i+= 1
+        i += 1
         j = 0
 
-    # for each enemy piece, check if it puts the king in check
-    i, j = 0, 0
-    for line in matrix:
-        for cell in line:
-            if not is_same_color(king, cell) and (cell % 6) != 0:
-                if __checks(matrix, (i,j), king_pos, en_passant):
-                    return True
+    return False
 
-            j += 1
-        i += 1
-        j = 0
+"""
+Returns the pieces of a given color which attack a field, by going outward from the field.
+
+Args:
+    board (list): Matrix which contains the layout of the game pieces.
+    square (tuple): The field on the board.
+    color (int): The color of the attacking pieces.
+
+Returns:
+    list: The positions of the attacking pieces.
+"""
+def attackers_to(board, square, color):
+    x = square[0]
+    y = square[1]
+    offset = 6 * color
+    attackers = []
+
+    # white pawns attack up the matrix, so they are below the field, black pawns are above it
+    behind = 1 if color == 0 else -1
+
+    # pawns, knights and the king reach the field by jumping
+    jumps = [(offset + 1, [(behind, -1), (behind, 1)]),
+             (offset + 3, [(-2, -1), (-2, 1), (2, -1), (2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2)]),
+             (offset + 6, [(-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1), (-1, 0)])]
+
+    for piece, steps in jumps:
+        for step in steps:
+            i = x + step[0]
+            j = y + step[1]
+
+            if not __is_out_of_bounds((i, j)) and board[i][j] == piece:
+                attackers.append((i, j))
+
+    # rooks, bishops and queens reach the field along rays stopped by the first piece met
+    rays = [(offset + 2, [(1, 0), (-1, 0), (0, 1), (0, -1)]),
+            (offset + 4, [(1, 1), (1, -1), (-1, 1), (-1, -1)])]
+
+    for piece, directions in rays:
+        for direction in directions:
+            i = x + direction[0]
+            j = y + direction[1]
+
+            while not __is_out_of_bounds((i, j)):
+                field = board[i][j]
+
+                if field != 0:
+                    if field == piece or field == offset + 5:
+                        attackers.append((i, j))
+                    break
+
+                i += direction[0]
+                j += direction[1]
+
+    return attackers
+
+"""
+Checks if the move which has just been made put the player whose turn it is in check.
+Only the pieces the move concerns are looked at: the piece which has moved (direct check)
+and the sliding pieces behind the fields it left (discovered check), so it is cheaper than is_in_check.
+
+Args:
+    turn (int): Indicates which player makes the next move.
+    board (list): Matrix which contains the layout of the game pieces, after the move.
+    move (tuple): The move which has just been made.
+
+Returns:
+    bool: If the player is in check or not.
+"""
+def gives_check(turn, board, move):
+    (i, j), (x, y) = move[0], move[1]
+    king = turn * 6 + 6
+
+    # castling moves the rook as well, which is left to the full test
+    if board[x][y] % 6 == 0 and abs(j - y) == 2:
+        return is_in_check(turn, board, None)
+
+    # get the position of the king
+    for line in range(1, 9):
+        if king in board[line]:
+            king_pos = (line, board[line].index(king))
+            break
+    else:
+        return False
+
+    if __attacks(board, (x, y), king_pos):
+        return True
+
+    # the fields left empty by the move: the one the piece started on, and the pawn captured en passant
+    vacated = [(i, j)]
+    if board[x][y] % 6 == 1 and j != y and board[i][y] == 0:
+        vacated.append((i, y))
+
+    for field in vacated:
+        dx = field[0] - king_pos[0]
+        dy = field[1] - king_pos[1]
+        if dx != 0 and dy != 0 and abs(dx) != abs(dy):
+            continue # the field isn't on a line with the king
+
+        # the first piece met going from the king through the field
+        step = ((dx > 0) - (dx < 0), (dy > 0) - (dy < 0))
+        a, b = king_pos[0] + step[0], king_pos[1] + step[1]
+        while not __is_out_of_bounds((a, b)) and board[a][b] == 0:
+            a += step[0]
+            b += step[1]
+
+        if not __is_out_of_bounds((a, b)) and __attacks(board, (a, b), king_pos):
+            return True
 
     return False
 
 """
-Function for safely rotating a matrix 180 degrees
+Checks if the piece on a field attacks the enemy king.
 
 Args:
-    matrix (list): The matrix.
-    
+    board (list): Matrix which contains the layout of the game pieces.
+    piece_pos (tuple): The position of the piece.
+    king_pos (tuple): The position of the king of the other color.
+
 Returns:
-    list: The rotated matrix.
+    bool: If the piece attacks the king.
 """
-def __non_destructive_flip(matrix):
-    board_copy = copy.deepcopy(matrix)
-    board_copy = list(zip(*board_copy[::-1]))
-    board_copy = list(zip(*board_copy[::-1]))
+def __attacks(board, piece_pos, king_pos):
+    piece = board[piece_pos[0]][piece_pos[1]]
+    if piece == 0 or is_same_color(piece, board[king_pos[0]][king_pos[1]]):
+        return False
 
-    return [list(row) for row in board_copy]
+    dx = king_pos[0] - piece_pos[0]
+    dy = king_pos[1] - piece_pos[1]
+    kind = piece % 6
+
+    if kind == 1: # white pawns attack up the matrix, black pawns down
+        return dx == (-1 if piece < 7 else 1) and abs(dy) == 1
+    if kind == 3:
+        return abs(dx) * abs(dy) == 2
+    if kind == 0:
+        return max(abs(dx), abs(dy)) == 1
+
+    straight = dx == 0 or dy == 0
+    if straight and kind == 4 or not straight and (abs(dx) != abs(dy) or kind == 2):
+        return False
+
+    # the fields between the piece and the king must be empty
+    step = ((dx > 0) - (dx < 0), (dy > 0) - (dy < 0))
+    a, b = piece_pos[0] + step[0], piece_pos[1] + step[1]
+    while (a, b) != king_pos:
+        if board[a][b] != 0:
+            return False
+        a += step[0]
+        b += step[1]
+
+    return True
 
 """
 Returns a list of all valid moves for all the pieces belonging to the player.
@@ -72,6 +194,106 @@ Returns:
     list: All possible moves a player can make.
 """
 def get_all_possible_moves(board, turn, en_passant):
+    return BitboardValidator.get_all_possible_moves(board, turn, en_passant)
+
+"""
+Returns a list of the valid captures and promotions for all the pieces belonging to the player.
+
+Args:
+    turn (int): Indicates which player makes the next move.
+    board (list): Matrix which contains the layout of the game pieces.
+    en_passant (list): Matrix with 2 lines, each keeping track of where en_passant and castling can be performed.
+    
+Returns:
+    list: The captures and promotions a player can make, in the format of get_all_possible_moves.
+"""
+def get_all_captures(board, turn, en_passant):
+    return BitboardValidator.get_all_captures(board, turn, en_passant)
+
+"""
+Checks if the player has any valid move.
+
+Args:
+    turn (int): Indicates which player makes the next move.
+    board (list): Matrix which contains the layout of the game pieces.
+    en_passant (list): Matrix with 2 lines, each keeping track of where en_passant and castling can be performed.
+    
+Returns:
+    bool: If the player can move at all (it is check mate or stalemate otherwise).
+"""
+def has_valid_moves(board, turn, en_passant):
+    return BitboardValidator.has_valid_moves(board, turn, en_passant)
+
+"""
+Returns a list of all valid moves for a given piece.
+
+Args:
+    turn (int): Indicates which player makes the next move.
+    board (list): Matrix which contains the layout of the game pieces.
+    piece_pos (tuple): The position of a piece on the board.
+    en_passant (list): Matrix with 2 lines, each keeping track of where en_passant and castling can be performed.
+    
+Returns:
+    list: All possible moves the piece can make.
+"""
+def get_all_valid_moves(board, turn, piece_pos, en_passant):
+    # the bitboards only generate moves for the player whose turn it is
+    if not __is_own_piece(board, turn, piece_pos):
+        return reference_get_all_valid_moves(board, turn, piece_pos, en_passant)
+
+    return BitboardValidator.get_all_valid_moves(board, turn, piece_pos, en_passant)
+
+"""
+Checks if a given move is valid.
+
+Args:
+    turn (int): Indicates which player makes the next move.
+    board (list): Matrix which contains the layout of the game pieces.
+    piece_pos (tuple): The position of a piece on the board.
+    target_pos (tuple): The place where the piece is supposed to move.
+    en_passant (list): Matrix with 2 lines, each keeping track of where en_passant and castling can be performed.
+    
+Returns:
+    bool: If the move is valid.
+"""
+def is_valid_move(board, turn, piece_pos, target_pos, en_passant):
+    if not __is_own_piece(board, turn, piece_pos):
+        return reference_is_valid_move(board, turn, piece_pos, target_pos, en_passant)
+
+    return BitboardValidator.is_valid_move(board, turn, piece_pos, target_pos, en_passant)
+
+"""
+Checks if the piece at a given position belongs to the player whose turn it is.
+
+Args:
+    board (list): Matrix which contains the layout of the game pieces.
+    turn (int): Indicates which player makes the next move.
+    piece_pos (tuple): The position of a piece on the board.
+
+Returns:
+    bool: If the piece belongs to the player.
+"""
+def __is_own_piece(board, turn, piece_pos):
+    if __is_out_of_bounds(piece_pos):
+        return False
+
+    field = board[piece_pos[0]][piece_pos[1]]
+    return field != 0 and is_same_color(6 + 6 * turn, field)
+
+"""
+Reference implementation working directly on the board matrix, kept for checking the bitboards against.
+
+Returns a list of all valid moves for all the pieces belonging to the player.
+
+Args:
+    turn (int): Indicates which player makes the next move.
+    board (list): Matrix which contains the layout of the game pieces.
+    en_passant (list): Matrix with 2 lines, each keeping track of where en_passant and castling can be performed.
+    
+Returns:
+    list: All possible moves a player can make.
+"""
+def reference_get_all_possible_moves(board, turn, en_passant):
     reference = 6 + 6 * turn
     moves = []
 
@@ -79,7 +301,7 @@ def get_all_possible_moves(board, turn, en_passant):
     for line in board:
         for field in line:
             if field != 0 and is_same_color(reference, field):
-                aux = get_all_valid_moves(board, turn, (i, j), en_passant)
+                aux = reference_get_all_valid_moves(board, turn, (i, j), en_passant)
                 if len(aux) != 0:
                     moves.append(((i, j), aux))
             j += 1
@@ -89,6 +311,8 @@ def get_all_possible_moves(board, turn, en_passant):
     return moves
 
 """
+Reference implementation working directly on the board matrix.
+
 Returns a list of all valid moves for a given piece.
 
 Args:
@@ -100,7 +324,7 @@ Args:
 Returns:
     list: All possible moves the piece can make.
 """
-def get_all_valid_moves(board, turn, piece_pos, en_passant):
+def reference_get_all_valid_moves(board, turn, piece_pos, en_passant):
     matrix = move_matrix(board, piece_pos, en_passant)
     moves = []
 
@@ -108,7 +332,7 @@ def get_all_valid_moves(board, turn, piece_pos, en_passant):
     for line in matrix:
         for field in line:
             if field != 0:
-                if is_valid_move(board, turn, piece_pos, (i, j), en_passant):
+                if reference_is_valid_move(board, turn, piece_pos, (i, j), en_passant):
                     moves.append((i, j))
 
             j += 1
@@ -118,6 +342,8 @@ def get_all_valid_moves(board, turn, piece_pos, en_passant):
     return moves
 
 """
+Reference implementation working directly on the board matrix.
+
 Checks if a given move is valid.
 
 Args:
@@ -130,45 +356,33 @@ Args:
 Returns:
     bool: If the move is valid.
 """
-def is_valid_move(board, turn, piece_pos, target_pos, en_passant):
+def reference_is_valid_move(board, turn, piece_pos, target_pos, en_passant):
     matrix = move_matrix(board, piece_pos, en_passant)
 
     if matrix[target_pos[0]][target_pos[1]] == 0:
         return False # the piece cannot physically move there
 
-    # simulate the move and see if it leads to the king being in check
-    board_copy = copy.deepcopy(board)
+    # simulate the move in place and see if it leads to the king being in check
+    piece = board[piece_pos[0]][piece_pos[1]]
+    captured = board[target_pos[0]][target_pos[1]]
+    # the pawn captured en passant is next to the capturing one
+    passed = board[piece_pos[0]][target_pos[1]]
 
-    board_copy[target_pos[0]][target_pos[1]] = board_copy[piece_pos[0]][piece_pos[1]]
-    board_copy[piece_pos[0]][piece_pos[1]] = 0
+    board[target_pos[0]][target_pos[1]] = piece
+    board[piece_pos[0]][piece_pos[1]] = 0
 
     if matrix[target_pos[0]][target_pos[1]] == 3:
-        board_copy[target_pos[0] + 1][target_pos[1]] = 0
-
-    if is_in_check(turn, board_copy, en_passant):
-        return False
-
-    return True
+        board[piece_pos[0]][target_pos[1]] = 0
 
+    in_check = is_in_check(turn, board, en_passant)
 
-"""
-Given a coord on the board, checks if the given piece puts the enemy king in check.
+    # take the move back
+    board[piece_pos[0]][target_pos[1]] = passed
+    board[target_pos[0]][target_pos[1]] = captured
+    board[piece_pos[0]][piece_pos[1]] = piece
 
-Args:
-    board (list): Matrix which contains the layout of the game pieces.
-    piece_pos (tuple): The position of a piece on the board.
-    king_pos (tuple): The position of the king.
-    en_passant (list): Matrix with 2 lines, each keeping track of where en_passant and castling can be performed.
-    
-Returns:
-    bool: If the given piece puts the king in check.
-"""
-def __checks(board, piece_pos, king_pos, en_passant):
-    matrix = move_matrix(board, piece_pos, en_passant)
-    if matrix[king_pos[0]][king_pos[1]] != 0:
-        return True
+    return not in_check
 
-    return False
 
 """
 Given the coord of a piece on the board, checks all places a piece can move including by capturing.
@@ -242,45 +456,47 @@ def __navigate_pawn(board, piece_pos, matrix, en_passant):
     y = piece_pos[1]
     piece = board[x][y]
 
-    if board[x - 1][y - 1] != 0 and not is_same_color(piece, board[x - 1][y - 1]):
-        matrix[x - 1][y - 1] = 2
+    # white pawns move up the matrix, black pawns move down
+    if piece < 7:
+        step, start, passing = -1, 7, 4
+    else:
+        step, start, passing = 1, 2, 5
 
-    if board[x - 1][y + 1] != 0 and not is_same_color(piece, board[x - 1][y + 1]):
-        matrix[x - 1][y + 1] = 2
+    if board[x + step][y - 1] != 0 and not is_same_color(piece, board[x + step][y - 1]):
+        matrix[x + step][y - 1] = 2
+
+    if board[x + step][y + 1] != 0 and not is_same_color(piece, board[x + step][y + 1]):
+        matrix[x + step][y + 1] = 2
 
     target = board[x][y - 1]
     # if there is an enemy pawn to the left
-    if x == 4 and target % 6 == 1 and not is_same_color(piece, target):
+    if x == passing and target % 6 == 1 and not is_same_color(piece, target):
         if target < 7:
             turn = 0
         else:
             turn = 1
 
         if en_passant[turn][y - 1] == 1: # if en passant is possible
-            matrix[x - 1][y - 1] = 3
+            matrix[x + step][y - 1] = 3
 
     target = board[x][y + 1]
     # if there is an enemy pawn to the right
-    if x == 4 and target % 6 == 1 and not is_same_color(piece, target):
+    if x == passing and target % 6 == 1 and not is_same_color(piece, target):
         if target < 7:
             turn = 0
         else:
             turn = 1
 
         if en_passant[turn][y + 1] == 1:  # if en passant is possible
-            matrix[x - 1][y + 1] = 3
-
-    if x == 1: # pawn promotion
-        matrix[x - 1][y] = 1
-        return matrix
+            matrix[x + step][y + 1] = 3
 
-    if board[x - 1][y] == 0 and not __is_out_of_bounds((x - 1, y)):
-        matrix[x- 1][y] = 1
+    if board[x + step][y] == 0 and not __is_out_of_bounds((x + step, y)):
+        matrix[x + step][y] = 1
     else:
         return matrix
 
-    if x == 7 and board[x - 2][y] == 0:
-        matrix[x - 2][y] = 1
+    if x == start and board[x + 2 * step][y] == 0:
+        matrix[x + 2 * step][y] = 1
 
     return matrix
 
@@ -513,7 +729,7 @@ def __navigate_king(board, piece_pos, matrix, en_passant):
         j = piece_pos[1] + line[1]
 
         if (not __is_out_of_bounds((i, j))
-            and not __enemy_king_in_proximity(board, piece, (i,j), proximity_matrix)):
+            and not __enemy_king_in_proximity(board, piece, (i,j))):
 
             field = board[i][j]
             if field == 0:
@@ -553,7 +769,7 @@ def __can_castle_right(board, piece_pos, en_passant):
     # check if the spaces between the king and rook are empty
     i = piece_pos[1] + 1
     while i < 8:
-        if board[8][i] != 0:
+        if board[piece_pos[0]][i] != 0:
             return False
 
         i += 1
@@ -561,10 +777,7 @@ def __can_castle_right(board, piece_pos, en_passant):
     # check if any of the spaces the king traverses are attacked
     i = piece_pos[1]
     while i <= piece_pos[1] + 2:
-        board_copy = copy.deepcopy(board)
-        board_copy[piece_pos[0]][i] = 6
-        board_copy[piece_pos[0]][piece_pos[1]] = 0
-        if is_in_check(turn, board_copy, en_passant):
+        if len(attackers_to(board, (piece_pos[0], i), 1 - turn)) != 0:
             return False
 
         i += 1
@@ -595,7 +808,7 @@ def __can_castle_left(board, piece_pos, en_passant):
     # check if the spaces between the king and rook are empty
     i = piece_pos[1] - 1
     while i > 1:
-        if board[8][i] != 0:
+        if board[piece_pos[0]][i] != 0:
             return False
 
         i -= 1
@@ -603,10 +816,7 @@ def __can_castle_left(board, piece_pos, en_passant):
     # check if any of the spaces the king traverses are attacked
     i = piece_pos[1]
     while i >= piece_pos[1] - 2:
-        board_copy = copy.deepcopy(board)
-        board_copy[piece_pos[0]][i] = 6
-        board_copy[piece_pos[0]][piece_pos[1]] = 0
-        if is_in_check(turn, board_copy, en_passant):
+        if len(attackers_to(board, (piece_pos[0], i), 1 - turn)) != 0:
             return False
 
         i -= 1
@@ -620,21 +830,22 @@ Args:
     board (list): Matrix which contains the layout of the game pieces.
     king (int): Value of the king piece.
     pos (tuple): A field on the board.
-    proximity_matrix (list): Movement matrix for going around the given field.
     
 Returns:
     bool: If the enemy king is in the proximity of the given field.
 """
-def __enemy_king_in_proximity(board, king ,pos, proximity_matrix):
-
-    # go around the given field
-    for line in proximity_matrix:
-        # this function is never called on an out-of-bounds field so this is fine
-        field = board[pos[0] + line[0]][pos[1] + line[1]]
+def __enemy_king_in_proximity(board, king, pos):
+    if king < 7:
+        enemy = 1
+    else:
+        enemy = 0
 
+    # among the enemy pieces reaching the given field
+    for attacker in attackers_to(board, pos, enemy):
         # if we find the enemy king
-        if field != 0 and field % 6 == 0 and not is_same_color(king, field):
+        if board[attacker[0]][attacker[1]] % 6 == 0:
             return True
+
     # we haven't found the enemy king in any of the surrounding fields
     return False
 
@@ -0,0 +1,243 @@
+import sys
+import threading
+
+from Objects.Board import Board
+from Scripts.FunkyLittleComputer import FunkyLittleComputer, MATE
+from Scripts.Notation import get_move_name, parse_move
+
+"""Script for playing through the UCI protocol on the standard input and output, without the GUI"""
+
+NAME = "FunkyLittleComputer"
+AUTHOR = "Python-Chess"
+
+# the settings the engine can be given with setoption, and their range
+OPTIONS = {
+    "Hash": (16, 1, 1024),
+    "Threads": (1, 1, 64)
+}
+
+# the moves a game is expected to last from now on when the clock doesn't say, and the time kept in reserve
+MOVES_TO_GO = 30
+MOVE_OVERHEAD = 0.05
+
+"""
+Runs the engine, reading commands until quit or the end of the input.
+
+Supported commands: uci, isready, ucinewgame, setoption (see OPTIONS), position (startpos or fen, with moves),
+go (depth, movetime, wtime/btime, winc/binc, movestogo, nodes, infinite), stop and quit.
+The search runs in the background, so stop and isready are answered while searching, and an info line
+is sent after every iteration.
+
+Args:
+    args (list): Unused, the settings are given with setoption.
+"""
+def run_uci(args):
+    settings = {name: option[0] for name, option in OPTIONS.items()}
+    state = {
+        "computer": None,
+        "board": Board(),
+        "search": None,
+        # set once the move of the search is sent, or kept for an infinite search, which only gives it once stopped
+        "sent": threading.Event(),
+        "infinite": False,
+        "best_move": None
+    }
+    lock = threading.Lock()
+
+    def send(line):
+        # the search thread sends info and bestmove lines
+        with lock:
+            sys.stdout.write(line + "\n")
+            sys.stdout.flush()
+
+    for line in sys.stdin:
+        words = line.split()
+        if len(words) == 0:
+            continue
+        command = words[0]
+
+        if command == "uci":
+            send("id name " + NAME)
+            send("id author " + AUTHOR)
+            for name, (default, minimum, maximum) in OPTIONS.items():
+                send("option name %s type spin default %d min %d max %d" % (name, default, minimum, maximum))
+            send("uciok")
+        elif command == "isready":
+            send("readyok")
+        elif command == "stop":
+            __stop(state, send)
+        elif command == "quit":
+            break
+        else:
+            # the other commands change the position or the engine, so the search ends first
+            __stop(state, send)
+
+            if command == "ucinewgame":
+                if state["computer"] is not None:
+                    state["computer"].table.clear()
+                state["board"] = Board()
+            elif command == "setoption":
+                __set_option(state, settings, words)
+            elif command == "position":
+                try:
+                    state["board"] = __read_position(words)
+                except Exception as error:
+                    # an invalid position leaves the last one in place instead of ending the engine
+                    send("info string error: %s" % error)
+            elif command == "go":
+                if state["computer"] is None:
+                    state["computer"] = FunkyLittleComputer(hash_size_mb=settings["Hash"], threads=settings["Threads"])
+                __go(state, words, send)
+
+    __stop(state, send)
+    if state["computer"] is not None:
+        state["computer"].close()
+
+"""
+Applies a setoption command, the engine being created again with the new settings.
+
+Args:
+    state (dict): The engine and the position.
+    settings (dict): The value of every option.
+    words (list): The words of the command (setoption name <name> value <value>).
+"""
+def __set_option(state, settings, words):
+    if "name" not in words or "value" not in words:
+        return
+
+    name = " ".join(words[words.index("name") + 1:words.index("value")])
+    value = words[words.index("value") + 1] if words.index("value") + 1 < len(words) else ""
+    if name not in OPTIONS or not value.isdigit():
+        return
+
+    default, minimum, maximum = OPTIONS[name]
+    settings[name] = min(max(int(value), minimum), maximum)
+    if state["computer"] is not None:
+        state["computer"].close()
+        state["computer"] = None
+
+"""
+Reads the position of a position command.
+
+Args:
+    words (list): The words of the command (position startpos|fen <fen> [moves <move>...]).
+
+Returns:
+    Board: The position, the moves which can't be played being left out with the ones after them.
+"""
+def __read_position(words):
+    board = Board()
+    moves = words.index("moves") if "moves" in words else len(words)
+
+    if len(words) > 1 and words[1] == "fen":
+        board.set_fen(" ".join(words[2:moves]))
+
+    for name in words[moves + 1:]:
+        move = parse_move(board, name)
+        if move == 0:
+            break
+        board.make_move(move)
+
+    return board
+
+"""
+Starts searching the position in the background for a go command, the move being sent once it is found.
+
+Args:
+    state (dict): The engine and the position.
+    words (list): The words of the command.
+    send (function): Writes a line to the standard output.
+"""
+def __go(state, words, send):
+    computer = state["computer"]
+    board = state["board"]
+    limits = {}
+    for index in range(1, len(words) - 1):
+        if words[index + 1].lstrip("-").isdigit():
+            limits[words[index]] = int(words[index + 1])
+
+    computer.max_depth = limits.get("depth", 64)
+    computer.node_limit = limits.get("nodes", 0)
+    computer.time_limit = 0
+    if "movetime" in limits:
+        computer.time_limit = limits["movetime"] / 1000
+    elif ("wtime", "btime")[board.turn] in limits:
+        remaining = limits[("wtime", "btime")[board.turn]] / 1000
+        increment = limits.get(("winc", "binc")[board.turn], 0) / 1000
+        moves_to_go = limits.get("movestogo", MOVES_TO_GO)
+        # an even share of the time left, never more than half of it
+        budget = min(remaining / max(moves_to_go, 1) + increment, remaining / 2) - MOVE_OVERHEAD
+        computer.time_limit = max(budget, 0.01)
+
+    state["infinite"] = "infinite" in words
+    state["best_move"] = None
+    state["sent"].clear()
+    computer.info_callback = lambda info: send(__format_info(board, info))
+
+    def done(future):
+        try:
+            move = future.result()
+            state["best_move"] = get_move_name(board, move) if move != 0 else "0000"
+        except Exception as error:
+            # a failed search still answers with a null move, so that the GUI isn't left waiting
+            send("info string error: %s" % error)
+            state["best_move"] = "0000"
+        finally:
+            # __stop waits for this, whatever happened to the search
+            if not state["infinite"]:
+                send("bestmove " + state["best_move"])
+            state["sent"].set()
+
+    state["search"] = computer.start_search(board.get_pieces(), board.turn, board.en_passant)
+    state["search"].add_done_callback(done)
+
+"""
+Stops the search, if any, and waits for its move to be sent (sending it for an infinite search).
+
+Args:
+    state (dict): The engine and the position.
+    send (function): Writes a line to the standard output.
+"""
+def __stop(state, send):
+    if state["search"] is None:
+        return
+
+    state["computer"].stop()
+    # the callbacks of the future may still be running once its result is there
+    state["sent"].wait()
+    state["search"] = None
+
+    if state["infinite"]:
+        state["infinite"] = False
+        send("bestmove " + state["best_move"])
+
+"""
+Formats the statistics of an iteration of the search as an info line.
+
+Args:
+    board (Board): The position searched.
+    info (dict): The statistics (see FunkyLittleComputer.get_search_info).
+
+Returns:
+    str: The line.
+"""
+def __format_info(board, info):
+    score = info["score"]
+    if abs(score) >= MATE - 1000:
+        # moves to mate, negative when being mated
+        plies = MATE - abs(score)
+        score_text = "mate %d" % ((plies + 1) // 2 if score > 0 else -((plies + 1) // 2))
+    else:
+        score_text = "cp %d" % score
+
+    # the moves are named in the positions they are played in
+    names = []
+    undos = []
+    for move in info["pv"]:
+        names.append(get_move_name(board, move))
+        undos.append(board.make_move(move))
+    for undo in reversed(undos):
+        board.unmake_move(undo)
+
+    return "info depth %d score %s nodes %d nps %d time %d pv %s" % (info["depth"], score_text,
+        info["nodes"] + info["quiescence_nodes"], info["nps"], int(info["time"] * 1000), " ".join(names))
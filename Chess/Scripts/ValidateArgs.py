@@ -1,4 +1,3 @@
-
 """
 Validates the commandline arguments.
 
@@ -9,8 +8,40 @@ Returns:
         int: 0 if invalid args
         int: 1 if 1 player game
         int: 2 if 2 player game
+        int: 3 if perft (perft <depth> [divide] [reference] [moves...|fen <FEN> [moves <move>...]])
+        int: 4 if self-play (selfplay <games> [engine|random] [workers=<n>] [output=<file>] ...)
+        int: 5 if EPD analysis (epd <file> [output=<file>] [workers=<n>] [best] [nodes=<n>])
+        int: 6 if PGN replay (pgn <file> [output=<file>] [workers=<n>])
+        int: 7 if building an opening book (book <file> [output=<file>] [workers=<n>] [plies=<n>] [min=<n>])
+        int: 8 if generating tablebases (tablebase [KQK] [KRK] [KPK] [directory=<dir>] [workers=<n>])
+        int: 9 if playing through the UCI protocol (uci)
 """
 def validate_args(args):
+    if len(args) >= 3 and args[1] == "perft":
+        if args[2].isdigit():
+            return 3
+        return 0
+
+    if len(args) >= 3 and args[1] == "selfplay":
+        if args[2].isdigit():
+            return 4
+        return 0
+
+    if len(args) >= 3 and args[1] == "epd":
+        return 5
+
+    if len(args) >= 3 and args[1] == "pgn":
+        return 6
+
+    if len(args) >= 3 and args[1] == "book":
+        return 7
+
+    if len(args) >= 2 and args[1] == "tablebase":
+        return 8
+
+    if len(args) == 2 and args[1] == "uci":
+        return 9
+
     if len(args) != 2:
         return 0
 
@@ -19,4 +50,4 @@ def validate_args(args):
     elif args[1] == "player":
         return 2
 
-    return 0 #invalid argument
\ No newline at end of file
+    return 0 #invalid argument
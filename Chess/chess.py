@@ -1,6 +1,5 @@
 import sys
 
-from Objects.Game import Game
 from Scripts.ValidateArgs import validate_args
 
 arg = validate_args(sys.argv)
@@ -8,5 +7,31 @@ arg = validate_args(sys.argv)
 if arg == 0:
     raise Exception("Invalid argument(s).")
 
-current_game = Game()
-current_game.start(sys.argv[1])
+if arg == 3:
+    # perft runs without the GUI, so pygame isn't imported at all
+    from Scripts.Perft import run_perft
+    run_perft(sys.argv[2:])
+elif arg == 4:
+    from Scripts.SelfPlay import run_selfplay
+    run_selfplay(sys.argv[2:])
+elif arg == 5:
+    from Scripts.EpdAnalysis import run_epd
+    run_epd(sys.argv[2:])
+elif arg == 6:
+    from Scripts.PgnReplay import run_pgn
+    run_pgn(sys.argv[2:])
+elif arg == 7:
+    from Scripts.BookBuilder import run_book
+    run_book(sys.argv[2:])
+elif arg == 8:
+    from Scripts.TablebaseGenerator import run_tablebase
+    run_tablebase(sys.argv[2:])
+elif arg == 9:
+    # driven by chess GUIs and match runners through pipes, pygame isn't imported
+    from Scripts.Uci import run_uci
+    run_uci(sys.argv[2:])
+else:
+    from Objects.Game import Game
+
+    current_game = Game()
+    current_game.start(sys.argv[1])